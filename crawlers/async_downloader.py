@@ -0,0 +1,494 @@
+import asyncio
+from urllib.parse import urlsplit
+from crawlers.retry import DownloadError
+from crawlers.routing import RoutingTable
+from crawlers.retry import classify_status
+from crawlers.retry import parse_retry_after
+from crawlers.retry import classify_exception
+from crawlers.partial_download import PartialDownload
+from crawlers.download_scheduler import DownloadScheduler
+
+# aiohttp and aiohttp-socks are optional, the threaded DownloadScheduler is used when they are missing
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    from aiohttp_socks import ProxyConnector
+except ImportError:
+    ProxyConnector = None
+
+class AsyncDownloader:
+    """
+    An asyncio download engine which keeps thousands of image and tile fetches in flight on a single event
+    loop rather than one per worker thread. Concurrency is bounded globally with a semaphore and per host by a
+    fixed cap or an AdaptiveHostLimiter, and response bodies are streamed to disk in chunks. Existence checks
+    and zip handling are shared with the threaded path through the crawlers' _prepare_download and
+    _open_download methods, which run in the default executor to keep the disk off the event loop. Each task
+    carries its own circuit lane in 'worker' lane mode. This path suits the latency bound RAMMB tile crawls
+    made up of many small PNGs.
+
+    Failed downloads are retried according to an optional RetryPolicy, sleeping out the backoff without
+    holding a slot. Requests use the connect and read timeouts of the crawler, and an optional RunDeadline
+    stops retries during its grace period, any new download once it has passed and the transfers in flight
+    at its cutoff. Given the Tor password,
+    requests over Tor are reported to the rotation policies of the crawler like those of the threaded path.
+    Client sessions are retired whenever the crawler's pooled sessions are, on rotation and when a circuit
+    lane is renewed, and are closed once their requests in flight have finished. An optional CircuitBreaker
+    holds the links of a host back while its circuit is open and while the host is being probed, and fails
+    them once its probe has failed.
+
+    Requires the optional aiohttp package, plus aiohttp-socks when routing through Tor.
+
+    @author Vincent.Nigro
+    @version 0.0.8
+    @modified 10/16/26
+    """
+
+    DEFAULT_IN_FLIGHT = 256
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, crawler, in_flight=DEFAULT_IN_FLIGHT, host_limit=DownloadScheduler.DEFAULT_HOST_LIMIT, notor=False, logger=None,
+        retry_policy=None, on_retry=None, host_limiter=None, deadline=None, breaker=None, pw=''):
+        """
+        Constructor which accepts the crawler whose links are downloaded and the concurrency bounds.
+
+        @param crawler: SatelliteCrawler - The crawler owning the links, Tor pool and file system layout.
+        @param in_flight: int - The maximum number of requests in flight across every host.
+        @param host_limit: int - The maximum number of requests in flight to a single host.
+        @param notor: bool - An optional parameter for not using the Tor network.
+        @param logger: Logger - An optional logger used to record download failures.
+        @param retry_policy: RetryPolicy - An optional policy deciding whether and when failed links are retried.
+        @param on_retry: function - An optional callable accepting (title, link, error) invoked before a retry.
+        @param host_limiter: AdaptiveHostLimiter - An optional controller adjusting each host's cap at runtime.
+        @param deadline: RunDeadline - An optional deadline after which no further downloads are started.
+        @param breaker: CircuitBreaker - An optional breaker failing the links of hosts which keep failing.
+        @param pw: str - A string containing the Tor password, empty to leave the Tor IP alone during downloads.
+        """
+
+        self.__pw = pw
+        self.__notor = notor
+        self.__on_retry = on_retry
+        self.__retry_policy = retry_policy
+        self.__host_limiter = host_limiter
+        self.__deadline = deadline
+        self.__breaker = breaker
+        self.__logger = logger
+        self.__crawler = crawler
+        self.__in_flight = max(1, int(in_flight))
+        self.__host_limit = max(1, int(host_limit))
+
+        self.__loop = None
+        self.__active = {}
+        self.__sessions = {}
+        self.__retired = set()
+        self.__closing = set()
+        self.__session_uses = {}
+        self.__unavailable = set()
+        self.__host_conditions = {}
+        self.__global_semaphore = None
+
+
+    @staticmethod
+    def is_available(notor=False):
+        """
+        Returns whether the optional packages required by the asyncio path are installed.
+
+        @param notor: bool - True if requests will not be routed through Tor, which removes the need for aiohttp-socks.
+        @return available: bool - True if the asyncio path can be used.
+        """
+
+        return aiohttp is not None and (notor or ProxyConnector is not None)
+
+
+    def download_all(self, links):
+        """
+        Downloads every entry of a key-value mapping of title to link and blocks until all have finished.
+
+        @param links: {} - A key-value mapping of a title key in a standard format and its appropriate image link.
+        """
+
+        asyncio.run(self.__run(links))
+
+
+    async def __run(self, links):
+        """
+        Private coroutine which schedules a task per link and closes the sessions once all are done.
+        """
+
+        self.__loop = asyncio.get_running_loop()
+        self.__global_semaphore = asyncio.Semaphore(self.__in_flight)
+        self.__crawler._sessions.add_retire_listener(self.__on_retire)
+
+        try:
+            results = await asyncio.gather(*(self.__download(title, link) for title, link in links.items()),
+                return_exceptions=True)
+
+            for title, result in zip(links.keys(), results):
+                if isinstance(result, DownloadError):
+                    self.__log_error(title + " failed to download (" + result.kind + "): " + str(result))
+                elif isinstance(result, Exception):
+                    self.__log_error("Download of " + title + " failed: " + repr(result))
+        finally:
+            self.__crawler._sessions.remove_retire_listener(self.__on_retire)
+
+            for session in list(self.__sessions.values()) + list(self.__retired):
+                await session.close()
+
+            await asyncio.gather(*self.__closing, return_exceptions=True)
+
+            self.__sessions = {}
+            self.__retired = set()
+
+
+    async def __download(self, title, link):
+        """
+        Private coroutine downloading a single link, backing off and retrying while the failure is retryable.
+        """
+
+        attempt = 1
+        host = urlsplit(link).hostname or ''
+
+        while True:
+            try:
+                downloaded = await self.__attempt(title, link, attempt)
+
+                if self.__breaker is not None:
+                    if downloaded is False:
+                        self.__breaker.release(host)
+                    else:
+                        self.__breaker.record(host)
+
+                return downloaded
+            except Exception as e:
+                error = self.__classify(e)
+
+                # Links failed after a failed probe never held the probe themselves
+                if self.__breaker is not None and error.kind != DownloadError.UNAVAILABLE and \
+                    self.__breaker.record(host, error):
+                    # The links held back behind the probe are failed along with it
+                    self.__unavailable.add(host)
+                    raise error
+
+                if error.kind in (DownloadError.DEADLINE, DownloadError.UNAVAILABLE):
+                    raise error
+
+                if self.__host_limiter is not None:
+                    self.__host_limiter.record(host, error=error)
+
+                if self.__retry_policy is None or not self.__retry_policy.should_retry(error, attempt):
+                    raise error
+
+                delay = self.__retry_policy.get_delay(error, attempt)
+
+                # Retries are low priority work which is given up once the grace period begins
+                if self.__deadline is not None and not self.__deadline.allows_retry(delay):
+                    raise error
+
+            attempt += 1
+
+            retry_log = title + " failed (" + error.kind + "), retrying in " + "{:.1f}".format(delay) + \
+                " seconds (attempt " + str(attempt) + ")."
+            if self.__logger is not None:
+                self.__logger.info(retry_log)
+            print(retry_log)
+
+            if self.__on_retry is not None:
+                self.__on_retry(title, link, error)
+
+            await asyncio.sleep(delay)
+
+
+    def __classify(self, e):
+        """
+        Private method classifying an exception raised by a download attempt, including aiohttp failures.
+        """
+
+        if self.__deadline is not None and self.__deadline.is_cut_off() and not isinstance(e, DownloadError):
+            # Timeouts shortened to the cutoff, and reads aborted by it, are not failures of the download itself
+            return DownloadError(DownloadError.DEADLINE, 'Cut off at the run deadline: ' + type(e).__name__)
+        elif isinstance(e, asyncio.TimeoutError):
+            return DownloadError(DownloadError.TIMEOUT, 'Timed out: ' + str(e))
+        elif isinstance(e, aiohttp.ClientPayloadError):
+            return DownloadError(DownloadError.TRUNCATED, type(e).__name__ + ': ' + str(e))
+        elif isinstance(e, aiohttp.ClientConnectionError):
+            return DownloadError(DownloadError.CONNECTION, type(e).__name__ + ': ' + str(e))
+
+        return classify_exception(e)
+
+
+    async def __attempt(self, title, link, attempt=1):
+        """
+        Private coroutine downloading a single link, routed through a Tor instance from the crawlers' pool.
+        """
+
+        host = urlsplit(link).hostname or ''
+
+        await self.__acquire_host(host)
+
+        try:
+            async with self.__global_semaphore:
+                if self.__deadline is not None and (self.__deadline.is_expired() or (attempt > 1 and self.__deadline.is_near())):
+                    raise DownloadError(DownloadError.DEADLINE, title + " was not started before the run deadline.")
+
+                # A link which is being downloaded under another title, or already was, is skipped
+                if not self.__crawler._single_flight.claim(link):
+                    duplicate_log = "The link for " + title + " is already being downloaded in this run, skipping."
+                    if self.__logger is not None:
+                        self.__logger.info(duplicate_log)
+                    print(duplicate_log)
+                    return False
+
+                try:
+                    downloaded = await self.__fetch(title, link, host)
+                except Exception:
+                    self.__crawler._single_flight.release(link)
+                    raise
+
+                self.__crawler._single_flight.release(link, True)
+        finally:
+            await self.__release_host(host)
+
+        if downloaded:
+            downloaded_log = title + " has downloaded."
+            if self.__logger is not None:
+                self.__logger.info(downloaded_log)
+            print(downloaded_log)
+
+        return downloaded
+
+
+    async def __fetch(self, title, link, host):
+        """
+        Private coroutine carrying out a download claimed by __attempt(), returning False if it was skipped.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        # Existence checks and reading the state of a resumed download touch the disk, keep them off the event loop
+        path = await loop.run_in_executor(None, self.__crawler._prepare_download, title, link)
+        if path is None:
+            return False
+
+        partial = await loop.run_in_executor(None, self.__crawler._open_download, path)
+        headers = await loop.run_in_executor(None, partial.get_request_headers)
+
+        tor_pool = self.__crawler._tor_pool
+        tor_route = self.__crawler._get_route(link, self.__notor) == RoutingTable.TOR
+        instance = tor_pool.acquire() if tor_route else None
+        start = loop.time()
+        session = None
+        failed = True
+        status = None
+        nbytes = 0
+
+        try:
+            session = self.__get_session(self.__crawler._get_proxies(self.__notor, link, instance))
+            self.__session_uses[session] = self.__session_uses.get(session, 0) + 1
+
+            connect, read = self.__crawler._get_timeout(link)
+            timeout = aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+
+            async with session.get(link, headers=headers, timeout=timeout) as response:
+                failed = False
+                status = response.status
+                nbytes = response.content_length or 0
+
+                if response.status not in (self.__crawler.OK_STATUS, PartialDownload.PARTIAL_CONTENT_STATUS):
+                    if response.status == PartialDownload.RANGE_NOT_SATISFIABLE_STATUS:
+                        await loop.run_in_executor(None, partial.discard)
+
+                    raise DownloadError(classify_status(response.status), "HTTP status " + str(response.status) + \
+                        " for " + link, parse_retry_after(response.headers.get('Retry-After')))
+
+                await self.__stream_to_file(response, partial, title)
+        finally:
+            if session is not None:
+                self.__release_session(session)
+
+            # Only transport failures count against the health of the Tor instance
+            if instance is not None:
+                tor_pool.release(instance, loop.time() - start, failed)
+
+                # Let the rotation policies decide whether to generate a new Tor IP, NEWNYM blocks on the ControlPort
+                await loop.run_in_executor(None, self.__crawler._record_rotation, link, self.__pw, self.__notor,
+                    nbytes, failed or status >= self.__crawler.BAD_REQUEST_STATUS)
+
+        # Renaming or extracting a zipped payload touches the disk, keep it off the event loop
+        if not await loop.run_in_executor(None, partial.commit):
+            raise DownloadError(DownloadError.TRUNCATED, title + " was truncated, kept " + \
+                str(partial.get_offset()) + " bytes to resume.")
+
+        if self.__host_limiter is not None:
+            self.__host_limiter.record(host, loop.time() - start)
+
+        return True
+
+
+    async def __acquire_host(self, host):
+        """
+        Private coroutine waiting until a host is below its concurrency cap and taking one of its slots. The
+        cap is polled while an adaptive limiter is holding the host back or its circuit is open or being probed.
+        """
+
+        condition = self.__host_conditions.setdefault(host, asyncio.Condition())
+
+        async with condition:
+            while self.__active.get(host, 0) >= self.__get_host_limit(host) or not self.__admit(host):
+                try:
+                    await asyncio.wait_for(condition.wait(), DownloadScheduler.BLOCKED_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+            self.__active[host] = self.__active.get(host, 0) + 1
+
+
+    def __admit(self, host):
+        """
+        Private method returning whether the circuit of a host lets a request through, raising a DownloadError
+        once the probe of the host has failed so the link is failed without waiting.
+        """
+
+        if host in self.__unavailable:
+            raise DownloadError(DownloadError.UNAVAILABLE, "Host " + host + " is unavailable, the link was not requested.")
+
+        return self.__breaker is None or self.__breaker.allow(host)
+
+
+    async def __release_host(self, host):
+        """
+        Private coroutine returning a host slot and waking the tasks waiting on the host.
+        """
+
+        condition = self.__host_conditions[host]
+
+        async with condition:
+            self.__active[host] -= 1
+            condition.notify_all()
+
+
+    def __get_host_limit(self, host):
+        """
+        Private method returning the concurrency cap for a host.
+        """
+
+        if self.__host_limiter is not None:
+            return self.__host_limiter.get_limit(host)
+
+        return self.__host_limit
+
+
+    async def __stream_to_file(self, response, partial, title):
+        """
+        Private coroutine streaming a response body to the '.part' file of a download in chunks. File operations
+        run in the default executor so a slow disk does not stall the event loop, and each chunk is paced by the
+        bandwidth governor of the crawler when one is configured.
+        """
+
+        loop = asyncio.get_running_loop()
+        governor = self.__crawler._bandwidth
+        share = governor.get_share(title, self.__crawler.get_satellite_name()) if governor is not None else None
+        f = await loop.run_in_executor(None, partial.open, response.status, response.headers)
+
+        try:
+            async for chunk in response.content.iter_chunked(self.CHUNK_SIZE):
+                # The bytes received so far stay in the '.part' file for the next run to resume
+                if self.__deadline is not None and self.__deadline.is_cut_off():
+                    raise DownloadError(DownloadError.DEADLINE, title + " was cut off at the run deadline.")
+
+                await loop.run_in_executor(None, f.write, chunk)
+
+                if governor is not None:
+                    await asyncio.sleep(governor.reserve(share, len(chunk)))
+        finally:
+            await loop.run_in_executor(None, f.close)
+
+
+    def __get_session(self, proxies):
+        """
+        Private method returning the client session for a proxy, creating it on first use. Each session owns
+        a connector which keeps connections alive per host.
+        """
+
+        proxy = proxies.get('https', '')
+        session = self.__sessions.get(proxy)
+
+        if session is None:
+            if proxy:
+                # Host names are resolved by the proxy, so Tor sees them and no lookup leaks outside of it
+                connector = ProxyConnector.from_url(proxy.replace('socks5h://', 'socks5://', 1), rdns=True,
+                    limit=0, limit_per_host=self.__host_limit)
+            else:
+                connector = aiohttp.TCPConnector(limit=0, limit_per_host=self.__host_limit)
+
+            session = aiohttp.ClientSession(connector=connector)
+            self.__sessions[proxy] = session
+
+        return session
+
+
+    def __release_session(self, session):
+        """
+        Private method ending a request on a session, closing the session if it was retired and this was the
+        last request in flight on it.
+        """
+
+        self.__session_uses[session] -= 1
+
+        if self.__session_uses[session] == 0:
+            del self.__session_uses[session]
+
+            if session in self.__retired:
+                self.__retired.discard(session)
+                self.__close_session(session)
+
+
+    def __on_retire(self, username):
+        """
+        Private retire listener of the crawler's SessionManager, which may call it from any thread.
+        """
+
+        try:
+            self.__loop.call_soon_threadsafe(self.__retire_sessions, username)
+        except RuntimeError:
+            # The event loop has already closed along with every session
+            pass
+
+
+    def __retire_sessions(self, username):
+        """
+        Private method taking the sessions of a SOCKS username, or every session, out of use. Sessions without
+        requests in flight are closed right away, the others once their last request has finished.
+        """
+
+        for proxy in list(self.__sessions.keys()):
+            if username is not None and urlsplit(proxy).username != username:
+                continue
+
+            session = self.__sessions.pop(proxy)
+
+            if session in self.__session_uses:
+                self.__retired.add(session)
+            else:
+                self.__close_session(session)
+
+
+    def __close_session(self, session):
+        """
+        Private method closing a session in the background, keeping track of it until it has closed.
+        """
+
+        task = asyncio.ensure_future(session.close())
+        self.__closing.add(task)
+        task.add_done_callback(self.__closing.discard)
+
+
+    def __log_error(self, message):
+        """
+        Private method logging a failure to both the log file and console.
+        """
+
+        if self.__logger is not None:
+            self.__logger.error(message)
+        print(message)
@@ -0,0 +1,283 @@
+import time
+import threading
+
+class ShareState:
+    """
+    The token bucket of a single bandwidth share: the bytes it may still read without waiting, when the bucket
+    was last refilled, and when the share last read so idle shares can leave their bandwidth to the others.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    def __init__(self, weight, now):
+        """
+        Constructor which accepts the weight of the share.
+
+        @param weight: float - The weight of the share relative to every other active share.
+        @param now: float - The current monotonic time.
+        """
+
+        self.weight = float(weight)
+        self.tokens = 0.0
+        self.refilled = now
+        self.last_read = now
+
+
+class BandwidthGovernor:
+    """
+    A token bucket bandwidth limiter capping the bytes per second read by every download of a run, so a full
+    resolution HIMAWARI or GOES run does not saturate a link shared with other traffic. Downloads are grouped
+    into weighted shares by product or satellite, and the cap is divided between the shares currently reading
+    in proportion to their weights, so an idle share never holds bandwidth back. Buckets only hold a tenth of a
+    second of their rate and reads are sliced to that size, which keeps downloads streaming at a steady pace
+    rather than in bursts followed by long pauses.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    DEFAULT_SHARE = 'default'
+    SMOOTHING_SECONDS = 0.1
+    ACTIVE_SECONDS = 1.0
+    MIN_READ_SIZE = 4 * 1024
+
+    def __init__(self, rate, shares=None, logger=None):
+        """
+        Constructor which accepts the cap and the weighted shares.
+
+        @param rate: float - The maximum number of bytes per second read across every download.
+        @param shares: {} - An optional mapping of a product or satellite name to its weight, 1 for anything else.
+        @param logger: Logger - An optional logger used to record the configured cap.
+        """
+
+        self.__rate = float(rate)
+        self.__weights = dict(shares or {})
+        self.__states = {}
+        self.__lock = threading.Lock()
+
+        if self.__rate <= 0:
+            raise ValueError("The bandwidth cap must be positive.")
+
+        if logger is not None:
+            logger.info("Bandwidth capped at " + str(int(self.__rate)) + " bytes/sec with shares " + str(self.__weights) + ".")
+
+
+    def get_share(self, title, satellite=''):
+        """
+        Returns the share a download belongs to, the first configured name found in its title or matching
+        the satellite name.
+
+        @param title: str - A string containing the following standard format: 'TITLE - DATE - HH-MM UTC'
+        @param satellite: str - The name of the satellite the download is made for.
+        @return share: str - The name of the share.
+        """
+
+        for name in self.__weights:
+            if name.lower() in title.lower() or name.lower() == satellite.lower():
+                return name
+
+        return self.DEFAULT_SHARE
+
+
+    def get_read_size(self, share, size):
+        """
+        Returns how many bytes a download in a share should read at once to keep its pace smooth.
+
+        @param share: str - The name of the share.
+        @param size: int - The number of bytes the caller asked for.
+        @return size: int - The number of bytes to read.
+        """
+
+        with self.__lock:
+            rate = self.__get_rate(share, time.monotonic())
+
+        return max(self.MIN_READ_SIZE, min(size, int(rate * self.SMOOTHING_SECONDS)))
+
+
+    def reserve(self, share, count):
+        """
+        Takes the tokens for bytes which were read and returns how long the reader must pause to stay within
+        the rate of its share. Used directly by the asyncio path, which sleeps without blocking the loop.
+
+        @param share: str - The name of the share.
+        @param count: int - The number of bytes which were read.
+        @return delay: float - The number of seconds to wait before reading again.
+        """
+
+        with self.__lock:
+            now = time.monotonic()
+            state = self.__get_state(share, now)
+            rate = self.__get_rate(share, now)
+
+            state.tokens = min(rate * self.SMOOTHING_SECONDS, state.tokens + (now - state.refilled) * rate)
+            state.refilled = now
+            state.last_read = now
+            state.tokens -= count
+
+            return max(0.0, -state.tokens / rate)
+
+
+    def throttle(self, share, count):
+        """
+        Takes the tokens for bytes which were read, blocking the calling thread as long as needed.
+
+        @param share: str - The name of the share.
+        @param count: int - The number of bytes which were read.
+        """
+
+        delay = self.reserve(share, count)
+
+        if delay > 0:
+            time.sleep(delay)
+
+
+    def __get_state(self, share, now):
+        """
+        Private method returning the state of a share, creating it on first use. Must be called while holding
+        the lock.
+        """
+
+        state = self.__states.get(share)
+
+        if state is None:
+            state = ShareState(self.__weights.get(share, 1.0), now)
+            self.__states[share] = state
+
+        return state
+
+
+    def __get_rate(self, share, now):
+        """
+        Private method returning the bytes per second a share may currently read, its weighted part of the cap
+        among the shares which read recently. Must be called while holding the lock.
+        """
+
+        weight = self.__get_state(share, now).weight
+        active = sum(state.weight for name, state in self.__states.items() \
+            if name == share or now - state.last_read <= self.ACTIVE_SECONDS)
+
+        return self.__rate * weight / active
+
+
+class ThrottledStream:
+    """
+    Wraps a response body so that every read is sliced and paced by a BandwidthGovernor. Reading less at a
+    time lets TCP flow control slow the sender down instead of letting the response arrive in bursts.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    def __init__(self, raw, governor, share):
+        """
+        Constructor which accepts the stream and the share it is read under.
+
+        @param raw: file - A readable binary stream such as Response.raw or an FTP response.
+        @param governor: BandwidthGovernor - The governor pacing the reads.
+        @param share: str - The name of the share the download belongs to.
+        """
+
+        self.__raw = raw
+        self.__share = share
+        self.__governor = governor
+
+
+    @property
+    def decode_content(self):
+        return self.__raw.decode_content
+
+
+    @decode_content.setter
+    def decode_content(self, value):
+        self.__raw.decode_content = value
+
+
+    def read(self, size=-1):
+        """
+        Reads up to size bytes, or a paced slice of them.
+        """
+
+        if size is None or size < 0:
+            size = 1 << 30
+
+        data = self.__raw.read(self.__governor.get_read_size(self.__share, size))
+        self.__governor.throttle(self.__share, len(data))
+
+        return data
+
+
+    def readinto(self, b):
+        """
+        Reads a paced slice of bytes into a buffer.
+        """
+
+        view = memoryview(b)[:self.__governor.get_read_size(self.__share, len(b))]
+        readinto = getattr(self.__raw, 'readinto', None)
+
+        if readinto is not None:
+            count = readinto(view)
+        else:
+            data = self.__raw.read(len(view))
+            count = len(data)
+            view[:count] = data
+
+        self.__governor.throttle(self.__share, count or 0)
+
+        return count
+
+
+    def __getattr__(self, name):
+        """
+        Passes every other attribute through to the wrapped stream.
+        """
+
+        if name.startswith('_ThrottledStream__'):
+            raise AttributeError(name)
+
+        return getattr(self.__raw, name)
+
+
+def parse_rate(value):
+    """
+    Parses a rate in bytes per second with an optional K, M or G suffix. Ex: '500K' or '12.5M'.
+
+    @param value: str - A string containing the rate.
+    @return rate: float - The number of bytes per second.
+    """
+
+    value = value.strip().upper().rstrip('B')
+    multipliers = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+    if value and value[-1] in multipliers:
+        return float(value[:-1]) * multipliers[value[-1]]
+
+    return float(value)
+
+
+def parse_shares(spec):
+    """
+    Parses a comma separated list of NAME=WEIGHT shares, where NAME is a product found in image titles or a
+    satellite name. Ex: 'GeoColor=3,Band 13=1'.
+
+    @param spec: str - A string containing the share specification.
+    @return shares: {} - A mapping of share names to their weights.
+    """
+
+    shares = {}
+
+    for entry in spec.split(','):
+        if entry.strip() == '':
+            continue
+
+        name, _, weight = entry.rpartition('=')
+
+        if name.strip() == '' or float(weight) <= 0:
+            raise ValueError("Invalid share '" + entry.strip() + "', expected NAME=WEIGHT.")
+
+        shares[name.strip()] = float(weight)
+
+    return shares
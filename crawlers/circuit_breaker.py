@@ -0,0 +1,195 @@
+import time
+import threading
+from crawlers.retry import DownloadError
+
+class BreakerState:
+    """
+    The circuit state of a single host: whether requests are let through, the number of consecutive failures,
+    when the circuit last opened, and whether the single probe of a half open circuit is in flight.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    def __init__(self):
+        """
+        Constructor creating the state of a healthy host.
+        """
+
+        self.state = CircuitBreaker.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker kept per host which stops a source that is down from costing the whole run. When MOSDAC or
+    KMA stop answering, every generated link would otherwise still pay for a Tor request, a timeout and a new
+    circuit. After a run of consecutive timeouts, connection failures or server errors the circuit of the host
+    opens and its queued links are held back without a request. Once the cool-down has passed the circuit is
+    half open and a single probe is let through: a response closes the circuit again and releases the links
+    held back, while another failure reopens it for a further cool-down and the links held back are failed.
+    Throttling is left to the retry policy and host limiter, and says nothing about whether a source is up.
+
+    @author Vincent.Nigro
+    @version 0.0.3
+    @modified 10/16/26
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    DEFAULT_THRESHOLD = 5
+    DEFAULT_COOLDOWN = 60.0
+
+    FAILURES = (DownloadError.TIMEOUT, DownloadError.CONNECTION, DownloadError.SERVER_ERROR)
+    NEUTRAL = (DownloadError.THROTTLED, DownloadError.DEADLINE, DownloadError.UNAVAILABLE)
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, cooldown=DEFAULT_COOLDOWN, logger=None):
+        """
+        Constructor which accepts when a circuit opens and for how long.
+
+        @param threshold: int - The number of consecutive failures after which the circuit of a host opens.
+        @param cooldown: float - The number of seconds an open circuit waits before letting a probe through.
+        @param logger: Logger - An optional logger used to record circuits opening and closing.
+        """
+
+        self.__logger = logger
+        self.__hosts = {}
+        self.__lock = threading.Lock()
+        self.__threshold = max(1, int(threshold))
+        self.__cooldown = max(0.0, float(cooldown))
+
+
+    def allow(self, host):
+        """
+        Returns whether a request may be sent to a host. The first caller after the cool-down of an open circuit
+        is handed the probe, and must report its outcome with record() or release().
+
+        @param host: str - A string containing the host name.
+        @return allowed: bool - True if the request may be sent.
+        """
+
+        with self.__lock:
+            state = self.__get_state(host)
+
+            if state.state == self.OPEN and time.monotonic() - state.opened_at >= self.__cooldown:
+                state.state = self.HALF_OPEN
+                state.probing = False
+
+            if state.state == self.HALF_OPEN:
+                if state.probing:
+                    return False
+
+                state.probing = True
+                return True
+
+            return state.state == self.CLOSED
+
+
+    def record(self, host, error=None):
+        """
+        Updates the circuit of a host from the outcome of a request.
+
+        @param host: str - A string containing the host name.
+        @param error: DownloadError - The classified failure, None if the host answered.
+        @return probe_failed: bool - True if the failure was that of the probe of a half open circuit.
+        """
+
+        with self.__lock:
+            state = self.__get_state(host)
+
+            if error is not None and error.kind in self.NEUTRAL:
+                state.probing = False
+            elif error is not None and error.kind in self.FAILURES:
+                state.failures += 1
+                probe_failed = state.state == self.HALF_OPEN
+
+                if probe_failed or (state.state == self.CLOSED and state.failures >= self.__threshold):
+                    self.__open(host, state)
+
+                return probe_failed
+            else:
+                # Any response, even a 404 for an image which is not published yet, shows the source is up
+                if state.state != self.CLOSED:
+                    self.__log("Circuit closed for host " + host + ", it is answering again.")
+
+                state.state = self.CLOSED
+                state.failures = 0
+                state.probing = False
+
+            return False
+
+
+    def release(self, host):
+        """
+        Returns the probe of a half open circuit when no request was sent, such as for a file already on disk.
+
+        @param host: str - A string containing the host name.
+        """
+
+        with self.__lock:
+            self.__get_state(host).probing = False
+
+
+    def __open(self, host, state):
+        """
+        Private method opening the circuit of a failing host. Must be called while holding the lock.
+        """
+
+        if state.state == self.HALF_OPEN:
+            self.__log("Probe of host " + host + " failed, skipping it for another " + "{:.1f}".format(self.__cooldown) + " seconds.")
+        else:
+            self.__log("Circuit opened for host " + host + " after " + str(state.failures) + \
+                " consecutive failures, skipping it for " + "{:.1f}".format(self.__cooldown) + " seconds.")
+
+        state.state = self.OPEN
+        state.opened_at = time.monotonic()
+        state.probing = False
+
+
+    def __log(self, message):
+        """
+        Private method logging a change of circuit to both the log file and console.
+        """
+
+        if self.__logger is not None:
+            self.__logger.warning(message)
+        print(message)
+
+
+    def __get_state(self, host):
+        """
+        Private method returning the state of a host, creating it on first use. Must be called while holding
+        the lock.
+        """
+
+        state = self.__hosts.get(host)
+
+        if state is None:
+            state = BreakerState()
+            self.__hosts[host] = state
+
+        return state
+
+
+def parse_breaker(spec):
+    """
+    Parses a circuit breaker given as THRESHOLD or THRESHOLD:COOLDOWN, the number of consecutive failures which
+    open a circuit and the number of seconds it stays open. Ex: '5:60'.
+
+    @param spec: str - A string containing the breaker specification.
+    @return threshold, cooldown: int, float - The failure threshold and cool-down.
+    """
+
+    threshold, _, cooldown = spec.partition(':')
+    threshold = int(threshold)
+    cooldown = float(cooldown) if cooldown.strip() != '' else CircuitBreaker.DEFAULT_COOLDOWN
+
+    if threshold < 1 or cooldown < 0:
+        raise ValueError("Invalid circuit breaker '" + spec + "', expected THRESHOLD[:COOLDOWN].")
+
+    return threshold, cooldown
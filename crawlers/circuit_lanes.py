@@ -0,0 +1,177 @@
+import asyncio
+import secrets
+import weakref
+import threading
+from urllib.parse import urlsplit
+
+class CircuitLane:
+    """
+    A circuit lane is a unique SOCKS username/password pair. Tor isolates streams by SOCKS credentials
+    (IsolateSOCKSAuth, enabled by default on every SocksPort), so each lane is carried on its own circuit
+    and its own exit relay while sharing the same local Tor client. Usernames carry a prefix unique to the
+    process, which tells its streams apart from those of other applications sharing the Tor client.
+
+    @author Vincent.Nigro
+    @version 0.0.2
+    @modified 10/16/26
+    """
+
+    USERNAME_PREFIX = 'satpy-' + secrets.token_hex(4) + '-'
+
+    def __init__(self, name):
+        """
+        Constructor which accepts the name of the lane. The credentials are randomized per run so lanes
+        from a previous run never share a circuit with the current one.
+
+        @param name: str - A string naming the lane, used as part of the SOCKS username.
+        """
+
+        self.__name = name
+        self.__generation = 0
+        self.__token = secrets.token_hex(8)
+
+
+    def renew(self):
+        """
+        Changes the lane credentials so that the next stream is placed on a fresh circuit.
+
+        @return retired: str - The SOCKS username the lane used until now.
+        """
+
+        retired = self.get_username()
+        self.__generation += 1
+        self.__token = secrets.token_hex(8)
+
+        return retired
+
+
+    def get_proxies(self, address='localhost', port=9050):
+        """
+        Builds the requests proxy mapping which routes through the Tor SocksPort with this lanes' credentials.
+
+        @param address: str - The address the Tor SocksPort is listening on.
+        @param port: int - The Tor SocksPort.
+        @return proxies: {} - A requests proxy mapping for both http & https.
+        """
+
+        # socks5h hands the host name to Tor, which resolves it at the exit instead of leaking the lookup
+        proxy = 'socks5h://' + self.get_username() + ':' + self.__token + '@' + address + ':' + str(port)
+
+        return {"http": proxy, "https": proxy}
+
+
+    def get_username(self):
+        """
+        Public accessor method returning the SOCKS username of the lane.
+        """
+
+        return self.USERNAME_PREFIX + self.__name + '-' + str(self.__generation)
+
+
+    def get_name(self):
+        """
+        Public accessor method returning the name of the lane.
+        """
+
+        return self.__name
+
+
+    @classmethod
+    def is_own_username(cls, username):
+        """
+        Returns whether a SOCKS username belongs to a lane of this process.
+
+        @param username: str - The SOCKS username of a stream, None if it had none.
+        @return own: bool - True if the stream was opened by this process.
+        """
+
+        return username is not None and username.strip('"').startswith(cls.USERNAME_PREFIX)
+
+
+class LanePool:
+    """
+    Assigns circuit lanes to requests so that concurrent downloads are spread across several Tor circuits
+    instead of sharing the single current one. In 'worker' mode each download thread is pinned to a lane,
+    and in 'host' mode every host is pinned to a lane. Assignments are handed out round-robin. Downloads of
+    the asyncio path all run on the thread of the event loop, so in 'worker' mode each of their tasks is
+    pinned to a lane instead.
+
+    @author Vincent.Nigro
+    @version 0.0.2
+    @modified 10/16/26
+    """
+
+    WORKER_MODE = 'worker'
+    HOST_MODE = 'host'
+
+    def __init__(self, lanes=0, mode=WORKER_MODE):
+        """
+        Constructor which accepts the number of lanes and how they are assigned.
+
+        @param lanes: int - The number of lanes; 0 disables stream isolation.
+        @param mode: str - Either 'worker' or 'host'.
+        """
+
+        if mode not in (self.WORKER_MODE, self.HOST_MODE):
+            raise ValueError("Unknown lane mode '" + mode + "'.")
+
+        self.__mode = mode
+        self.__next = 0
+        self.__assigned = {}
+        self.__tasks = weakref.WeakKeyDictionary()
+        self.__lock = threading.Lock()
+        self.__lanes = [CircuitLane(str(i)) for i in range(0, max(0, int(lanes)))]
+
+
+    def get_lane(self, link):
+        """
+        Returns the lane which a request for the link should be carried on.
+
+        @param link: str - A string containing the URL being requested.
+        @return lane: CircuitLane - The assigned lane, or None if stream isolation is disabled.
+        """
+
+        if not self.__lanes:
+            return None
+
+        # Tasks are forgotten once they finish, so a run of thousands of them does not keep their lanes
+        assigned, key = self.__assigned, None
+
+        if self.__mode == self.HOST_MODE:
+            key = urlsplit(link).hostname or ''
+        else:
+            key = self.__get_task()
+
+            if key is None:
+                key = threading.get_ident()
+            else:
+                assigned = self.__tasks
+
+        with self.__lock:
+            index = assigned.get(key)
+
+            if index is None:
+                index = self.__next % len(self.__lanes)
+                assigned[key] = index
+                self.__next += 1
+
+            return self.__lanes[index]
+
+
+    def __get_task(self):
+        """
+        Private method returning the asyncio task the caller runs in, None when called outside of an event loop.
+        """
+
+        try:
+            return asyncio.current_task()
+        except RuntimeError:
+            return None
+
+
+    def get_lanes(self):
+        """
+        Public accessor method returning every lane in the pool.
+        """
+
+        return list(self.__lanes)
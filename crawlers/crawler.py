@@ -11,6 +11,7 @@ class Crawler:
 
     # Standard crawler fields
     OK_STATUS = 200
+    BAD_REQUEST_STATUS = 400
     UTC_STRING = 'UTC'
     SOUP_PARSER = 'lxml'
     ZIP_EXTENSION = '.zip'
@@ -0,0 +1,300 @@
+import time
+from urllib.parse import urlsplit
+
+class RequestTimeouts:
+    """
+    Connect and read timeouts applied to every request, with optional overrides per host. The connect timeout
+    bounds the SOCKS handshake and circuit setup while the read timeout bounds each wait for response bytes,
+    so a stalled Tor stream fails as a retryable timeout instead of holding a worker for the rest of the run.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    DEFAULT_CONNECT = 15.0
+    DEFAULT_READ = 60.0
+
+    def __init__(self, connect=DEFAULT_CONNECT, read=DEFAULT_READ):
+        """
+        Constructor which accepts the timeouts of hosts without an override.
+
+        @param connect: float - The number of seconds allowed to establish a connection.
+        @param read: float - The number of seconds allowed between bytes of a response.
+        """
+
+        self.__hosts = []
+        self.__default = (float(connect), float(read))
+
+
+    def set_host(self, pattern, connect, read):
+        """
+        Overrides the timeouts of a host.
+
+        @param pattern: str - A host name, or a domain suffix starting with '.' or '*.'.
+        @param connect: float - The number of seconds allowed to establish a connection.
+        @param read: float - The number of seconds allowed between bytes of a response.
+        """
+
+        self.__hosts.append((pattern.strip().lower().lstrip('*'), (float(connect), float(read))))
+
+
+    def get_timeout(self, link):
+        """
+        Returns the timeouts of the host of a link.
+
+        @param link: str - A string containing the URL being requested.
+        @return timeout: () - A (connect, read) tuple of seconds.
+        """
+
+        host = (urlsplit(link).hostname or '').lower()
+
+        for pattern, timeout in self.__hosts:
+            if pattern == host or (pattern.startswith('.') and host.endswith(pattern)):
+                return timeout
+
+        return self.__default
+
+
+def parse_timeouts(spec):
+    """
+    Parses a comma separated list of CONNECT:READ timeouts in seconds. An entry without a host sets the
+    default, and HOST=CONNECT:READ overrides a host or domain suffix. Ex: '15:60,.nsmc.org.cn=30:120'.
+
+    @param spec: str - A string containing the timeout specification.
+    @return timeouts: RequestTimeouts - The parsed timeouts.
+    """
+
+    default = (RequestTimeouts.DEFAULT_CONNECT, RequestTimeouts.DEFAULT_READ)
+    hosts = []
+
+    for entry in spec.split(','):
+        if entry.strip() == '':
+            continue
+
+        pattern, _, value = entry.rpartition('=')
+        connect, _, read = value.partition(':')
+
+        if read == '':
+            raise ValueError("Invalid timeout '" + entry.strip() + "', expected [HOST=]CONNECT:READ.")
+
+        if pattern.strip() == '':
+            default = (float(connect), float(read))
+        else:
+            hosts.append((pattern, float(connect), float(read)))
+
+    timeouts = RequestTimeouts(*default)
+
+    for pattern, connect, read in hosts:
+        timeouts.set_host(pattern, connect, read)
+
+    return timeouts
+
+
+class DeadlineExceeded(Exception):
+    """
+    Raised when a transfer in flight is cut off because the run deadline and its cutoff have passed.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    pass
+
+
+class RunDeadline:
+    """
+    A wall clock budget for a whole run so that scheduled runs never overlap, provided the budget plus the
+    cutoff fits within the interval between runs. Within the grace period before the deadline, low priority
+    work such as retries is no longer started. Once the deadline has passed no new downloads are started at
+    all, while those in flight are given until the cutoff to finish. At the cutoff their transfers are
+    aborted, keeping the bytes received in '.part' files for the next run to resume. Request timeouts are
+    shortened to end by the cutoff so a stalled read cannot outlast it either.
+
+    @author Vincent.Nigro
+    @version 0.0.3
+    @modified 10/16/26
+    """
+
+    DEFAULT_GRACE = 120.0
+    DEFAULT_CUTOFF = 60.0
+    MIN_TIMEOUT = 1.0
+
+    def __init__(self, seconds, grace=DEFAULT_GRACE, cutoff=DEFAULT_CUTOFF):
+        """
+        Constructor which starts the clock of the run.
+
+        @param seconds: float - The number of seconds the run may take.
+        @param grace: float - The number of seconds before the deadline in which only new work is started.
+        @param cutoff: float - The number of seconds past the deadline after which transfers in flight are aborted.
+        """
+
+        self.__end = time.monotonic() + float(seconds)
+        self.__grace = min(float(grace), float(seconds) / 2.0)
+        self.__cutoff = max(0.0, float(cutoff))
+
+
+    def get_remaining(self):
+        """
+        Returns the number of seconds left until the deadline, negative once it has passed.
+        """
+
+        return self.__end - time.monotonic()
+
+
+    def get_time_to_grace(self):
+        """
+        Returns the number of seconds left until the grace period begins, negative once it has begun.
+        """
+
+        return self.get_remaining() - self.__grace
+
+
+    def is_near(self):
+        """
+        Returns whether the grace period has begun and low priority work should no longer be started.
+        """
+
+        return self.get_time_to_grace() <= 0
+
+
+    def is_expired(self):
+        """
+        Returns whether the deadline has passed and no new work should be started.
+        """
+
+        return self.get_remaining() <= 0
+
+
+    def allows_retry(self, delay):
+        """
+        Returns whether a retry waiting out a backoff would still start before the grace period.
+
+        @param delay: float - The number of seconds the retry would wait.
+        @return allowed: bool - True if the retry is worth queueing.
+        """
+
+        return self.get_time_to_grace() > delay
+
+
+    def get_time_to_cutoff(self):
+        """
+        Returns the number of seconds left until transfers in flight are aborted, negative once they are.
+        """
+
+        return self.get_remaining() + self.__cutoff
+
+
+    def is_cut_off(self):
+        """
+        Returns whether the cutoff has passed and transfers in flight should be aborted.
+        """
+
+        return self.get_time_to_cutoff() <= 0
+
+
+    def limit_timeout(self, timeout):
+        """
+        Shortens the timeouts of a request so that neither connecting nor a single read waits past the cutoff.
+
+        @param timeout: () - A (connect, read) tuple of seconds.
+        @return timeout: () - The (connect, read) tuple, each at most the time left until the cutoff.
+        """
+
+        left = max(self.MIN_TIMEOUT, self.get_time_to_cutoff())
+
+        return (min(timeout[0], left), min(timeout[1], left))
+
+
+class DeadlineStream:
+    """
+    Wraps a response body so that it is cut off once the run deadline and its cutoff have passed. Reads
+    raise DeadlineExceeded from then on, as do the failures of reads which were interrupted by timeouts
+    shortened to the cutoff.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    def __init__(self, raw, deadline, title):
+        """
+        Constructor which accepts the stream and the deadline it is read under.
+
+        @param raw: file - A readable binary stream such as Response.raw or an FTP response.
+        @param deadline: RunDeadline - The deadline of the run.
+        @param title: str - A string containing the title of the download, used in the error message.
+        """
+
+        self.__raw = raw
+        self.__title = title
+        self.__deadline = deadline
+
+
+    @property
+    def decode_content(self):
+        return self.__raw.decode_content
+
+
+    @decode_content.setter
+    def decode_content(self, value):
+        self.__raw.decode_content = value
+
+
+    def read(self, size=-1):
+        """
+        Reads up to size bytes unless the cutoff has passed.
+        """
+
+        return self.__call(self.__raw.read, size)
+
+
+    def readinto(self, b):
+        """
+        Reads bytes into a buffer unless the cutoff has passed.
+        """
+
+        readinto = getattr(self.__raw, 'readinto', None)
+
+        if readinto is not None:
+            return self.__call(readinto, b)
+
+        data = self.__call(self.__raw.read, len(b))
+        memoryview(b)[:len(data)] = data
+
+        return len(data)
+
+
+    def __call(self, read, arg):
+        """
+        Private method performing a read, raising DeadlineExceeded if the cutoff passed before or during it.
+        """
+
+        self.__check()
+
+        try:
+            return read(arg)
+        except Exception as e:
+            self.__check(e)
+            raise
+
+
+    def __check(self, cause=None):
+        """
+        Private method raising DeadlineExceeded once the cutoff has passed.
+        """
+
+        if self.__deadline.is_cut_off():
+            raise DeadlineExceeded(self.__title + " was cut off at the run deadline.") from cause
+
+
+    def __getattr__(self, name):
+        """
+        Passes every other attribute through to the wrapped stream.
+        """
+
+        if name.startswith('_DeadlineStream__'):
+            raise AttributeError(name)
+
+        return getattr(self.__raw, name)
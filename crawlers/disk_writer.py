@@ -0,0 +1,340 @@
+import threading
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from crawlers.stream_copier import StreamCopier
+from crawlers.stream_copier import drop_pages
+from crawlers.retry import classify_exception
+
+class DiskWriter:
+    """
+    A small pool of writer threads which carries out the file system work of downloads on behalf of the
+    network workers: opening and preallocating '.part' files, writing the buffers read from responses, and
+    committing or extracting the completed files. Network workers hand buffers over through StagedDownload
+    and move on to their next request, so a slow disk no longer stalls sockets. Buffers waiting to be written
+    are bounded in bytes, which blocks the network workers once the disk falls behind.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    DEFAULT_THREADS = 2
+    DEFAULT_MAX_QUEUED_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, threads=DEFAULT_THREADS, max_queued_bytes=DEFAULT_MAX_QUEUED_BYTES, drop_cache=False, logger=None):
+        """
+        Constructor which accepts the size of the pool and of its queue.
+
+        @param threads: int - The number of writer threads.
+        @param max_queued_bytes: int - The number of buffered bytes after which network workers are blocked.
+        @param drop_cache: bool - True to drop written pages from the page cache with posix_fadvise.
+        @param logger: Logger - An optional logger used to record write failures.
+        """
+
+        self.__logger = logger
+        self.__drop_cache = drop_cache
+        self.__max_queued_bytes = max(1, int(max_queued_bytes))
+        self.__executor = ThreadPoolExecutor(max_workers=max(1, int(threads)), thread_name_prefix='disk-writer')
+
+        self.__queued_bytes = 0
+        self.__condition = threading.Condition()
+
+
+    def stage(self, download):
+        """
+        Wraps a download so that its file system work is carried out by the writer threads.
+
+        @param download: PartialDownload - The download to stage, or a ZipSpool.
+        @return staged: StagedDownload - A stand-in for the download whose writes are queued.
+        """
+
+        return StagedDownload(self, download, self.__drop_cache)
+
+
+    def close(self):
+        """
+        Waits for every queued write and stops the writer threads.
+        """
+
+        self.__executor.shutdown(wait=True)
+
+
+    def _reserve(self, size):
+        """
+        Protected method blocking the calling network worker until a buffer of the given size fits in the queue.
+        A buffer larger than the whole queue is let through once the queue is empty.
+
+        @param size: int - The number of bytes about to be queued.
+        """
+
+        with self.__condition:
+            while self.__queued_bytes > 0 and self.__queued_bytes + size > self.__max_queued_bytes:
+                self.__condition.wait()
+
+            self.__queued_bytes += size
+
+
+    def _release(self, size):
+        """
+        Protected method returning the space of a written buffer to the queue.
+
+        @param size: int - The number of bytes which were written.
+        """
+
+        with self.__condition:
+            self.__queued_bytes -= size
+            self.__condition.notify_all()
+
+
+    def _submit(self, drain):
+        """
+        Protected method running a staged download's queued jobs on a writer thread.
+
+        @param drain: function - A callable running the jobs of one staged download in order.
+        """
+
+        self.__executor.submit(drain)
+
+
+    def _log_error(self, message):
+        """
+        Protected method logging a failure to both the log file and console.
+        """
+
+        if self.__logger is not None:
+            self.__logger.error(message)
+        print(message)
+
+
+class StagedDownload:
+    """
+    Stands in for a PartialDownload or ZipSpool while its file system work is queued on a DiskWriter. Opening,
+    writing and closing are recorded as jobs which the writer threads run strictly in order, one download at
+    a time, and then() schedules the final commit once every write has been carried out. Its future fails
+    with a classified DownloadError, so a full disk or a corrupt archive is retried or recorded like any
+    other failure of the download. Every other method is passed through to the wrapped download.
+
+    Segmented downloads are the exception: open_segments() and finish_segments() are passed through, and the
+    segment threads write their byte ranges straight into the preallocated '.part' file. Ranges land at their
+    own offsets while they arrive, which the in-order jobs of a writer thread cannot carry out, and the
+    network worker already waits on the segments rather than on the disk.
+
+    @author Vincent.Nigro
+    @version 0.0.2
+    @modified 10/16/26
+    """
+
+    def __init__(self, writer, download, drop_cache=False):
+        """
+        Constructor which accepts the writer carrying out the jobs and the download they apply to.
+
+        @param writer: DiskWriter - The writer pool the jobs are queued on.
+        @param download: PartialDownload - The download being staged, or a ZipSpool.
+        @param drop_cache: bool - True to drop written pages from the page cache with posix_fadvise.
+        """
+
+        self.__writer = writer
+        self.__download = download
+        self.__drop_cache = drop_cache
+
+        self.__file = None
+        self.__error = None
+        self.__start = 0
+        self.__written = 0
+        self.__dropped = 0
+        self.__jobs = deque()
+        self.__draining = False
+        self.__lock = threading.Lock()
+
+
+    def open(self, status, headers=None):
+        """
+        Queues the opening of the download for the response to the latest request.
+
+        @param status: int - The HTTP status code of the response, or 200 for protocols without ranges.
+        @param headers: {} - The response headers.
+        @return f: StagedDownload - The staged download, whose writes are queued.
+        """
+
+        self.__enqueue(lambda: self.__open(status, headers))
+
+        return self
+
+
+    def write(self, data):
+        """
+        Queues a copy of a buffer to be written, blocking while the writer queue is full.
+
+        @param data: bytes - The bytes to write, which may be a reused buffer.
+        @return count: int - The number of bytes queued.
+        """
+
+        data = bytes(data)
+        self.__writer._reserve(len(data))
+        self.__enqueue(lambda: self.__write(data), len(data))
+
+        return len(data)
+
+
+    def close(self):
+        """
+        Queues the closing of the file opened by open().
+        """
+
+        self.__enqueue(self.__close)
+
+
+    def then(self, job):
+        """
+        Queues a job to run once every earlier job of the download has been carried out.
+
+        @param job: function - A callable run on a writer thread, typically committing the download.
+        @return future: Future - A future holding the result of the job, or the first error of the download
+        classified as a DownloadError.
+        """
+
+        future = Future()
+
+        def run():
+            if self.__error is not None:
+                self.__fail(future, self.__error)
+                return
+
+            try:
+                future.set_result(job())
+            except Exception as e:
+                self.__fail(future, e)
+
+        self.__enqueue(run)
+
+        return future
+
+
+    def __fail(self, future, e):
+        """
+        Private method failing the future of a job with the classified error of the download.
+        """
+
+        error = classify_exception(e)
+        if error is not e:
+            error.__cause__ = e
+
+        future.set_exception(error)
+
+
+    def __open(self, status, headers):
+        """
+        Private job opening the wrapped download.
+        """
+
+        self.__file = self.__download.open(status, headers)
+        self.__start = self.__file.tell() if self.__drop_cache and hasattr(self.__file, 'fileno') else 0
+
+
+    def __write(self, data):
+        """
+        Private job writing a buffer, dropping written pages from the page cache when configured to.
+        """
+
+        if self.__file is None or self.__error is not None:
+            return
+
+        written = 0
+        while written < len(data):
+            result = self.__file.write(data[written:])
+            written = len(data) if result is None else written + result
+
+        self.__written += len(data)
+
+        if self.__drop_cache and self.__written - self.__dropped >= StreamCopier.DROP_CACHE_INTERVAL:
+            self.__drop()
+
+
+    def __close(self):
+        """
+        Private job closing the wrapped download's file.
+        """
+
+        if self.__file is None:
+            return
+
+        if self.__drop_cache and self.__written > self.__dropped:
+            self.__drop()
+
+        self.__file.close()
+        self.__file = None
+
+
+    def __drop(self):
+        """
+        Private method dropping the pages written since the last drop from the page cache.
+        """
+
+        try:
+            drop_pages(self.__file, self.__file.fileno(), self.__start + self.__dropped, self.__written - self.__dropped)
+        except (AttributeError, OSError, ValueError):
+            pass
+
+        self.__dropped = self.__written
+
+
+    def __enqueue(self, job, size=0):
+        """
+        Private method appending a job and handing the download to a writer thread unless one is already
+        running its jobs.
+        """
+
+        with self.__lock:
+            self.__jobs.append((job, size))
+
+            if self.__draining:
+                return
+
+            self.__draining = True
+
+        self.__writer._submit(self.__drain)
+
+
+    def __drain(self):
+        """
+        Private method run on a writer thread which carries out the queued jobs of the download in order.
+        A failed job is recorded and the remaining writes are skipped, while closing and then() still run.
+        """
+
+        while True:
+            with self.__lock:
+                if not self.__jobs:
+                    self.__draining = False
+                    return
+
+                job, size = self.__jobs.popleft()
+
+            try:
+                job()
+            except Exception as e:
+                if self.__error is None:
+                    self.__error = e
+                    self.__writer._log_error("Writing " + str(self.__download.get_path()) + " failed: " + str(e))
+            finally:
+                if size:
+                    self.__writer._release(size)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args):
+        self.close()
+
+
+    def __getattr__(self, name):
+        """
+        Passes every other method through to the wrapped download.
+        """
+
+        if name.startswith('_StagedDownload__'):
+            raise AttributeError(name)
+
+        return getattr(self.__download, name)
@@ -0,0 +1,457 @@
+import time
+import heapq
+import threading
+from collections import deque
+from collections import OrderedDict
+from concurrent.futures import Future
+from urllib.parse import urlsplit
+from crawlers.retry import DownloadError
+
+class DownloadScheduler:
+    """
+    A bounded download scheduler which replaces spawning a thread per image link. A fixed pool of worker
+    threads pulls (title, link) work items off of a queue and hands each one to a download function. Items
+    are queued per host so that a single host can never occupy more than its configured number of workers,
+    while the remaining workers continue servicing other hosts. The number of threads alive during a run is
+    therefore bounded by the worker count regardless of how many links a crawler generates.
+
+    When a download raises a retryable DownloadError and a RetryPolicy is given, the item is held in a delayed
+    queue for its backoff period and then queued again behind its host, so a waiting retry never occupies a
+    worker. Permanent failures are recorded and dropped immediately.
+
+    When an AdaptiveHostLimiter is given, it replaces the fixed per-host cap. The outcome and latency of every
+    download is reported to it, and hosts it is holding back are polled until they are allowed again.
+
+    When a RunDeadline is given, retries are no longer started once its grace period begins, and no item is
+    started after it has passed. Items left unstarted are recorded as failed so the run ends once the
+    downloads in flight have finished.
+
+    A download function may return a Future when the rest of its work, such as writing to disk, is carried
+    out elsewhere. The worker and its host slot are then released at once, and the outcome of the item is
+    handled when the Future completes, so network concurrency is sized independently of the disk.
+
+    When a CircuitBreaker is given, the outcome of every download is reported to it. Once the circuit of a
+    host opens, its queued and delayed items are parked without being started. After the cool-down a single
+    item is let through to probe the host while the others wait for its outcome: they are started again if
+    the probe succeeds, and recorded as failed if it fails.
+
+    @author Vincent.Nigro
+    @version 0.0.6
+    @modified 10/16/26
+    """
+
+    DEFAULT_WORKERS = 16
+    DEFAULT_HOST_LIMIT = 8
+    DEFAULT_MAX_QUEUED = 4096
+    BLOCKED_POLL_SECONDS = 1.0
+
+    def __init__(self, download, workers=DEFAULT_WORKERS, host_limit=DEFAULT_HOST_LIMIT, max_queued=DEFAULT_MAX_QUEUED,
+        logger=None, retry_policy=None, on_retry=None, host_limiter=None, deadline=None, breaker=None):
+        """
+        Constructor which accepts the function performing a single download and the sizing of the pool.
+
+        @param download: function - A callable accepting (title, link) which downloads a single image, returning
+        False if it was skipped without a request, or a Future completing once the download has been stored.
+        @param workers: int - The total number of worker threads servicing the work queue.
+        @param host_limit: int - The maximum number of workers allowed to download from a single host at once.
+        @param max_queued: int - The maximum number of queued items before submit() blocks the producer.
+        @param logger: Logger - An optional logger used to record worker failures.
+        @param retry_policy: RetryPolicy - An optional policy deciding whether and when failed items are retried.
+        @param on_retry: function - An optional callable accepting (title, link, error) invoked before an item is
+        retried, used to move the retry onto a fresh circuit.
+        @param host_limiter: AdaptiveHostLimiter - An optional controller adjusting each host's cap at runtime.
+        @param deadline: RunDeadline - An optional deadline after which no further items are started.
+        @param breaker: CircuitBreaker - An optional breaker failing the items of hosts which keep failing.
+        """
+
+        self.__download = download
+        self.__workers = max(1, int(workers))
+        self.__host_limit = max(1, int(host_limit))
+        self.__max_queued = max(1, int(max_queued))
+        self.__logger = logger
+        self.__on_retry = on_retry
+        self.__retry_policy = retry_policy
+        self.__host_limiter = host_limiter
+        self.__deadline = deadline
+        self.__breaker = breaker
+
+        self.__queued = 0
+        self.__sequence = 0
+        self.__failed = []
+        self.__delayed = []
+        self.__in_flight = 0
+        self.__closed = False
+        self.__threads = []
+        self.__active = {}
+        self.__pending = OrderedDict()
+        self.__condition = threading.Condition()
+
+
+    def start(self):
+        """
+        Starts the worker threads. Workers are daemon threads so that a ctrl-c on the main thread is not
+        held up by a stalled download.
+        """
+
+        for i in range(0, self.__workers):
+            thread = threading.Thread(target=self.__work, name='download-worker-' + str(i), daemon=True)
+            thread.start()
+            self.__threads.append(thread)
+
+        return self
+
+
+    def submit(self, title, link):
+        """
+        Queues a single image link for download. Blocks the caller while the queue is full, which keeps
+        memory flat when a crawler produces a very large link set.
+
+        @param title: str - A string containing the standard title format 'TITLE - DATE - HH-MM UTC'.
+        @param link: str - A string containing the full link to the image to be downloaded.
+        """
+
+        host = self._get_host(link)
+
+        with self.__condition:
+            while self.__queued >= self.__max_queued and not self.__closed:
+                self.__condition.wait()
+
+            if self.__closed:
+                raise RuntimeError("Cannot submit work to a closed download scheduler.")
+
+            self.__pending.setdefault(host, deque()).append((title, link, 1))
+            self.__queued += 1
+            self.__condition.notify_all()
+
+
+    def submit_all(self, links):
+        """
+        Queues every entry of a key-value mapping of title to link.
+
+        @param links: {} - A key-value mapping of a title key in a standard format and its appropriate image link.
+        """
+
+        for title, link in links.items():
+            self.submit(title, link)
+
+
+    def wait(self):
+        """
+        Blocks until every queued and in-flight item has finished, then stops the worker threads.
+        """
+
+        with self.__condition:
+            while self.__queued > 0 or self.__in_flight > 0:
+                self.__condition.wait()
+
+            self.__closed = True
+            self.__condition.notify_all()
+
+        for thread in self.__threads:
+            thread.join()
+
+
+    def __next_item(self):
+        """
+        Private method which pops the next item belonging to a host that is below its concurrency cap. Hosts
+        are visited in a round-robin order so one large host cannot starve the others. Must be called while
+        holding the condition lock.
+
+        @return host, item: str, () - The host and (title, link, attempt) item, or (None, None) if none is eligible.
+        """
+
+        # Retries whose backoff has passed rejoin the queue of their host
+        now = time.monotonic()
+        while self.__delayed and self.__delayed[0][0] <= now:
+            ready, sequence, host, item = heapq.heappop(self.__delayed)
+            self.__pending.setdefault(host, deque()).append(item)
+
+        if self.__deadline is not None and self.__deadline.is_expired():
+            self.__drop_unstarted()
+            return None, None
+
+        for host in list(self.__pending.keys()):
+            items = self.__pending[host]
+
+            if self.__active.get(host, 0) >= self._get_host_limit(host):
+                continue
+
+            item = items.popleft()
+
+            # Retries are low priority work which is given up once the grace period begins
+            while item is not None and item[2] > 1 and self.__deadline is not None and self.__deadline.is_near():
+                self.__drop(item)
+                item = items.popleft() if items else None
+
+            if item is None:
+                del self.__pending[host]
+                continue
+
+            # Items of a host whose circuit is open are parked until the cool-down lets a probe through
+            if self.__breaker is not None and not self.__breaker.allow(host):
+                items.appendleft(item)
+                continue
+
+            # Move host to the back of the rotation, dropping it entirely once drained
+            del self.__pending[host]
+            if items:
+                self.__pending[host] = items
+
+            return host, item
+
+        return None, None
+
+
+    def __work(self):
+        """
+        Private worker loop which waits for an eligible item, downloads it, and releases its host slot.
+        """
+
+        while True:
+            with self.__condition:
+                host, item = self.__next_item()
+
+                while item is None:
+                    if self.__closed:
+                        return
+
+                    # Wake up in time for the earliest delayed retry, or to poll hosts being held back
+                    timeout = None
+                    if self.__delayed:
+                        timeout = max(0, self.__delayed[0][0] - time.monotonic())
+                    if (self.__host_limiter is not None or self.__breaker is not None) and self.__pending:
+                        timeout = min(timeout, self.BLOCKED_POLL_SECONDS) if timeout is not None else self.BLOCKED_POLL_SECONDS
+                    if self.__deadline is not None and (self.__pending or self.__delayed):
+                        wake = max(0, self.__deadline.get_time_to_grace()) or max(0, self.__deadline.get_remaining())
+                        timeout = min(timeout, wake) if timeout is not None else wake
+
+                    self.__condition.wait(timeout)
+                    host, item = self.__next_item()
+
+                self.__queued -= 1
+                self.__in_flight += 1
+                self.__active[host] = self.__active.get(host, 0) + 1
+
+                # A queue slot has been freed for a blocked producer
+                self.__condition.notify_all()
+
+            start = time.monotonic()
+            stored = None
+
+            try:
+                downloaded = self.__download(item[0], item[1])
+
+                if isinstance(downloaded, Future):
+                    stored = downloaded
+                else:
+                    self.__complete(host, item, start, downloaded)
+            except Exception as e:
+                self.__complete(host, item, start, error=e)
+            finally:
+                with self.__condition:
+                    self.__active[host] -= 1
+                    if stored is None:
+                        self.__in_flight -= 1
+                    self.__condition.notify_all()
+
+            # The item stays in flight until the rest of its work has been carried out
+            if stored is not None:
+                stored.add_done_callback(lambda future, host=host, item=item, start=start: self.__on_stored(host, item, start, future))
+
+
+    def __on_stored(self, host, item, start, future):
+        """
+        Private callback handling the outcome of an item whose download function returned a Future.
+        """
+
+        try:
+            if future.exception() is not None:
+                self.__complete(host, item, start, error=future.exception())
+            else:
+                self.__complete(host, item, start, future.result())
+        finally:
+            with self.__condition:
+                self.__in_flight -= 1
+                self.__condition.notify_all()
+
+
+    def __complete(self, host, item, start, downloaded=True, error=None):
+        """
+        Private method reporting the outcome of an item to the host limiter and retrying or recording failures.
+        """
+
+        if error is None:
+            # Links which were skipped without a request say nothing about the host
+            if self.__host_limiter is not None and downloaded is not False:
+                self.__host_limiter.record(host, time.monotonic() - start)
+
+            if self.__breaker is not None:
+                if downloaded is False:
+                    self.__breaker.release(host)
+                else:
+                    self.__breaker.record(host)
+        elif isinstance(error, DownloadError):
+            if self.__host_limiter is not None:
+                self.__host_limiter.record(host, error=error)
+
+            # Once the probe of a host fails, the items parked behind it are failed along with it
+            probe_failed = self.__breaker is not None and self.__breaker.record(host, error)
+
+            self.__handle_failure(host, item, error, probe_failed)
+
+            if probe_failed:
+                with self.__condition:
+                    self.__drop_host(host)
+        else:
+            if self.__breaker is not None:
+                self.__breaker.release(host)
+
+            # An unexpected exception is not worth retrying, but the item is still reported as failed
+            failed_log = "Download of " + item[0] + " failed: " + repr(error)
+            if self.__logger is not None:
+                self.__logger.error(failed_log)
+            print(failed_log)
+
+            with self.__condition:
+                self.__failed.append((item[0], item[1], DownloadError.PERMANENT))
+
+
+    def __handle_failure(self, host, item, error, give_up=False):
+        """
+        Private method which places a failed item in the delayed queue if the retry policy allows another
+        attempt, or records it as failed otherwise.
+        """
+
+        title, link, attempt = item
+        retry = not give_up and self.__retry_policy is not None and self.__retry_policy.should_retry(error, attempt)
+        delay = self.__retry_policy.get_delay(error, attempt) if retry else None
+
+        if not retry or (self.__deadline is not None and not self.__deadline.allows_retry(delay)):
+            failed_log = title + " failed to download (" + error.kind + "): " + str(error)
+            if self.__logger is not None:
+                self.__logger.error(failed_log)
+            print(failed_log)
+
+            with self.__condition:
+                self.__failed.append((title, link, error.kind))
+            return
+
+        retry_log = title + " failed (" + error.kind + "), retrying in " + "{:.1f}".format(delay) + \
+            " seconds (attempt " + str(attempt + 1) + ")."
+        if self.__logger is not None:
+            self.__logger.info(retry_log)
+        print(retry_log)
+
+        if self.__on_retry is not None:
+            try:
+                self.__on_retry(title, link, error)
+            except Exception as e:
+                if self.__logger is not None:
+                    self.__logger.error(e)
+
+        with self.__condition:
+            self.__sequence += 1
+            heapq.heappush(self.__delayed, (time.monotonic() + delay, self.__sequence, host, (title, link, attempt + 1)))
+
+            # The retry stays queued until it either succeeds or is dropped
+            self.__queued += 1
+            self.__condition.notify_all()
+
+
+    def __drop_unstarted(self):
+        """
+        Private method recording every queued and delayed item as failed once the deadline has passed. Must be
+        called while holding the condition lock.
+        """
+
+        for host, items in self.__pending.items():
+            for item in items:
+                self.__drop(item)
+
+        for ready, sequence, host, item in self.__delayed:
+            self.__drop(item)
+
+        self.__pending = OrderedDict()
+        self.__delayed = []
+
+
+    def __drop_host(self, host):
+        """
+        Private method recording every queued and delayed item of a host whose probe failed as failed. Must be
+        called while holding the condition lock.
+        """
+
+        for item in self.__pending.pop(host, ()):
+            self.__drop(item, DownloadError.UNAVAILABLE)
+
+        delayed = []
+        for entry in self.__delayed:
+            if entry[2] == host:
+                self.__drop(entry[3], DownloadError.UNAVAILABLE)
+            else:
+                delayed.append(entry)
+
+        heapq.heapify(delayed)
+        self.__delayed = delayed
+
+
+    def __drop(self, item, kind=DownloadError.DEADLINE):
+        """
+        Private method recording an item the deadline left no time to start, or whose host is unavailable, as
+        failed and releasing its queue slot. Must be called while holding the condition lock.
+        """
+
+        title, link, attempt = item
+        if kind == DownloadError.UNAVAILABLE:
+            skipped_log = title + " was not started, host " + self._get_host(link) + " is unavailable."
+        else:
+            skipped_log = title + " was not started before the run deadline."
+        if self.__logger is not None:
+            self.__logger.warning(skipped_log)
+        print(skipped_log)
+
+        self.__failed.append((title, link, kind))
+        self.__queued -= 1
+        self.__condition.notify_all()
+
+
+    def _get_host_limit(self, host):
+        """
+        Protected method returning the concurrency cap for a host.
+
+        @param host: str - A string containing the host name of a queued link.
+        @return limit: int - The maximum number of concurrent downloads for the host.
+        """
+
+        if self.__host_limiter is not None:
+            return self.__host_limiter.get_limit(host)
+
+        return self.__host_limit
+
+
+    def _get_host(self, link):
+        """
+        Protected method extracting the host name used to group queued links.
+
+        @param link: str - A string containing a full link.
+        @return host: str - A string containing the host portion of the link.
+        """
+
+        return urlsplit(link).hostname or ''
+
+
+    def get_failed(self):
+        """
+        Public accessor method returning the (title, link, kind) of every item which was dropped after failing.
+        """
+
+        with self.__condition:
+            return list(self.__failed)
+
+
+    def get_workers(self):
+        """
+        Public accessor method returning the number of worker threads in the pool.
+        """
+
+        return self.__workers
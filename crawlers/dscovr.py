@@ -45,22 +45,33 @@ class DSCOVR(SatelliteCrawler):
 
         links = {}
         
-        # Get JSON response from each image page which provides latest images available
-        natural_json = self._extract_content(self.get_url() + self.DSCOVR_NATURAL).json()
-        enhanced_json = self._extract_content(self.get_url() + self.DSCOVR_ENHANCED).json()
-
-        self._logger.debug("Extracted Natural Image JSON: " + json.dumps(natural_json, indent=4) + ".")
-        self._logger.debug("Extracted Enhanced Image JSON: " + json.dumps(enhanced_json, indent=4) + ".")
-
-        # Get links subsets containing key, value pairs for each set of JSON response
-        natural_links = self.__generate_links_set(natural_json, self.DSCOVR_NATURAL)
-        enhanced_links =  self.__generate_links_set(enhanced_json, self.DSCOVR_ENHANCED)
+        # Get links subsets from the JSON response of each image page which provides latest images available,
+        # reusing the cached subset if a response was not modified
+        natural_links = self._extract_links(self.get_url() + self.DSCOVR_NATURAL,
+            lambda page: self.__parse_json(page, self.DSCOVR_NATURAL))
+        enhanced_links = self._extract_links(self.get_url() + self.DSCOVR_ENHANCED,
+            lambda page: self.__parse_json(page, self.DSCOVR_ENHANCED))
         
         # Merge individual dictionaries into one
         links = {**natural_links, **enhanced_links}
         
         return links
 
+    def __parse_json(self, page, img_type):
+        """
+        Parses the JSON response of an EPIC image page into a subset of the final links dictionary.
+
+        @param page: Response - The response containing the JSON set of latest images for an image type.
+        @param img_type: str - A string containing the type of image set being processed.
+        @return links: {} A key-value mapping of a title key in a standard format and its appropriate image link.
+        """
+
+        json_set = page.json()
+
+        self._logger.debug("Extracted " + img_type + " Image JSON: " + json.dumps(json_set, indent=4) + ".")
+
+        return self.__generate_links_set(json_set, img_type)
+
     def __generate_links_set(self, json_set, img_type):
         """
         Generates a subset of the final links dictionary by generating the title and link for each entry in a
@@ -0,0 +1,650 @@
+import os
+import json
+import time
+import random
+import ipaddress
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from stem import Flag
+from stem import CircStatus
+from stem import StreamStatus
+from stem.control import EventType
+from stem.version import Version
+from crawlers.circuit_lanes import CircuitLane
+
+class ExitScoreBoard:
+    """
+    Persistent per-destination scores of Tor exit relays. For every target host and exit fingerprint the
+    moving averages of the stream connect latency and of the read throughput are kept, and the scores are
+    written to a JSON file so that what was learned about the exits serving a source carries over to the next
+    run. Scores which have not been updated for a week are forgotten since relays come and go.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    DEFAULT_PATH = '.cache/exit_scores.json'
+    SMOOTHING = 0.3
+    SAVE_INTERVAL = 60
+    MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+
+    def __init__(self, path=DEFAULT_PATH):
+        """
+        Constructor which accepts the file scores are persisted to.
+
+        @param path: str - The path of the JSON score file.
+        """
+
+        self.__path = path
+        self.__lock = threading.Lock()
+        self.__scores = self.__load()
+        self.__saved = time.monotonic()
+
+
+    def record_latency(self, host, fingerprint, latency, country=None):
+        """
+        Folds the time a stream took to connect through an exit into its score for a host.
+
+        @param host: str - A string containing the target host of the stream.
+        @param fingerprint: str - The fingerprint of the exit relay.
+        @param latency: float - The number of seconds from the stream opening until it connected.
+        @param country: str - An optional two letter country code of the exit relay.
+        """
+
+        self.__record(host, fingerprint, 'latency', latency, country)
+
+
+    def record_throughput(self, host, fingerprint, rate, country=None):
+        """
+        Folds a read rate observed on a stream through an exit into its score for a host.
+
+        @param host: str - A string containing the target host of the stream.
+        @param fingerprint: str - The fingerprint of the exit relay.
+        @param rate: float - The number of bytes read per second.
+        @param country: str - An optional two letter country code of the exit relay.
+        """
+
+        self.__record(host, fingerprint, 'throughput', rate, country)
+
+
+    def get_best(self, host, candidates):
+        """
+        Orders the scored exits among a set of candidates from best to worst for a host, by throughput and
+        then by connect latency.
+
+        @param host: str - A string containing the target host.
+        @param candidates: [] - A list of exit fingerprints which may be used.
+        @return fingerprints: [] - The candidates which have a score for the host, best first.
+        """
+
+        with self.__lock:
+            scores = self.__scores.get(host, {})
+            scored = [(fp, scores[fp]) for fp in candidates if fp in scores]
+
+        scored.sort(key=lambda s: (s[1].get('throughput') or 0.0, -(s[1].get('latency') or float('inf'))), reverse=True)
+
+        return [fp for fp, score in scored]
+
+
+    def save(self):
+        """
+        Writes the scores to disk atomically.
+        """
+
+        with self.__lock:
+            data = json.dumps(self.__scores)
+            self.__saved = time.monotonic()
+
+        os.makedirs(os.path.dirname(self.__path) or '.', exist_ok=True)
+        tmp_path = self.__path + '.' + str(threading.get_ident()) + '.tmp'
+
+        with open(tmp_path, 'w') as f:
+            f.write(data)
+        os.replace(tmp_path, self.__path)
+
+
+    def __record(self, host, fingerprint, field, value, country):
+        """
+        Private method updating the moving average of a score field and saving periodically.
+        """
+
+        with self.__lock:
+            score = self.__scores.setdefault(host, {}).setdefault(fingerprint, {'samples': 0})
+
+            if score.get(field) is None:
+                score[field] = value
+            else:
+                score[field] += self.SMOOTHING * (value - score[field])
+
+            score['samples'] += 1
+            score['updated'] = time.time()
+            if country:
+                score['country'] = country
+
+            due = time.monotonic() - self.__saved >= self.SAVE_INTERVAL
+
+        if due:
+            self.save()
+
+
+    def __load(self):
+        """
+        Private method reading persisted scores, dropping those which have gone stale.
+        """
+
+        try:
+            with open(self.__path, 'r') as f:
+                scores = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        cutoff = time.time() - self.MAX_AGE_SECONDS
+
+        for host in list(scores.keys()):
+            scores[host] = {fp: s for fp, s in scores[host].items() if s.get('updated', 0) >= cutoff}
+
+        return scores
+
+
+class ExitScorer:
+    """
+    Listens to the STREAM, STREAM_BW and CIRC events of a Tor client through stem to measure every stream by
+    the exit relay it left the network through: the time from the stream opening until it connected, and its
+    read rate while it is transferring. Measurements are recorded per target host in an ExitScoreBoard.
+
+    When steering is enabled, Tor is told to leave new streams unattached and each one is attached to a
+    circuit built through an exit picked for its destination. Exits in the countries preferred for the host
+    are considered, and the best scored ones are used while a share of circuits explore unscored exits. The
+    guard of the clients' existing circuits is kept and a random fast middle relay is used. Streams fall back
+    to Tor's own circuit selection if a circuit cannot be built. Steering replaces circuit lane isolation.
+    Circuits are built by a small pool of workers, and streams arriving while too many wait on one are
+    handed straight back to Tor.
+
+    The Tor client may be shared with other applications, so only streams carrying the SOCKS username of
+    this process are scored, and any other stream is handed to Tor's own selection as soon as it opens.
+    Steering runs on a connection of its own which takes ownership of the Tor client: were this process to
+    die before stop() hands stream attachment back, Tor exits rather than leaving every new stream
+    unattached.
+
+    Destinations are only known by host name because the crawlers hand host names to Tor through socks5h
+    proxies. Streams to bare addresses, such as those of other applications resolving DNS themselves, are
+    neither scored nor steered.
+
+    @author Vincent.Nigro
+    @version 0.0.3
+    @modified 10/16/26
+    """
+
+    # Exit countries favoured per destination domain, Asian exits for KMA/JMA/CMA and US exits for NESDIS/NASA
+    PREFERRED_COUNTRIES = {
+        'kma.go.kr': ['kr', 'jp', 'tw', 'hk', 'sg'],
+        'jma.go.jp': ['jp', 'kr', 'tw', 'hk', 'sg'],
+        'nsmc.org.cn': ['hk', 'tw', 'jp', 'kr', 'sg'],
+        'cma.gov.cn': ['hk', 'tw', 'jp', 'kr', 'sg'],
+        'imd.gov.in': ['in', 'sg', 'jp'],
+        'noaa.gov': ['us', 'ca'],
+        'nasa.gov': ['us', 'ca'],
+        'colostate.edu': ['us', 'ca'],
+        'wisc.edu': ['us', 'ca'],
+    }
+
+    DEFAULT_CIRCUITS_PER_HOST = 2
+    EXPLORE_RATE = 0.25
+    FAILURE_LATENCY = 30.0
+    MIN_BW_BYTES = 16 * 1024
+    CONSENSUS_TTL = 60 * 60
+    BUILD_TIMEOUT = 60
+    ATTACH_WORKERS = 4
+    MAX_PENDING_ATTACHES = 64
+    COUNTRY_BATCH = 200
+
+    # Handing ownership back before closing the connection requires DROPOWNERSHIP
+    MIN_STEER_VERSION = Version('0.4.0.1-alpha')
+
+    def __init__(self, controller, scoreboard, steer=False, circuits_per_host=DEFAULT_CIRCUITS_PER_HOST, logger=None):
+        """
+        Constructor which accepts the Tor client to observe and where its measurements are recorded.
+
+        @param controller: TorController - The long-lived ControlPort connection of the Tor client.
+        @param scoreboard: ExitScoreBoard - The scores measurements are recorded in.
+        @param steer: bool - True to attach streams to circuits through exits picked per destination.
+        @param circuits_per_host: int - The number of steered circuits kept per destination host.
+        @param logger: Logger - An optional logger used to record steered circuits.
+        """
+
+        self.__steer = steer
+        self.__logger = logger
+        self.__controller = controller
+        self.__scoreboard = scoreboard
+        self.__circuits_per_host = max(1, int(circuits_per_host))
+
+        self.__tor = None
+        self.__workers = None
+        self.__pending = 0
+        self.__exits = {}
+        self.__streams = {}
+        self.__building = {}
+        self.__countries = {}
+        self.__consensus = []
+        self.__consensus_time = 0.0
+        self.__host_circuits = {}
+        self.__lock = threading.RLock()
+        self.__built = threading.Condition(self.__lock)
+
+
+    def start(self, pw=''):
+        """
+        Subscribes to the events of the Tor client on a connection of its own and, when steering, takes
+        ownership of the client and over stream attachment.
+
+        @param pw: str - A string containing the Tor password for the given system configuration.
+        """
+
+        self.__tor = self.__controller.open_controller(pw)
+
+        try:
+            if self.__steer:
+                if self.__tor.get_version() < self.MIN_STEER_VERSION:
+                    raise RuntimeError("Steering requires Tor " + str(self.MIN_STEER_VERSION) + " or later.")
+
+                response = self.__tor.msg('TAKEOWNERSHIP')
+                if not response.is_ok():
+                    raise RuntimeError("Could not take ownership of the Tor client: " + str(response))
+
+                self.__workers = ThreadPoolExecutor(max_workers=self.ATTACH_WORKERS, thread_name_prefix='exit-steer')
+
+            self.__tor.add_event_listener(self.__on_stream, EventType.STREAM)
+            self.__tor.add_event_listener(self.__on_stream_bw, EventType.STREAM_BW)
+            self.__tor.add_event_listener(self.__on_circuit, EventType.CIRC)
+
+            if self.__steer:
+                self.__tor.set_conf('__LeaveStreamsUnattached', '1')
+        except Exception:
+            self.__close()
+            raise
+
+
+    def stop(self):
+        """
+        Unsubscribes from the events of the Tor client, hands stream attachment and ownership of the client back
+        to Tor and saves the scores.
+        """
+
+        if self.__tor is not None:
+            try:
+                if self.__steer:
+                    self.__tor.set_conf('__LeaveStreamsUnattached', '0')
+
+                self.__tor.remove_event_listener(self.__on_stream)
+                self.__tor.remove_event_listener(self.__on_stream_bw)
+                self.__tor.remove_event_listener(self.__on_circuit)
+            except Exception as e:
+                if self.__logger is not None:
+                    self.__logger.error(e)
+
+            self.__close()
+
+        self.__scoreboard.save()
+
+
+    def __close(self):
+        """
+        Private method closing the connection along with the attachment workers. Ownership of the Tor client is
+        released first, otherwise closing the connection would shut the client down.
+        """
+
+        tor, self.__tor = self.__tor, None
+
+        try:
+            if not self.__steer or tor.msg('DROPOWNERSHIP').is_ok():
+                tor.close()
+            elif self.__logger is not None:
+                self.__logger.error("Could not release ownership of the Tor client, keeping its connection open.")
+        except Exception as e:
+            if self.__logger is not None:
+                self.__logger.error(e)
+
+        if self.__workers is not None:
+            self.__workers.shutdown(wait=False)
+            self.__workers = None
+
+
+    def __on_stream(self, event):
+        """
+        Private listener tracking a stream from opening until it closes and attaching it when steering.
+        """
+
+        now = time.monotonic()
+
+        if event.status == StreamStatus.NEW:
+            # Streams of other applications are not ours to measure or steer, nor are those to an address since
+            # scores keyed by it would neither match the preferred countries nor outlive the address
+            if not CircuitLane.is_own_username(get_socks_username(event)) or is_address(event.target_address):
+                if self.__steer:
+                    self.__attach_to(event.id, 0)
+                return
+
+            with self.__lock:
+                self.__streams[event.id] = {'host': event.target_address, 'start': now, 'exit': None}
+
+                queued = self.__steer and self.__pending < self.MAX_PENDING_ATTACHES
+                if queued:
+                    self.__pending += 1
+
+            # Building a circuit waits on CIRC events, which cannot be delivered while this listener runs
+            if queued:
+                self.__workers.submit(self.__attach, event)
+            elif self.__steer:
+                self.__attach_to(event.id, 0)
+        elif event.status == StreamStatus.DETACHED:
+            # Tor gave up on the circuit, let it pick another one for the stream
+            if self.__steer:
+                self.__attach_to(event.id, 0)
+        elif event.status == StreamStatus.SUCCEEDED:
+            stream = self.__streams.get(event.id)
+
+            if stream is not None:
+                stream['exit'] = self.__get_exit(event.circ_id)
+
+                if stream['exit'] is not None:
+                    self.__scoreboard.record_latency(stream['host'], stream['exit'], now - stream['start'],
+                        self.__countries.get(stream['exit']))
+        elif event.status in (StreamStatus.FAILED, StreamStatus.CLOSED):
+            with self.__lock:
+                stream = self.__streams.pop(event.id, None)
+
+            # A stream which never connected counts as a very slow one against its exit
+            if event.status == StreamStatus.FAILED and stream is not None:
+                exit = stream['exit'] or self.__get_exit(event.circ_id)
+
+                if exit is not None:
+                    self.__scoreboard.record_latency(stream['host'], exit, self.FAILURE_LATENCY, self.__countries.get(exit))
+
+
+    def __on_stream_bw(self, event):
+        """
+        Private listener recording the read rate of a stream. Tor reports stream bandwidth once a second.
+        """
+
+        stream = self.__streams.get(event.id)
+
+        if stream is not None and stream['exit'] is not None and event.read >= self.MIN_BW_BYTES:
+            self.__scoreboard.record_throughput(stream['host'], stream['exit'], float(event.read),
+                self.__countries.get(stream['exit']))
+
+
+    def __on_circuit(self, event):
+        """
+        Private listener remembering the exit of built circuits and forgetting circuits which are gone.
+        """
+
+        with self.__lock:
+            if event.status == CircStatus.BUILT and event.path:
+                self.__exits[event.id] = event.path[-1][0]
+            elif event.status in (CircStatus.CLOSED, CircStatus.FAILED):
+                self.__exits.pop(event.id, None)
+
+                for circuits in self.__host_circuits.values():
+                    if event.id in circuits:
+                        circuits.remove(event.id)
+
+
+    def __get_exit(self, circ_id):
+        """
+        Private method returning the fingerprint of the exit relay of a circuit.
+        """
+
+        if not circ_id:
+            return None
+
+        with self.__lock:
+            exit = self.__exits.get(circ_id)
+
+        if exit is None:
+            try:
+                exit = self.__tor.get_circuit(circ_id).path[-1][0]
+            except Exception:
+                return None
+
+            with self.__lock:
+                self.__exits[circ_id] = exit
+
+        return exit
+
+
+    def __attach(self, event):
+        """
+        Private method attaching a new stream to a steered circuit for its destination.
+        """
+
+        circ_id = 0
+
+        try:
+            circ_id = self.__get_host_circuit(event.target_address, event.target_port)
+        except Exception as e:
+            if self.__logger is not None:
+                self.__logger.debug("Could not build a steered circuit for " + str(event.target_address) + ": " + str(e))
+        finally:
+            with self.__lock:
+                self.__pending -= 1
+
+        self.__attach_to(event.id, circ_id)
+
+
+    def __attach_to(self, stream_id, circ_id):
+        """
+        Private method attaching a stream to a circuit, handing it back to Tor if the attachment fails.
+        """
+
+        tor = self.__tor
+        if tor is None:
+            return
+
+        try:
+            tor.attach_stream(stream_id, circ_id)
+        except Exception:
+            if circ_id != 0:
+                self.__attach_to(stream_id, 0)
+
+
+    def __get_host_circuit(self, host, port):
+        """
+        Private method returning a steered circuit for a destination, building one through a newly picked
+        exit while the destination has fewer than circuits_per_host circuits. Circuits being built count
+        against the limit, so a stream arriving while every slot is taken by a build waits for one to finish.
+        Circuits are used round-robin.
+        """
+
+        with self.__built:
+            while True:
+                circuits = self.__host_circuits.setdefault(host, [])
+                building = self.__building.get(host, 0)
+
+                if len(circuits) + building < self.__circuits_per_host:
+                    self.__building[host] = building + 1
+                    used = [self.__exits.get(c) for c in circuits]
+                    break
+
+                if circuits:
+                    circuits.append(circuits.pop(0))
+                    return circuits[-1]
+
+                self.__built.wait()
+
+        circ_id = None
+
+        try:
+            exit = self.__choose_exit(host, port, used)
+            if exit is None:
+                return 0
+
+            circ_id = self.__tor.new_circuit(self.__build_path(exit), await_build=True, timeout=self.BUILD_TIMEOUT)
+        finally:
+            with self.__built:
+                self.__building[host] -= 1
+
+                if circ_id is not None:
+                    self.__exits[circ_id] = exit
+                    self.__host_circuits.setdefault(host, []).append(circ_id)
+
+                self.__built.notify_all()
+
+        if self.__logger is not None:
+            self.__logger.info("Steering streams to " + host + " through exit " + exit + " (" + \
+                str(self.__countries.get(exit)) + ").")
+
+        return circ_id
+
+
+    def __choose_exit(self, host, port, used):
+        """
+        Private method picking the exit for a new steered circuit, exploiting the best scored exits in the
+        preferred countries of the host while exploring unscored ones part of the time.
+        """
+
+        exits = [e for e in self.__get_consensus_exits() if e['fingerprint'] not in used and \
+            (e['policy'] is None or e['policy'].can_exit_to(port=port))]
+
+        if not exits:
+            return None
+
+        preferred = self.__get_preferred_countries(host)
+        candidates = [e['fingerprint'] for e in exits if self.__countries.get(e['fingerprint']) in preferred]
+
+        if not candidates:
+            candidates = [e['fingerprint'] for e in exits]
+
+        best = self.__scoreboard.get_best(host, candidates)
+
+        if best and random.random() >= self.EXPLORE_RATE:
+            return best[0]
+
+        return random.choice(candidates)
+
+
+    def __build_path(self, exit):
+        """
+        Private method building a three hop path ending at an exit, reusing the guard of an existing circuit.
+        """
+
+        guard = None
+
+        for circuit in self.__tor.get_circuits():
+            if circuit.status == CircStatus.BUILT and len(circuit.path) >= 3:
+                guard = circuit.path[0][0]
+                break
+
+        relays = [r.fingerprint for r in self.__tor.get_network_statuses() if Flag.FAST in r.flags and \
+            Flag.RUNNING in r.flags and r.fingerprint not in (guard, exit)]
+
+        middle = random.choice(relays)
+
+        if guard is None:
+            guard = random.choice([r for r in relays if r != middle])
+
+        return [guard, middle, exit]
+
+
+    def __get_consensus_exits(self):
+        """
+        Private method returning the usable exit relays of the current consensus along with their exit policy
+        summary, resolving the country of each relay. The list is refreshed hourly.
+        """
+
+        with self.__lock:
+            if self.__consensus and time.monotonic() - self.__consensus_time < self.CONSENSUS_TTL:
+                return self.__consensus
+
+        exits = []
+        unresolved = {}
+
+        for relay in self.__tor.get_network_statuses():
+            if Flag.EXIT not in relay.flags or Flag.BADEXIT in relay.flags or Flag.FAST not in relay.flags:
+                continue
+
+            if relay.fingerprint not in self.__countries:
+                unresolved[relay.fingerprint] = 'ip-to-country/' + relay.address
+
+            exits.append({'fingerprint': relay.fingerprint, 'policy': relay.exit_policy})
+
+        self.__resolve_countries(unresolved)
+
+        with self.__lock:
+            self.__consensus = exits
+            self.__consensus_time = time.monotonic()
+
+        return exits
+
+
+    def __resolve_countries(self, keys):
+        """
+        Private method looking up the countries of relays with one GETINFO per batch of relays rather than one
+        per relay. A batch is rejected as a whole if any of its addresses cannot be looked up, in which case
+        its relays are resolved one at a time.
+        """
+
+        fingerprints = list(keys.keys())
+
+        for i in range(0, len(fingerprints), self.COUNTRY_BATCH):
+            batch = fingerprints[i:i + self.COUNTRY_BATCH]
+
+            try:
+                countries = self.__tor.get_info([keys[fp] for fp in batch])
+            except Exception:
+                countries = {}
+
+                for fp in batch:
+                    try:
+                        countries[keys[fp]] = self.__tor.get_info(keys[fp])
+                    except Exception:
+                        countries[keys[fp]] = None
+
+            for fp in batch:
+                self.__countries[fp] = countries.get(keys[fp])
+
+
+    def __get_preferred_countries(self, host):
+        """
+        Private method returning the exit countries favoured for a destination host, empty if there are none.
+        """
+
+        host = host or ''
+
+        for domain, countries in self.PREFERRED_COUNTRIES.items():
+            if host == domain or host.endswith('.' + domain):
+                return countries
+
+        return []
+
+
+def is_address(host):
+    """
+    Returns whether the target of a stream is a bare IP address rather than a host name.
+
+    @param host: str - The target address of a stream event.
+    @return address: bool - True if the target is an IPv4 or IPv6 address.
+    """
+
+    try:
+        ipaddress.ip_address(str(host).strip('[]'))
+        return True
+    except ValueError:
+        return False
+
+
+def get_socks_username(event):
+    """
+    Returns the SOCKS username of the stream of a STREAM event. Tor reports it as the SOCKS_USERNAME keyword,
+    which older stem releases do not parse into an attribute.
+
+    @param event: StreamEvent - The STREAM event of a Tor client.
+    @return username: str - The SOCKS username of the stream, None if it had none.
+    """
+
+    username = getattr(event, 'socks_username', None)
+
+    if username is None:
+        username = getattr(event, 'keyword_args', {}).get('SOCKS_USERNAME')
+
+    return username
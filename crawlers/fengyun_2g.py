@@ -49,8 +49,21 @@ class FENGYUN_2G(SatelliteCrawler):
 
         links = {}
         
-        # Get set of links available
-        page = self._extract_content(self.get_url(), pw)
+        # Get set of links available, reusing the cached set if the listing was not modified
+        links = self._extract_links(self.get_url(), self.__parse_listing, pw)
+
+        return links
+
+
+    def __parse_listing(self, page):
+        """
+        Parses the FY-2G animation image listing page into a set of titles and links.
+
+        @param page: Response - The response containing the animation image listing page.
+        @return links: {} - A key-value mapping of a title key in a standard format and its appropriate image link.
+        """
+
+        links = {}
 
         soup = BeautifulSoup(page.text, self.SOUP_PARSER)
         a_elements = soup.findAll(self.A_ELEMENT, {self.HREF_ATTRIBUTE: re.compile(self.IMG_TYPE)})
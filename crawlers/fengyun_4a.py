@@ -1,6 +1,7 @@
 import os
 import re
 from bs4 import BeautifulSoup
+from crawlers.routing import RoutingTable
 from crawlers.satellite_crawler import SatelliteCrawler
 
 class FENGYUN_4A(SatelliteCrawler):
@@ -16,12 +17,15 @@ class FENGYUN_4A(SatelliteCrawler):
     Tor network.
 
     @author Vincent.Nigro
-    @version 0.0.2
-    @modified 2/13/22
+    @version 0.0.3
+    @modified 10/16/26
     """
 
     FENGYUN_4A_DIRECTORY = 'FENGYUN-4A'
     FENGYUN_4A_URL = 'http://img.nsmc.org.cn/PORTAL/NSMC/XML/FY4A/'
+
+    # NSMC manifests are fetched directly while images stay on Tor, unless routed otherwise on the command line
+    DEFAULT_ROUTES = ((FENGYUN_4A_URL, RoutingTable.DIRECT),)
     
     FENGYUN_4A_XML_FILES = ['FY4A_AGRI_IMG_DISK_MTCC_NOM.xml', 'FY4A_AGRI_IMG_DISK_GRA_NOM_C001.xml', 'FY4A_AGRI_IMG_DISK_GRA_NOM_C002.xml',
     'FY4A_AGRI_IMG_DISK_GRA_NOM_C003.xml','FY4A_AGRI_IMG_DISK_GRA_NOM_C004.xml', 'FY4A_AGRI_IMG_DISK_GRA_NOM_C005.xml', 'FY4A_AGRI_IMG_DISK_GRA_NOM_C006.xml',
@@ -64,26 +68,40 @@ class FENGYUN_4A(SatelliteCrawler):
 
         # Iterate over each XML file defining where images are located on server
         for xml_file in self.FENGYUN_4A_XML_FILES:
-            # Extract xml page
-            page = self._extract_content(self.get_url() + xml_file, pw, notor=True)
-            soup = BeautifulSoup(page.text, self.SOUP_PARSER)
+            # Extract xml page, reusing the cached set if the manifest was not modified
+            links.update(self._extract_links(self.get_url() + xml_file, self.__parse_manifest, pw))
+
+        return links
+
+
+    def __parse_manifest(self, page):
+        """
+        Parses a FENGYUN_4A XML manifest into a set of titles and links.
+
+        @param page: Response - The response containing an XML manifest of image elements.
+        @return links: {} - A key-value mapping of a title key in a standard format and its appropriate image link.
+        """
+
+        links = {}
+
+        soup = BeautifulSoup(page.text, self.SOUP_PARSER)
+        
+        # Extract all <image> elements (should be basically entire document)
+        image_elements = soup.findAll(self.IMAGE_ELEMENT)
+
+        # Iterate over each image element to start generating links
+        for image_element in image_elements:
+            # Extract the elements' description, and split the utc time for title
+            desc = image_element.get(self.DESC_ATTRIBUTE)
+            time_data = image_element.get(self.TIME_ATTRIBUTE)
+            date = time_data.split(" ")[0]
+            utc = time_data.split(" ")[1]
             
-            # Extract all <image> elements (should be basically entire document)
-            image_elements = soup.findAll(self.IMAGE_ELEMENT)
-
-            # Iterate over each image element to start generating links
-            for image_element in image_elements:
-                # Extract the elements' description, and split the utc time for title
-                desc = image_element.get(self.DESC_ATTRIBUTE)
-                time_data = image_element.get(self.TIME_ATTRIBUTE)
-                date = time_data.split(" ")[0]
-                utc = time_data.split(" ")[1]
-                
-                # Generate title based on title map and append date and utc time 
-                title = self.FENGYUN_4A_TITLE_MAP[desc]
-                title += " - " + date + " - " + utc + " UTC"
-                link = image_element.get(self.URL_ATTRIBUTE)
-                links[title] = link
+            # Generate title based on title map and append date and utc time 
+            title = self.FENGYUN_4A_TITLE_MAP[desc]
+            title += " - " + date + " - " + utc + " UTC"
+            link = image_element.get(self.URL_ATTRIBUTE)
+            links[title] = link
 
         return links
 
@@ -11,8 +11,8 @@ class GOES_18(SatelliteCrawler):
     requires using the Tor network and using the default settings (including ControlPort) to access the network.
 
     @author Vincent.Nigro
-    @version 0.0.1
-    @modified 8/12/22
+    @version 0.0.2
+    @modified 10/16/26
     """
 
     GOES_18_RESOLUTIONS = ['339', '678', '1808', '5424', '10848', '21696']
@@ -68,24 +68,41 @@ class GOES_18(SatelliteCrawler):
             if len(self.__image_types) > 0 and self.GOES_18_TITLES[i] not in self.__image_types:
                 continue
             
-            # Get the page for the provided full image page 
-            page = self._extract_content(self.get_url() + self.GOES_18_IMAGES[i] + '/', pw)
+            # Get the listing for the provided full image page, reusing the cached link if it was not modified
+            # The listing is filtered by resolution, so link sets of each resolution are cached apart
+            link = self.get_url() + self.GOES_18_IMAGES[i] + '/'
+            links.update(self._extract_links(link, lambda page: self.__parse_listing(page, i), pw,
+                key=link + '#resolution=' + self.__resolution))
 
-            # Generate bs soup object and extract list of 'a' elements containing each image link
-            soup = BeautifulSoup(page.text, self.SOUP_PARSER)
-            a_elements = soup.findAll(self.A_ELEMENT, href=True)
+        return links
+
+
+    def __parse_listing(self, page, i):
+        """
+        Parses a GOES-18 image listing page and finds the latest link for the configured resolution.
+
+        @param page: Response - The response containing the listing page for an image type.
+        @param i: int - The index of the image type in GOES_18_IMAGES.
+        @return links: {} - A key-value mapping containing the latest title and link, empty if none was found.
+        """
+
+        links = {}
+
+        # Generate bs soup object and extract list of 'a' elements containing each image link
+        soup = BeautifulSoup(page.text, self.SOUP_PARSER)
+        a_elements = soup.findAll(self.A_ELEMENT, href=True)
+        
+        # Find latest link for resolution provided
+        for a_element in reversed(a_elements):
+            href = str(a_element[self.HREF_ATTRIBUTE])
             
-            # Find latest link for resolution provided
-            for a_element in reversed(a_elements):
-                href = str(a_element[self.HREF_ATTRIBUTE])
-                
-                # If the extension base and the resolution is in the link, we found the latest link
-                if self.GOES_18_BASE_URL_EXTENSION in href and self.__resolution in href and '.jpg' in href:
-                    title = self.__generate_title(self.GOES_18_TITLES[i], href)
-                    link = self.GOES_18_URL + self.GOES_18_IMAGES[i] + '/' + href
-                    self._logger.info("Scraped link " + link + " for image " + title + ".")
-                    links[title] = link
-                    break
+            # If the extension base and the resolution is in the link, we found the latest link
+            if self.GOES_18_BASE_URL_EXTENSION in href and self.__resolution in href and '.jpg' in href:
+                title = self.__generate_title(self.GOES_18_TITLES[i], href)
+                link = self.GOES_18_URL + self.GOES_18_IMAGES[i] + '/' + href
+                self._logger.info("Scraped link " + link + " for image " + title + ".")
+                links[title] = link
+                break
 
         return links
 
@@ -0,0 +1,161 @@
+import time
+import threading
+from crawlers.retry import DownloadError
+
+class HostState:
+    """
+    The congestion state of a single host: its current concurrency limit along with moving averages of its
+    latency and error rate, the lowest latency seen, and the time until which the host asked to be left alone.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    def __init__(self, limit):
+        """
+        Constructor which accepts the initial concurrency limit of the host.
+
+        @param limit: float - The number of downloads allowed in flight to the host.
+        """
+
+        self.limit = float(limit)
+        self.latency = None
+        self.base_latency = None
+        self.error_rate = 0.0
+        self.blocked_until = 0.0
+        self.last_decrease = 0.0
+
+
+class AdaptiveHostLimiter:
+    """
+    An additive-increase/multiplicative-decrease concurrency controller kept per host. Every completed download
+    grows a host's limit by 1/limit, so a host which stays healthy gains one slot per round of downloads up to
+    the ceiling. Throttling, timeouts, connection resets and server errors, or a latency well above the best
+    seen for the host, cut the limit in half, at most once per round trip so a burst of failures from the same
+    window counts once. A Retry-After sent with a 429 or 503 stops new downloads to the host until it passes.
+    This lets tolerant sources such as CIRA run wide while NSMC and KMA settle at what they will accept.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    DEFAULT_INITIAL_LIMIT = 2
+    DEFAULT_MIN_LIMIT = 1
+    DECREASE_FACTOR = 0.5
+    LATENCY_FACTOR = 3.0
+    SMOOTHING = 0.2
+
+    CONGESTION = (DownloadError.THROTTLED, DownloadError.TIMEOUT, DownloadError.CONNECTION, DownloadError.SERVER_ERROR)
+
+    def __init__(self, max_limit, initial_limit=DEFAULT_INITIAL_LIMIT, min_limit=DEFAULT_MIN_LIMIT, logger=None):
+        """
+        Constructor which accepts the bounds of every host's concurrency limit.
+
+        @param max_limit: int - The ceiling of a host's concurrency limit.
+        @param initial_limit: int - The concurrency limit a host starts out with.
+        @param min_limit: int - The floor of a host's concurrency limit.
+        @param logger: Logger - An optional logger used to record limit decreases.
+        """
+
+        self.__logger = logger
+        self.__hosts = {}
+        self.__lock = threading.Lock()
+        self.__max_limit = max(1, int(max_limit))
+        self.__min_limit = max(1, min(int(min_limit), self.__max_limit))
+        self.__initial_limit = max(self.__min_limit, min(int(initial_limit), self.__max_limit))
+
+
+    def get_limit(self, host):
+        """
+        Returns the number of downloads currently allowed in flight to a host.
+
+        @param host: str - A string containing the host name.
+        @return limit: int - The concurrency limit, 0 while the host is blocked by a Retry-After.
+        """
+
+        with self.__lock:
+            state = self.__get_state(host)
+
+            if state.blocked_until > time.monotonic():
+                return 0
+
+            return int(state.limit)
+
+
+    def record(self, host, latency=None, error=None):
+        """
+        Adjusts the concurrency limit of a host from the outcome of a download.
+
+        @param host: str - A string containing the host name.
+        @param latency: float - The number of seconds the download took, None if unknown.
+        @param error: DownloadError - The classified failure, None if the download succeeded.
+        """
+
+        with self.__lock:
+            state = self.__get_state(host)
+            now = time.monotonic()
+            congested = error is not None and error.kind in self.CONGESTION
+
+            if error is not None:
+                state.error_rate += self.SMOOTHING * ((1.0 if congested else 0.0) - state.error_rate)
+
+                if error.retry_after is not None:
+                    state.blocked_until = max(state.blocked_until, now + error.retry_after)
+            elif latency is not None:
+                state.error_rate -= self.SMOOTHING * state.error_rate
+
+                if state.latency is None:
+                    state.latency = latency
+                else:
+                    state.latency += self.SMOOTHING * (latency - state.latency)
+
+                state.base_latency = latency if state.base_latency is None else min(state.base_latency, latency)
+
+                # Queueing delay is building up at the host even though requests still succeed
+                congested = state.latency > self.LATENCY_FACTOR * state.base_latency
+
+            if congested:
+                self.__decrease(host, state, now)
+            elif error is None:
+                state.limit = min(self.__max_limit, state.limit + 1.0 / state.limit)
+
+
+    def __decrease(self, host, state, now):
+        """
+        Private method halving the limit of a congested host, at most once per round trip. Must be called
+        while holding the lock.
+        """
+
+        if now - state.last_decrease < (state.latency or 0.0):
+            return
+
+        state.limit = max(self.__min_limit, state.limit * self.DECREASE_FACTOR)
+        state.last_decrease = now
+
+        if self.__logger is not None:
+            self.__logger.info("Reduced concurrency for host " + host + " to " + str(int(state.limit)) + ".")
+
+
+    def __get_state(self, host):
+        """
+        Private method returning the state of a host, creating it on first use. Must be called while holding
+        the lock.
+        """
+
+        state = self.__hosts.get(host)
+
+        if state is None:
+            state = HostState(self.__initial_limit)
+            self.__hosts[host] = state
+
+        return state
+
+
+    def get_max_limit(self):
+        """
+        Public accessor method returning the ceiling of every host's concurrency limit.
+        """
+
+        return self.__max_limit
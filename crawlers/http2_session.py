@@ -0,0 +1,255 @@
+import threading
+import requests
+
+# httpx and h2 are optional, pooled requests sessions are used when they are missing
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2
+except ImportError:
+    h2 = None
+
+try:
+    import socksio
+except ImportError:
+    socksio = None
+
+class Http2Response:
+    """
+    Adapts an httpx.Response to the subset of the requests.Response interface used by the crawlers, so that
+    pages and images fetched over HTTP/2 are handled exactly like those fetched through a requests.Session.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    def __init__(self, response, streaming=False, on_close=None):
+        """
+        Constructor which accepts the httpx response being adapted.
+
+        @param response: httpx.Response - The response of an HTTP/2 request.
+        @param streaming: bool - True if the body has not been read yet.
+        @param on_close: function - An optional callable invoked once when the response is closed.
+        """
+
+        self.__response = response
+        self.__on_close = on_close
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.raw = Http2RawStream(response) if streaming else None
+
+
+    @property
+    def content(self):
+        return self.__response.content
+
+
+    @property
+    def text(self):
+        return self.__response.text
+
+
+    def json(self):
+        return self.__response.json()
+
+
+    def close(self):
+        """
+        Closes the response, releasing its stream on the multiplexed connection.
+        """
+
+        try:
+            self.__response.close()
+        finally:
+            on_close, self.__on_close = self.__on_close, None
+            if on_close is not None:
+                on_close()
+
+
+class Http2RawStream:
+    """
+    A read-only file-like view over the body of a streamed httpx response, standing in for the urllib3
+    response requests exposes as Response.raw so it can be passed to shutil.copyfileobj.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    def __init__(self, response):
+        """
+        Constructor which accepts the streamed response whose body is read.
+
+        @param response: httpx.Response - A response returned with stream=True.
+        """
+
+        self.decode_content = True
+        self.__buffer = b''
+        self.__response = response
+        self.__chunks = None
+
+
+    def read(self, size=-1):
+        """
+        Reads up to size bytes of the body, or the remainder of the body if size is negative.
+
+        @param size: int - The maximum number of bytes to return.
+        @return data: bytes - The bytes read, empty once the body is exhausted.
+        """
+
+        if self.__chunks is None:
+            self.__chunks = self.__response.iter_bytes() if self.decode_content else self.__response.iter_raw()
+
+        try:
+            while size < 0 or len(self.__buffer) < size:
+                chunk = next(self.__chunks, None)
+                if chunk is None:
+                    break
+                self.__buffer += chunk
+        except httpx.TransportError as e:
+            # Surface a broken stream the same way requests does
+            raise requests.exceptions.ChunkedEncodingError(str(e)) from e
+
+        if size < 0:
+            data, self.__buffer = self.__buffer, b''
+        else:
+            data, self.__buffer = self.__buffer[:size], self.__buffer[size:]
+
+        return data
+
+
+class Http2Session:
+    """
+    A session sending requests over HTTP/2 through httpx. Concurrent requests from every download thread are
+    multiplexed as streams over a single connection, so a run of small RAMMB slider tiles pays the circuit,
+    TCP and TLS round trips once rather than once per pooled HTTP/1.1 connection. The SessionManager keeps
+    one session per host and proxy, which is one connection per Tor circuit. Servers which do not negotiate
+    HTTP/2 are transparently spoken to over HTTP/1.1. Transport errors are raised as their requests
+    equivalents.
+
+    Closing the client aborts every stream multiplexed over its connection, so a session taken out of the
+    pool on rotation is retired instead: it keeps serving the requests in flight and the threads still
+    holding it, and closes once the last of them has finished. A request sent after it was closed fails as
+    a retryable connection error.
+
+    Requires the optional httpx and h2 packages, plus socksio when routing through Tor.
+
+    @author Vincent.Nigro
+    @version 0.0.3
+    @modified 10/16/26
+    """
+
+    # Seconds allowed for any single connect, read or write, generous for high latency Tor circuits
+    DEFAULT_TIMEOUT = 60.0
+
+    def __init__(self, proxies=None, pool_size=16):
+        """
+        Constructor which accepts the proxy configuration and the number of connections kept alive.
+
+        @param proxies: {} - An optional requests proxy mapping which the session should route through.
+        @param pool_size: int - The maximum number of connections kept alive by the session.
+        """
+
+        proxies = proxies or {}
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+
+        self.proxies = dict(proxies)
+
+        # httpx always hands host names to SOCKS proxies, and older versions do not know the socks5h scheme
+        proxy = proxies.get('https') or None
+        if proxy is not None and proxy.startswith('socks5h://'):
+            proxy = 'socks5://' + proxy[len('socks5h://'):]
+
+        self.__client = httpx.Client(http2=True, limits=limits, timeout=self.DEFAULT_TIMEOUT, proxy=proxy)
+
+        self.__in_flight = 0
+        self.__retired = False
+        self.__lock = threading.Lock()
+
+
+    @staticmethod
+    def is_available(notor=False):
+        """
+        Returns whether the optional packages required for HTTP/2 are installed.
+
+        @param notor: bool - True if requests will not be routed through Tor, which removes the need for socksio.
+        @return available: bool - True if HTTP/2 sessions can be created.
+        """
+
+        return httpx is not None and h2 is not None and (notor or socksio is not None)
+
+
+    def get(self, link, stream=False, headers=None, timeout=None):
+        """
+        Sends a GET request over the multiplexed connection.
+
+        @param link: str - A string containing the URL being requested.
+        @param stream: bool - True to defer reading the body, which must then be closed by the caller.
+        @param headers: {} - An optional mapping of additional request headers.
+        @param timeout: () - An optional (connect, read) tuple of seconds replacing the default timeout.
+        @return page: Http2Response - A response exposing the requests.Response attributes used by crawlers.
+        """
+
+        with self.__lock:
+            self.__in_flight += 1
+
+        # A streamed body stays in flight until the caller closes its response
+        released = True
+
+        try:
+            if timeout is not None:
+                timeout = httpx.Timeout(self.DEFAULT_TIMEOUT, connect=timeout[0], read=timeout[1])
+
+            response = self.__client.send(self.__client.build_request('GET', link, headers=headers,
+                timeout=timeout or self.DEFAULT_TIMEOUT), stream=stream, follow_redirects=True)
+            released = not stream
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        except RuntimeError as e:
+            # httpx refuses requests once the client was closed, which a fresh session can retry
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        finally:
+            if released:
+                self.__release()
+
+        return Http2Response(response, stream, None if released else self.__release)
+
+
+    def retire(self):
+        """
+        Closes the client once every request in flight has finished, leaving those requests untouched.
+        """
+
+        with self.__lock:
+            self.__retired = True
+            idle = self.__in_flight == 0
+
+        if idle:
+            self.__client.close()
+
+
+    def close(self):
+        """
+        Closes the client along with its connection, aborting any request in flight.
+        """
+
+        self.__client.close()
+
+
+    def __release(self):
+        """
+        Private method ending a request, closing the client if it was retired and this was the last one.
+        """
+
+        with self.__lock:
+            self.__in_flight -= 1
+            idle = self.__retired and self.__in_flight == 0
+
+        if idle:
+            self.__client.close()
@@ -0,0 +1,119 @@
+import os
+import json
+import hashlib
+import threading
+
+class HttpCache:
+    """
+    An on-disk conditional GET cache for listing and index pages. For every cached URL the ETag and
+    Last-Modified validators of the last full response are stored along with the link set that was parsed
+    from it. The next request for the URL sends If-None-Match/If-Modified-Since, and a 304 Not Modified
+    response lets the crawler reuse the cached link set without downloading or parsing the page again.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    NOT_MODIFIED_STATUS = 304
+    DEFAULT_DIRECTORY = '.cache/http'
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, enabled=True):
+        """
+        Constructor which accepts the directory cache entries are stored in.
+
+        @param directory: str - The directory holding one JSON entry per cached URL.
+        @param enabled: bool - False to disable conditional requests entirely.
+        """
+
+        self.__enabled = enabled
+        self.__directory = directory
+        self.__lock = threading.Lock()
+
+
+    def get_request_headers(self, link):
+        """
+        Builds the conditional request headers for a URL from its cached validators.
+
+        @param link: str - A string containing the URL being requested.
+        @return headers: {} - A mapping of conditional request headers, empty if the URL is not cached.
+        """
+
+        headers = {}
+        entry = self.__load(link)
+
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        return headers
+
+
+    def load_links(self, link):
+        """
+        Returns the link set parsed from the last full response for a URL.
+
+        @param link: str - A string containing the cached URL.
+        @return links: {} - The cached key-value mapping of titles to image links, or None if not cached.
+        """
+
+        entry = self.__load(link)
+
+        return None if entry is None else entry.get('links')
+
+
+    def store(self, link, headers, links):
+        """
+        Stores the validators of a full response together with the link set parsed from it. Responses which
+        carry no validators are not cached since they can never be answered with a 304.
+
+        @param link: str - A string containing the URL which was requested.
+        @param headers: {} - The response headers.
+        @param links: {} - The key-value mapping of titles to image links parsed from the response.
+        """
+
+        if not self.__enabled:
+            return
+
+        entry = {'url': link, 'etag': headers.get('ETag'), 'last_modified': headers.get('Last-Modified'), 'links': links}
+
+        if entry['etag'] is None and entry['last_modified'] is None:
+            return
+
+        path = self.__get_path(link)
+        tmp_path = path + '.' + str(threading.get_ident()) + '.tmp'
+
+        with self.__lock:
+            os.makedirs(self.__directory, exist_ok=True)
+
+        # Write atomically so a concurrent reader never sees a partial entry
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+
+    def __load(self, link):
+        """
+        Private method reading the cache entry of a URL, if any.
+        """
+
+        if not self.__enabled:
+            return None
+
+        try:
+            with open(self.__get_path(link), 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        return entry if entry.get('url') == link else None
+
+
+    def __get_path(self, link):
+        """
+        Private method returning the path of the cache entry for a URL.
+        """
+
+        return os.path.join(self.__directory, hashlib.sha1(link.encode('utf-8')).hexdigest() + '.json')
@@ -0,0 +1,366 @@
+import io
+import os
+import re
+import json
+
+class PartialDownload:
+    """
+    Tracks a download which is written to a '.part' file next to its final path and is only renamed into
+    place once every byte has arrived. The expected length and the validators of the response are recorded in
+    a '.part.json' state file so that an interrupted download can be resumed with an HTTP Range request on
+    its next attempt, costing only the missing bytes. If-Range guarantees that a file which changed on the
+    server is downloaded again from the beginning instead of being stitched together.
+
+    When the length of a large response is known, its '.part' file is preallocated with posix_fallocate so
+    the file system can lay it out in one extent, and a segmented download fills a preallocated file out of
+    order. Either is flagged in the state file while in progress, so that a preallocated file interrupted by
+    a crash is never mistaken for a complete one.
+
+    @author Vincent.Nigro
+    @version 0.0.4
+    @modified 10/16/26
+    """
+
+    OK_STATUS = 200
+    PARTIAL_CONTENT_STATUS = 206
+    RANGE_NOT_SATISFIABLE_STATUS = 416
+
+    PREALLOCATE_MIN_SIZE = 1024 * 1024
+
+    PART_EXTENSION = '.part'
+    STATE_EXTENSION = '.part.json'
+
+    CONTENT_RANGE_PATTERN = re.compile(r'bytes (\d+)-(\d+)/(\d+|\*)')
+
+    def __init__(self, path):
+        """
+        Constructor which accepts the final path of the download.
+
+        @param path: str - The relative path the completed file should be placed at.
+        """
+
+        self.__path = path
+        self.__part_path = path + self.PART_EXTENSION
+        self.__state_path = path + self.STATE_EXTENSION
+        self.__state = self.__load_state()
+
+
+    @staticmethod
+    def is_partial_file(filename):
+        """
+        Returns whether a file name belongs to an incomplete download.
+
+        @param filename: str - A file name or path.
+        @return partial: bool - True for '.part' and '.part.json' files.
+        """
+
+        return filename.endswith(PartialDownload.PART_EXTENSION) or filename.endswith(PartialDownload.STATE_EXTENSION)
+
+
+    def get_offset(self):
+        """
+        Returns the number of bytes already on disk which can be resumed from.
+
+        @return offset: int - The size of the '.part' file, 0 if there is nothing to resume.
+        """
+
+        if self.__state is None or self.__state.get('preallocated') or not os.path.exists(self.__part_path):
+            return 0
+
+        return os.path.getsize(self.__part_path)
+
+
+    def get_request_headers(self):
+        """
+        Builds the headers for the next request of this download. Content encoding is disabled since byte
+        ranges refer to the encoded representation.
+
+        @return headers: {} - A mapping of request headers.
+        """
+
+        headers = {'Accept-Encoding': 'identity'}
+        offset = self.get_offset()
+
+        if offset > 0:
+            headers['Range'] = 'bytes=' + str(offset) + '-'
+
+            validator = self.get_validator()
+            if validator:
+                headers['If-Range'] = validator
+
+        return headers
+
+
+    def get_validator(self):
+        """
+        Returns the validator an If-Range header should carry so that ranges of a file which changed on the
+        server are not stitched together.
+
+        @return validator: str - The strong ETag or Last-Modified date of the download, None if unknown.
+        """
+
+        if self.__state is None:
+            return None
+
+        return self.__state.get('etag') or self.__state.get('last_modified')
+
+
+    def open(self, status, headers=None):
+        """
+        Opens the '.part' file for the response to the latest request, appending when the server honored the
+        range and starting over otherwise, and records the response length and validators.
+
+        @param status: int - The HTTP status code of the response, or 200 for protocols without ranges.
+        @param headers: {} - The response headers.
+        @return f: file - A binary file object positioned where the response body should be written.
+        """
+
+        mode = self.__record_state(status, headers)
+        offset = self.get_offset() if mode == 'ab' else 0
+        length = self.__state.get('length')
+
+        if length is not None and length - offset >= self.PREALLOCATE_MIN_SIZE and hasattr(os, 'posix_fallocate'):
+            self.__state['preallocated'] = True
+            self.__save_state()
+
+            return PreallocatedFile(self.__part_path, offset, length, self.__finish_preallocation)
+
+        return open(self.__part_path, mode)
+
+
+    def open_segments(self, status, headers):
+        """
+        Preallocates the '.part' file to the full length of the response to the latest range request, keeping
+        any bytes already resumed, so that byte ranges can be written into it concurrently at their offsets.
+        Must be followed by finish_segments().
+
+        @param status: int - The HTTP status code of the response, which must be 206 Partial Content.
+        @param headers: {} - The response headers.
+        @return length: int - The full length of the file.
+        """
+
+        self.__record_state(status, headers)
+        length = self.__state.get('length')
+
+        if length is None:
+            raise ValueError("Unknown length when segmenting " + self.__path + ".")
+
+        offset = self.get_offset()
+        self.__state['preallocated'] = True
+        self.__save_state()
+
+        with open(self.__part_path, 'ab') as f:
+            allocate(f.fileno(), offset, length)
+
+        return length
+
+
+    def finish_segments(self, complete):
+        """
+        Ends a segmented download. The preallocated file is cut back to the bytes which arrived in order from
+        the start, so a later attempt can resume from there.
+
+        @param complete: int - The number of bytes from the start of the file which are known to be written.
+        """
+
+        with open(self.__part_path, 'r+b') as f:
+            if complete < self.__state.get('length'):
+                f.truncate(complete)
+
+        self.__finish_preallocation()
+
+
+    def __finish_preallocation(self):
+        """
+        Private method clearing the preallocation flag once the '.part' file only holds received bytes.
+        """
+
+        self.__state['preallocated'] = False
+        self.__save_state()
+
+
+    def get_part_path(self):
+        """
+        Public accessor method returning the path of the '.part' file.
+        """
+
+        return self.__part_path
+
+
+    def __record_state(self, status, headers=None):
+        """
+        Private method recording the length and validators of the response to the latest request.
+
+        @return mode: str - The mode the '.part' file should be opened in.
+        """
+
+        headers = headers or {}
+        offset = self.get_offset()
+        previous = self.__state or {}
+        length = None
+        mode = 'wb'
+
+        if status == self.PARTIAL_CONTENT_STATUS:
+            match = self.CONTENT_RANGE_PATTERN.match(headers.get('Content-Range', ''))
+
+            if match is None or int(match.group(1)) != offset:
+                raise ValueError("Unexpected Content-Range '" + str(headers.get('Content-Range')) + \
+                    "' when resuming " + self.__path + " at byte " + str(offset) + ".")
+
+            # A range starting at 0 replaces whatever a stale '.part' file holds
+            mode = 'ab' if offset > 0 else 'wb'
+            if match.group(3) != '*':
+                length = int(match.group(3))
+        elif 'Content-Length' in headers:
+            length = int(headers['Content-Length'])
+
+        self.__state = {'length': length, 'etag': headers.get('ETag'), 'last_modified': headers.get('Last-Modified')}
+
+        # A resumed response describes the same representation, so keep validators it did not repeat
+        if offset > 0:
+            self.__state['etag'] = self.__state['etag'] or previous.get('etag')
+            self.__state['last_modified'] = self.__state['last_modified'] or previous.get('last_modified')
+
+        # Weak ETags cannot be used with If-Range
+        if self.__state['etag'] is not None and self.__state['etag'].startswith('W/'):
+            self.__state['etag'] = None
+
+        self.__save_state()
+
+        return mode
+
+
+    def __save_state(self):
+        """
+        Private method writing the recorded state next to the '.part' file.
+        """
+
+        # The image directory is created along with the first file written into it, by a writer thread if staged
+        os.makedirs(os.path.dirname(self.__state_path) or '.', exist_ok=True)
+
+        with open(self.__state_path, 'w') as f:
+            json.dump(self.__state, f)
+
+
+    def commit(self):
+        """
+        Renames the '.part' file into place if it holds the complete body. An incomplete file is kept so the
+        next attempt can resume it.
+
+        @return complete: bool - True if the file was complete and moved to its final path.
+        """
+
+        if self.__state is None or self.__state.get('preallocated') or not os.path.exists(self.__part_path):
+            return False
+
+        length = self.__state.get('length')
+
+        if length is not None and os.path.getsize(self.__part_path) != length:
+            return False
+
+        os.replace(self.__part_path, self.__path)
+        self.__remove(self.__state_path)
+        self.__state = None
+
+        return True
+
+
+    def discard(self):
+        """
+        Removes the '.part' file and its state so the next attempt starts from the beginning.
+        """
+
+        self.__remove(self.__part_path)
+        self.__remove(self.__state_path)
+        self.__state = None
+
+
+    def __load_state(self):
+        """
+        Private method reading the recorded state of a previous attempt, if any.
+        """
+
+        try:
+            with open(self.__state_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+    def __remove(self, path):
+        """
+        Private method removing a file which may not exist.
+        """
+
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+    def get_path(self):
+        """
+        Public accessor method returning the final path of the download.
+        """
+
+        return self.__path
+
+
+class PreallocatedFile(io.FileIO):
+    """
+    An unbuffered '.part' file whose remaining length is allocated up front. On close the file is cut back
+    to the bytes actually written, so a short response leaves a file which can be resumed.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    def __init__(self, path, offset, length, on_close):
+        """
+        Constructor which opens the file positioned at the offset writing continues from.
+
+        @param path: str - The path of the '.part' file.
+        @param offset: int - The number of bytes of the file to keep, writing continues after them.
+        @param length: int - The full length of the file.
+        @param on_close: function - A callable invoked once the file has been cut back and closed.
+        """
+
+        super().__init__(path, 'r+', opener=lambda name, flags: os.open(name, flags | os.O_CREAT, 0o644))
+        self.__on_close = on_close
+
+        # Bytes past the offset are left from an attempt which is not being resumed
+        self.truncate(offset)
+        self.seek(offset)
+        allocate(self.fileno(), offset, length)
+
+
+    def close(self):
+        """
+        Cuts the file back to the bytes written and closes it.
+        """
+
+        if not self.closed:
+            self.truncate(self.tell())
+            super().close()
+
+            self.__on_close()
+
+
+def allocate(fd, offset, length):
+    """
+    Reserves disk space for a file with posix_fallocate, extending it to its full length. File systems which
+    do not support preallocation are left to allocate as the file is written.
+
+    @param fd: int - The file descriptor of the file.
+    @param offset: int - The first byte of the range to reserve.
+    @param length: int - The full length of the file.
+    """
+
+    if length <= offset:
+        return
+
+    try:
+        os.posix_fallocate(fd, offset, length - offset)
+    except (AttributeError, OSError):
+        os.ftruncate(fd, max(length, os.fstat(fd).st_size))
@@ -0,0 +1,197 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import wait
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+
+class LatencyTracker:
+    """
+    Keeps a sliding window of recent time-to-first-byte samples per host and answers percentile queries
+    over it, so that what counts as a slow request is learned separately for every source.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    DEFAULT_WINDOW = 200
+    DEFAULT_MIN_SAMPLES = 20
+
+    def __init__(self, window=DEFAULT_WINDOW, min_samples=DEFAULT_MIN_SAMPLES):
+        """
+        Constructor which accepts the size of each host's window.
+
+        @param window: int - The number of most recent samples kept per host.
+        @param min_samples: int - The number of samples a host needs before percentiles are reported.
+        """
+
+        self.__hosts = {}
+        self.__window = window
+        self.__min_samples = min_samples
+        self.__lock = threading.Lock()
+
+
+    def record(self, host, latency):
+        """
+        Adds a sample to the window of a host.
+
+        @param host: str - A string containing the host name.
+        @param latency: float - The number of seconds until the response headers arrived.
+        """
+
+        with self.__lock:
+            self.__hosts.setdefault(host, deque(maxlen=self.__window)).append(latency)
+
+
+    def get_percentile(self, host, percentile):
+        """
+        Returns a latency percentile for a host.
+
+        @param host: str - A string containing the host name.
+        @param percentile: float - The percentile between 0 and 100.
+        @return latency: float - The latency in seconds, or None if the host has too few samples.
+        """
+
+        with self.__lock:
+            samples = self.__hosts.get(host)
+
+            if samples is None or len(samples) < self.__min_samples:
+                return None
+
+            ordered = sorted(samples)
+
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100.0))]
+
+
+class RequestHedger:
+    """
+    Sends requests so that one stuck on a bad Tor circuit does not hold up the run. If a request has not
+    returned its response headers within a percentile of the recent latency of its host, a duplicate is sent
+    over a different circuit and whichever answers first is used. The losing response is closed as soon as
+    it arrives, which drops its connection before the body is read. Hedges are capped at a fraction of all
+    requests so that a host which is slow across the board is not sent twice the traffic.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    DEFAULT_PERCENTILE = 95.0
+    DEFAULT_BUDGET = 0.05
+    DEFAULT_THREADS = 32
+
+    def __init__(self, percentile=DEFAULT_PERCENTILE, budget=DEFAULT_BUDGET, threads=DEFAULT_THREADS, logger=None):
+        """
+        Constructor which accepts when to hedge and how often.
+
+        @param percentile: float - The latency percentile of a host after which a request is hedged.
+        @param budget: float - The largest fraction of requests which may be hedged, between 0 and 1.
+        @param threads: int - The number of threads carrying requests and their hedges.
+        @param logger: Logger - An optional logger used to record hedges.
+        """
+
+        self.__logger = logger
+        self.__budget = float(budget)
+        self.__percentile = float(percentile)
+        self.__tracker = LatencyTracker()
+        self.__executor = ThreadPoolExecutor(max_workers=max(2, int(threads)), thread_name_prefix='hedge')
+
+        self.__wins = 0
+        self.__hedges = 0
+        self.__requests = 0
+        self.__lock = threading.Lock()
+
+
+    def send(self, host, primary, hedge):
+        """
+        Performs a request, hedging it if it is slow to respond.
+
+        @param host: str - A string containing the host name the request is sent to.
+        @param primary: function - A callable sending the request over its usual circuit and returning the response.
+        @param hedge: function - A callable sending the same request over a different circuit.
+        @return page: Response - The first successful response.
+        """
+
+        with self.__lock:
+            self.__requests += 1
+
+        first = self.__executor.submit(self.__timed, host, primary)
+        threshold = self.__tracker.get_percentile(host, self.__percentile)
+
+        if threshold is None or first in wait([first], timeout=threshold).done or not self.__take_budget():
+            return first.result()
+
+        if self.__logger is not None:
+            self.__logger.info("Hedging request to " + host + " after " + "{:.2f}".format(threshold) + " seconds.")
+
+        second = self.__executor.submit(self.__timed, host, hedge)
+        pending = {first, second}
+        error = None
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+
+                if future is second:
+                    with self.__lock:
+                        self.__wins += 1
+
+                # Close the loser as soon as it answers, it may also have completed already
+                for other in (first, second):
+                    if other is not future:
+                        other.add_done_callback(self.__discard)
+
+                return future.result()
+
+        raise error
+
+
+    def __timed(self, host, request):
+        """
+        Private method performing a request and recording how long its response took to arrive.
+        """
+
+        start = time.monotonic()
+        page = request()
+        self.__tracker.record(host, time.monotonic() - start)
+
+        return page
+
+
+    def __take_budget(self):
+        """
+        Private method reserving a hedge if doing so keeps hedges within the budget.
+        """
+
+        with self.__lock:
+            if self.__hedges + 1 > self.__budget * self.__requests:
+                return False
+
+            self.__hedges += 1
+            return True
+
+
+    def __discard(self, future):
+        """
+        Private callback closing the response of a request which lost the race.
+        """
+
+        if future.exception() is None:
+            future.result().close()
+
+
+    def close(self):
+        """
+        Waits for outstanding requests and stops the hedging threads.
+        """
+
+        if self.__logger is not None:
+            self.__logger.info("Hedged " + str(self.__hedges) + " of " + str(self.__requests) + " requests, " + \
+                str(self.__wins) + " hedges answered first.")
+
+        self.__executor.shutdown(wait=True)
@@ -0,0 +1,198 @@
+import socket
+import random
+import ftplib
+import zipfile
+import urllib3
+import requests
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from crawlers.deadline import DeadlineExceeded
+
+class DownloadError(Exception):
+    """
+    Raised when a single image download fails. The failure is classified so that the scheduler can decide
+    whether the item is worth retrying, and how long it should wait before doing so.
+
+    @author Vincent.Nigro
+    @version 0.0.2
+    @modified 10/16/26
+    """
+
+    # Failure classifications
+    TIMEOUT = 'timeout'
+    THROTTLED = 'throttled'
+    TRUNCATED = 'truncated'
+    PERMANENT = 'permanent'
+    CONNECTION = 'connection'
+    SERVER_ERROR = 'server-error'
+    NOT_PUBLISHED = 'not-published'
+
+    # Not a failure of the download itself, the run deadline left no time to start it
+    DEADLINE = 'deadline'
+
+    # Not a failure of the download itself, the circuit of its failing source was open so it was not requested
+    UNAVAILABLE = 'unavailable'
+
+    RETRYABLE = (TIMEOUT, THROTTLED, TRUNCATED, CONNECTION, SERVER_ERROR, NOT_PUBLISHED)
+
+    def __init__(self, kind, message, retry_after=None):
+        """
+        Constructor which accepts the classification of the failure.
+
+        @param kind: str - One of the failure classifications above.
+        @param message: str - A string describing the failure.
+        @param retry_after: float - An optional number of seconds the server asked clients to wait.
+        """
+
+        super().__init__(message)
+        self.kind = kind
+        self.retry_after = retry_after
+
+
+    def is_retryable(self):
+        """
+        Returns whether the failure is transient and the item should be queued again.
+        """
+
+        return self.kind in self.RETRYABLE
+
+
+def classify_status(status):
+    """
+    Classifies an unexpected HTTP status code.
+
+    @param status: int - The HTTP status code of a response.
+    @return kind: str - A DownloadError failure classification.
+    """
+
+    if status == 404:
+        # Images are often linked before they are published
+        return DownloadError.NOT_PUBLISHED
+    elif status in (429, 503):
+        return DownloadError.THROTTLED
+    elif status in (408, 504):
+        return DownloadError.TIMEOUT
+    elif status >= 500:
+        return DownloadError.SERVER_ERROR
+
+    return DownloadError.PERMANENT
+
+
+def classify_exception(e):
+    """
+    Classifies an exception raised while requesting or streaming an image into a DownloadError.
+
+    @param e: Exception - The exception raised by requests, urllib3, ftplib or the socket layer.
+    @return error: DownloadError - The classified failure.
+    """
+
+    if isinstance(e, DownloadError):
+        return e
+    elif isinstance(e, DeadlineExceeded):
+        kind = DownloadError.DEADLINE
+    elif isinstance(e, (requests.exceptions.Timeout, urllib3.exceptions.TimeoutError, socket.timeout)):
+        kind = DownloadError.TIMEOUT
+    elif isinstance(e, (requests.exceptions.ChunkedEncodingError, requests.exceptions.ContentDecodingError,
+        urllib3.exceptions.ProtocolError, zipfile.BadZipFile, EOFError)):
+        # Raised while streaming a body or reading an archive, the connection broke before every byte arrived
+        kind = DownloadError.TRUNCATED
+    elif isinstance(e, ftplib.error_perm):
+        # 550 is returned for files which do not exist (yet)
+        kind = DownloadError.NOT_PUBLISHED if str(e).startswith('550') else DownloadError.PERMANENT
+    elif isinstance(e, (requests.exceptions.ConnectionError, ftplib.error_temp, ConnectionError)):
+        kind = DownloadError.CONNECTION
+    elif isinstance(e, (requests.exceptions.InvalidURL, requests.exceptions.MissingSchema, ValueError)):
+        kind = DownloadError.PERMANENT
+    elif isinstance(e, (requests.exceptions.RequestException, OSError)):
+        kind = DownloadError.CONNECTION
+    else:
+        kind = DownloadError.PERMANENT
+
+    return DownloadError(kind, type(e).__name__ + ': ' + str(e))
+
+
+def parse_retry_after(value):
+    """
+    Parses a Retry-After header given either in seconds or as an HTTP date.
+
+    @param value: str - The value of the Retry-After header, may be None.
+    @return seconds: float - The number of seconds to wait, or None if the header is missing or invalid.
+    """
+
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter. A retryable item waits a random delay between zero and
+    base * 2^attempt seconds, capped, unless the server asked for a longer wait through Retry-After.
+    Images which are not published yet get fewer attempts since they rarely appear within a run.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    DEFAULT_MAX_ATTEMPTS = 4
+    DEFAULT_BASE_DELAY = 2.0
+    DEFAULT_MAX_DELAY = 120.0
+    NOT_PUBLISHED_MAX_ATTEMPTS = 2
+
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY):
+        """
+        Constructor which accepts the retry limits.
+
+        @param max_attempts: int - The total number of attempts made for an item, including the first one.
+        @param base_delay: float - The backoff delay in seconds for the first retry.
+        @param max_delay: float - The upper bound of any backoff delay in seconds.
+        """
+
+        self.__max_attempts = max(1, int(max_attempts))
+        self.__base_delay = float(base_delay)
+        self.__max_delay = float(max_delay)
+
+
+    def should_retry(self, error, attempt):
+        """
+        Decides whether an item which failed should be attempted again.
+
+        @param error: DownloadError - The classified failure.
+        @param attempt: int - The number of attempts made so far, starting at 1.
+        @return retry: bool - True if the item should be queued again.
+        """
+
+        if not error.is_retryable():
+            return False
+
+        if error.kind == DownloadError.NOT_PUBLISHED:
+            return attempt < min(self.__max_attempts, self.NOT_PUBLISHED_MAX_ATTEMPTS)
+
+        return attempt < self.__max_attempts
+
+
+    def get_delay(self, error, attempt):
+        """
+        Returns the number of seconds to wait before the next attempt.
+
+        @param error: DownloadError - The classified failure.
+        @param attempt: int - The number of attempts made so far, starting at 1.
+        @return delay: float - The backoff delay in seconds.
+        """
+
+        delay = random.uniform(0, min(self.__max_delay, self.__base_delay * (2 ** attempt)))
+
+        if error.retry_after is not None:
+            delay = max(delay, min(error.retry_after, self.__max_delay))
+
+        return delay
@@ -0,0 +1,127 @@
+from urllib.parse import urlsplit
+
+class RoutingTable:
+    """
+    Decides per request whether it is sent over Tor, directly, or through an upstream SOCKS/HTTP proxy. Rules
+    are keyed by host name, by domain suffix ('.nsmc.org.cn' or '*.nsmc.org.cn'), by URL prefix
+    ('img.nsmc.org.cn/PORTAL/NSMC/XML/', with or without its scheme) or by satellite name, and the first
+    matching rule wins. Requests matching no rule take the default route. Since pooled sessions are kept per
+    proxy configuration, every route gets connection pools of its own.
+
+    @author Vincent.Nigro
+    @version 0.0.2
+    @modified 10/16/26
+    """
+
+    TOR = 'tor'
+    DIRECT = 'direct'
+    DEFAULT_KEY = 'default'
+    PROXY_SCHEMES = ('socks4', 'socks5', 'socks5h', 'http', 'https')
+
+    def __init__(self, default=TOR):
+        """
+        Constructor which accepts the route of requests matching no rule.
+
+        @param default: str - Either 'tor', 'direct' or a proxy URL.
+        """
+
+        self.__rules = []
+        self.__default = self.__validate(default)
+
+
+    def add_rule(self, pattern, route):
+        """
+        Appends a rule to the table.
+
+        @param pattern: str - A host name, a domain suffix starting with '.' or '*.', a URL prefix, or a satellite name.
+        @param route: str - Either 'tor', 'direct' or a proxy URL such as 'socks5://127.0.0.1:1080'.
+        """
+
+        pattern = pattern.strip().lower().lstrip('*')
+
+        # A URL prefix is matched against the host and path of a request, whatever its scheme
+        if '://' in pattern:
+            pattern = pattern.split('://', 1)[1]
+
+        self.__rules.append((pattern, self.__validate(route)))
+
+
+    def get_route(self, link, satellite=''):
+        """
+        Returns the route a request should take.
+
+        @param link: str - A string containing the URL being requested.
+        @param satellite: str - The name of the satellite the request is made for.
+        @return route: str - Either 'tor', 'direct' or a proxy URL.
+        """
+
+        parts = urlsplit(link)
+        host = (parts.hostname or '').lower()
+        location = host + parts.path.lower()
+        satellite = (satellite or '').lower()
+
+        for pattern, route in self.__rules:
+            if '/' in pattern:
+                if location.startswith(pattern):
+                    return route
+            elif pattern == host or pattern == satellite or (pattern.startswith('.') and host.endswith(pattern)):
+                return route
+
+        return self.__default
+
+
+    def __validate(self, route):
+        """
+        Private method checking that a route is either a known keyword or a supported proxy URL.
+        """
+
+        route = route.strip()
+
+        if route.lower() in (self.TOR, self.DIRECT):
+            return route.lower()
+
+        if urlsplit(route).scheme.lower() not in self.PROXY_SCHEMES or not urlsplit(route).hostname:
+            raise ValueError("Invalid route '" + route + "', expected 'tor', 'direct' or a proxy URL.")
+
+        return route
+
+
+def parse_routes(spec):
+    """
+    Parses a comma separated list of PATTERN=ROUTE rules, 'default=ROUTE' setting the route of requests matching
+    no rule. A spec starting with '@' names a file holding one rule per line, where '#' starts a comment.
+    Ex: 'img.nsmc.org.cn=direct,GEO-KOMPSAT-2A=socks5://10.0.0.2:1080,default=tor'.
+
+    @param spec: str - A string containing the routing specification.
+    @return table: RoutingTable - The parsed routing table.
+    """
+
+    if spec.startswith('@'):
+        with open(spec[1:], 'r') as f:
+            entries = [line.split('#')[0] for line in f]
+    else:
+        entries = spec.split(',')
+
+    rules = []
+    default = RoutingTable.TOR
+
+    for entry in entries:
+        if entry.strip() == '':
+            continue
+
+        if '=' not in entry:
+            raise ValueError("Invalid route rule '" + entry.strip() + "', expected PATTERN=ROUTE.")
+
+        pattern, route = entry.split('=', 1)
+
+        if pattern.strip().lower() == RoutingTable.DEFAULT_KEY:
+            default = route
+        else:
+            rules.append((pattern, route))
+
+    table = RoutingTable(default)
+
+    for pattern, route in rules:
+        table.add_rule(pattern, route)
+
+    return table
@@ -0,0 +1,149 @@
+import os
+import time
+import threading
+
+# fcntl is only available on POSIX systems, runs are not locked elsewhere
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+class RunLock:
+    """
+    A lease on a satellite held for the length of a run, so that a cron run which overruns into the next one
+    does not race it on the same image directories and download every image twice. The lease is an exclusive
+    flock on a file per satellite, which the kernel releases when the process exits for any reason, so a
+    crashed run never leaves a stale lock behind. The process holding the lease is written into the file to
+    tell the waiting run who it is waiting on.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    DEFAULT_DIRECTORY = '.cache/locks'
+
+    def __init__(self, name, directory=DEFAULT_DIRECTORY):
+        """
+        Constructor which accepts the name the lease is taken on.
+
+        @param name: str - The name of the satellite being crawled.
+        @param directory: str - The directory lock files are kept in.
+        """
+
+        self.__path = os.path.join(directory, name.replace(os.sep, '_') + '.lock')
+        self.__fd = None
+
+
+    def acquire(self):
+        """
+        Takes the lease without waiting.
+
+        @return acquired: bool - True if the lease is held, False if another process holds it.
+        """
+
+        if self.__fd is not None or fcntl is None:
+            return True
+
+        os.makedirs(os.path.dirname(self.__path) or '.', exist_ok=True)
+        fd = os.open(self.__path, os.O_RDWR | os.O_CREAT, 0o644)
+
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+
+        os.ftruncate(fd, 0)
+        os.write(fd, (str(os.getpid()) + ' ' + time.strftime('%Y-%m-%d %H:%M:%S') + '\n').encode())
+        self.__fd = fd
+
+        return True
+
+
+    def release(self):
+        """
+        Gives the lease up.
+        """
+
+        if self.__fd is None:
+            return
+
+        fcntl.flock(self.__fd, fcntl.LOCK_UN)
+        os.close(self.__fd)
+        self.__fd = None
+
+
+    def get_holder(self):
+        """
+        Returns the process id and start time of the run holding the lease, as written into the lock file.
+
+        @return holder: str - A string containing the holder, empty if unknown.
+        """
+
+        try:
+            with open(self.__path, 'r') as f:
+                return f.read().strip()
+        except OSError:
+            return ''
+
+
+    def get_path(self):
+        """
+        Public accessor method returning the path of the lock file.
+        """
+
+        return self.__path
+
+
+class SingleFlight:
+    """
+    Lets only one caller at a time work on a key, and remembers keys whose work completed. Used to fetch an
+    image linked under several titles or link sets once per run: while a link is being downloaded, or once it
+    has been, further downloads of the same link are skipped rather than racing on its '.part' file. A key
+    whose work failed is released so its retry can claim it again.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    def __init__(self):
+        """
+        Constructor creating an empty set of keys.
+        """
+
+        self.__done = set()
+        self.__in_flight = set()
+        self.__lock = threading.Lock()
+
+
+    def claim(self, key):
+        """
+        Claims a key for the calling worker.
+
+        @param key: str - The key of the work, such as the link of an image.
+        @return claimed: bool - True if the caller should do the work, False if it is in flight or done.
+        """
+
+        with self.__lock:
+            if key in self.__in_flight or key in self.__done:
+                return False
+
+            self.__in_flight.add(key)
+            return True
+
+
+    def release(self, key, done=False):
+        """
+        Releases a claimed key.
+
+        @param key: str - The key of the work, such as the link of an image.
+        @param done: bool - True if the work completed and must not be done again during the run.
+        """
+
+        with self.__lock:
+            self.__in_flight.discard(key)
+
+            if done:
+                self.__done.add(key)
@@ -1,21 +1,49 @@
 import os
-import sys
 import time
-import signal
-import shutil
 import logging
-import zipfile
 import requests
-import multitasking
 from imp import reload
-from stem import Signal
 from datetime import date
 from datetime import datetime
 from contextlib import closing
-import urllib.request as request
-from stem.control import Controller
+from concurrent.futures import Future
+from urllib.parse import urlsplit
 from stem.util.log import get_logger
 from crawlers.crawler import Crawler
+from crawlers.retry import DownloadError
+from crawlers.deadline import DeadlineStream
+from crawlers.deadline import RequestTimeouts
+from crawlers.deadline import parse_timeouts
+from crawlers.http_cache import HttpCache
+from crawlers.retry import classify_status
+from crawlers.retry import parse_retry_after
+from crawlers.retry import classify_exception
+from crawlers.circuit_lanes import LanePool
+from crawlers.circuit_lanes import CircuitLane
+from crawlers.request_hedger import RequestHedger
+from crawlers.routing import RoutingTable
+from crawlers.routing import parse_routes
+from crawlers.zip_spool import ZipSpool
+from crawlers.disk_writer import DiskWriter
+from crawlers.bandwidth import ThrottledStream
+from crawlers.bandwidth import BandwidthGovernor
+from crawlers.stream_copier import StreamCopier
+from crawlers.segmented_download import SegmentedDownloader
+from crawlers.partial_download import PartialDownload
+from crawlers.session_manager import SessionManager
+from crawlers.exit_scoring import ExitScorer
+from crawlers.exit_scoring import ExitScoreBoard
+from crawlers.tor_telemetry import TorTelemetry
+from crawlers.tor_telemetry import TelemetryListener
+from crawlers.run_lock import RunLock
+from crawlers.run_lock import SingleFlight
+from crawlers.ftp_pool import FtpConnectionPool
+from crawlers.tor_launcher import TorLauncher
+from crawlers.tor_pool import TorInstance
+from crawlers.tor_pool import TorInstancePool
+from crawlers.tor_pool import parse_tor_instances
+from crawlers.tor_rotation import CircuitRotator
+from crawlers.tor_rotation import parse_rotation_policies
 
 class SatelliteCrawler(Crawler):
     """
@@ -25,8 +53,8 @@ class SatelliteCrawler(Crawler):
     requires using the Tor network and using the default settings (including ControlPort) to access the network.
 
     @author Vincent.Nigro
-    @version 0.0.6
-    @modified 10/11/23
+    @version 0.0.24
+    @modified 10/16/26
     """
     
     # Supported satellite names
@@ -50,9 +78,16 @@ class SatelliteCrawler(Crawler):
     METEOSAT_9_NAME = 'METEOSAT-9'
     METEOSAT_11_NAME = 'METEOSAT-11'
     GEO_KOMPSAT_2A_NAME = 'GEO-KOMPSAT-2A'
-    
-    # kill all tasks on ctrl-c
-    signal.signal(signal.SIGINT, multitasking.killall)
+
+    # Exit relay modes
+    EXIT_SCORE_MODE = 'score'
+    EXIT_STEER_MODE = 'steer'
+
+    # Routing rules of the satellite which apply after any configured on the command line
+    DEFAULT_ROUTES = ()
+
+    # Logged in FTP connections shared by every ELEKTRO and ARKTIKA crawler, which download from the same server
+    FTP_POOL = FtpConnectionPool()
 
     def __init__(self, url, satellite):
         """
@@ -70,176 +105,815 @@ class SatelliteCrawler(Crawler):
         # Initialize logging for starting up satellite crawler
         self.__initialize_logging()
 
+        # Lease on the satellite across processes, and links being or already downloaded within the run
+        self._run_lock = RunLock(satellite)
+        self._single_flight = SingleFlight()
+
+        # Pooled keep-alive sessions shared across download threads
+        self._sessions = SessionManager(logger=self._logger)
+
+        # Connect and read timeouts so a stalled stream cannot hang a worker, optionally set per host
+        self._timeouts = RequestTimeouts()
+
+        # Wall clock budget of the run, after which no further listing pages are requested (disabled by default)
+        self._deadline = None
+
+        # Conditional GET cache for listing and index pages
+        self._http_cache = HttpCache()
+
+        # Copies response bodies to disk through a reusable buffer, optionally keeping them out of the page cache
+        self._copier = StreamCopier()
+
+        # Caps the bytes per second read across every download, shared by weight between products (disabled by default)
+        self._bandwidth = None
+
+        # Writer threads carrying out file system work on behalf of the network workers (disabled by default)
+        self._writer = None
+
+        # Image filters limiting which members of zipped payloads are extracted (all members by default)
+        self._zip_filters = []
+
+        # Routing table choosing Tor, a direct connection or an upstream proxy per host or satellite
+        self._routes = self.__build_routes(RoutingTable())
+
+        # Circuit lanes isolating concurrent downloads onto separate Tor circuits (disabled by default)
+        self._lanes = LanePool()
+
+        # Fetches large files as concurrent byte ranges over circuits of their own (disabled by default)
+        self._segmenter = None
+
+        # Duplicates requests which are slow to respond over a circuit of their own (disabled by default)
+        self._hedger = None
+        self._hedge_lane = CircuitLane('hedge')
+
+        # Local Tor clients requests are spread across, by default the single system client on 9050/9051
+        self._tor_pool = TorInstancePool([TorInstance(logger=self._logger)], logger=self._logger)
+
+        # Private Tor clients launched and owned by the crawler instead of the system client (disabled by default)
+        self._launcher = None
+        self.__warm_circuits = TorLauncher.DEFAULT_WARM_CIRCUITS
+        self.__tor_strategy = TorInstancePool.ROUND_ROBIN
+        self.__rotation_spec = CircuitRotator.DEFAULT_POLICY
+
+        # Exit relay scoring and per destination exit steering (disabled by default)
+        self._exit_mode = None
+        self._exit_scorers = []
+
+        # Circuit, stream and bandwidth events of the Tor clients attributed to each host (disabled by default)
+        self._telemetry = None
+        self._telemetry_listeners = []
+
+        # Long-lived ControlPort connections and policies deciding when to generate a new Tor IP. Pooled
+        # sessions are retired on rotation since their connections would otherwise stay on the old circuit.
+        self._rotation = CircuitRotator(self._tor_pool,
+            parse_rotation_policies(CircuitRotator.DEFAULT_POLICY), on_rotate=self._sessions.retire)
+
+
+    def configure_downloads(self, options):
+        """
+        Applies the download layer options parsed from the command line to the crawler prior to a run.
+
+        @param options: {} - A key-value mapping of download option names to their configured values.
+        """
+
+        if 'workers' in options:
+            self._sessions.set_pool_size(options['workers'])
+
+        if options.get('http2'):
+            self._sessions.set_http2(True)
+
+        if options.get('dropcache'):
+            self._copier = StreamCopier(drop_cache=True)
+
+        if 'bandwidth' in options:
+            self._bandwidth = BandwidthGovernor(options['bandwidth'], options.get('shares'), self._logger)
+
+        if 'writers' in options:
+            self._writer = DiskWriter(options['writers'], drop_cache=options.get('dropcache', False), logger=self._logger)
+
+        if options.get('zipfilter'):
+            self._zip_filters = options.get('images', [])
+
+        if 'nocache' in options:
+            self._http_cache = HttpCache(enabled=not options['nocache'])
+
+        if 'segments' in options:
+            self._segmenter = SegmentedDownloader(options['segments'], logger=self._logger)
+
+        if 'hedge' in options:
+            self._hedger = RequestHedger(options['hedge'], options.get('hedgebudget', RequestHedger.DEFAULT_BUDGET),
+                2 * options.get('workers', RequestHedger.DEFAULT_THREADS // 2), self._logger)
+
+        if 'timeouts' in options:
+            self._timeouts = parse_timeouts(options['timeouts'])
+
+        if 'routes' in options:
+            self._routes = self.__build_routes(parse_routes(options['routes']))
+
+        if 'lanes' in options:
+            self._lanes = LanePool(options['lanes'], options.get('lanemode', LanePool.WORKER_MODE))
+
+        self.__tor_strategy = options.get('torstrategy', TorInstancePool.ROUND_ROBIN)
+        self.__rotation_spec = options.get('rotate', CircuitRotator.DEFAULT_POLICY)
+
+        if 'torinstances' in options:
+            self._tor_pool = TorInstancePool(parse_tor_instances(options['torinstances'], self._logger),
+                self.__tor_strategy, self._logger)
+
+        if 'launchtor' in options:
+            self._launcher = TorLauncher(options['launchtor'], logger=self._logger)
+
+            # Every circuit lane should find a clean circuit waiting on its first request
+            self.__warm_circuits = max(TorLauncher.DEFAULT_WARM_CIRCUITS, options.get('lanes', 0) + 1)
+
+        if 'exits' in options:
+            if options['exits'] not in (self.EXIT_SCORE_MODE, self.EXIT_STEER_MODE):
+                raise ValueError("Unknown exit mode '" + options['exits'] + "'.")
+            self._exit_mode = options['exits']
+
+        if options.get('telemetry'):
+            self._telemetry = TorTelemetry(self.__satellite, self._logger)
+
+        if 'rotate' in options or 'torinstances' in options:
+            self._rotation = CircuitRotator(self._tor_pool,
+                parse_rotation_policies(self.__rotation_spec), on_rotate=self._sessions.retire)
+
+
+    def __build_routes(self, table):
+        """
+        Private method appending the default routing rules of the satellite to a routing table, so rules given
+        on the command line take precedence over them.
+        """
+
+        for pattern, route in self.DEFAULT_ROUTES:
+            table.add_rule(pattern, route)
+
+        return table
+
+
+    def launch_tor(self, pw):
+        """
+        Launches the private Tor clients, routes every request through them and pre-builds their circuits.
+        Does nothing unless launching was configured.
+
+        @param pw: str - A string containing the Tor password for the given system configuration.
+        """
+
+        if self._launcher is None:
+            return
+
+        instances = self._launcher.launch(pw)
+
+        self._tor_pool.close()
+        self._sessions.close()
+        self._tor_pool = TorInstancePool(instances, self.__tor_strategy, self._logger)
+        self._rotation = CircuitRotator(self._tor_pool,
+            parse_rotation_policies(self.__rotation_spec), on_rotate=self._sessions.retire)
+
+        self._launcher.warm(instances, pw, self.__warm_circuits)
+
+
+    def start_exit_scoring(self, pw):
+        """
+        Starts recording the latency and throughput of every exit relay per destination host on each Tor
+        instance, and steers new streams toward the best exits for their destination when configured to.
+        Does nothing unless an exit mode was configured.
+
+        @param pw: str - A string containing the Tor password for the given system configuration.
+        """
+
+        if self._exit_mode is None or self._exit_scorers:
+            return
+
+        scoreboard = ExitScoreBoard()
+
+        for instance in self._tor_pool.get_instances():
+            scorer = ExitScorer(instance.get_controller(), scoreboard, self._exit_mode == self.EXIT_STEER_MODE,
+                logger=self._logger)
+
+            try:
+                scorer.start(pw)
+                self._exit_scorers.append(scorer)
+            except Exception as e:
+                self._logger.error("Could not start exit scoring on Tor instance " + str(instance) + ": " + str(e))
+
 
-    @multitasking.task
-    def download_images(self, links, pw, notor=False):
+    def set_deadline(self, deadline):
         """
-        A generic function which accepts a dictionary of links where each entry is a key-value mapping of 
-        a standardized title as the key, and a link containing the high resolution image that needs to be
-        downloaded. The title is formatted as the following: 'TITLE - DATE - HH-MM UTC'. Each web crawler
-        must ensure the title key is in the above format as the appropriate directories are made based off
-        of that assumption. Each link to an image will be downloaded if not already done and will be stored
-        in an appropriate file system hierarchy. If the crawler is for ELEKTRON-L2 spacecraft, the download 
-        is done via the FTP protocol where all other spacecraft are performed with HTTP/HTTPS web crawling via
-        the Tor client network.
+        Sets the deadline of the run, so link extraction requests no further listing pages once it has passed
+        and transfers in flight are aborted at its cutoff.
 
-        @param links: {} - A key-value mapping of a title key in a standard format and its appropriate image link
+        @param deadline: RunDeadline - The deadline of the run, None to disable it.
+        """
+
+        self._deadline = deadline
+
+
+    def acquire_run_lock(self):
+        """
+        Takes the lease on the satellite for the run, so a run which overlaps with another one of the same
+        satellite does not download the same images.
+
+        @return acquired: bool - True if the run may go ahead, False if another process holds the lease.
+        """
+
+        if self._run_lock.acquire():
+            return True
+
+        locked_log = "Another run of " + self.__satellite + " (" + (self._run_lock.get_holder() or 'unknown') + \
+            ") holds " + self._run_lock.get_path() + ", skipping this run."
+        self._logger.warning(locked_log)
+        print(locked_log)
+
+        return False
+
+
+    def start_telemetry(self, pw):
+        """
+        Starts listening to the circuit, stream and bandwidth events of each Tor instance. Does nothing unless
+        telemetry was configured.
+
+        @param pw: str - A string containing the Tor password for the given system configuration.
+        """
+
+        if self._telemetry is None or self._telemetry_listeners:
+            return
+
+        for instance in self._tor_pool.get_instances():
+            listener = TelemetryListener(instance.get_controller(), self._telemetry, self._logger)
+
+            try:
+                listener.start(pw)
+                self._telemetry_listeners.append(listener)
+            except Exception as e:
+                self._logger.error("Could not start telemetry on Tor instance " + str(instance) + ": " + str(e))
+
+
+    def close(self):
+        """
+        Releases the network resources held by the crawler such as pooled sessions and the ControlPort connection.
+        """
+
+        for scorer in self._exit_scorers:
+            scorer.stop()
+        self._exit_scorers = []
+
+        for listener in self._telemetry_listeners:
+            listener.stop()
+        self._telemetry_listeners = []
+
+        if self._telemetry is not None:
+            self._telemetry.log_summary()
+
+        if self._hedger is not None:
+            self._hedger.close()
+
+        if self._writer is not None:
+            self._writer.close()
+
+        self._sessions.close()
+        self._tor_pool.close()
+
+        if self._launcher is not None:
+            self._launcher.stop()
+
+        if self.is_ftp_satellite():
+            self.FTP_POOL.close()
+
+        self._run_lock.release()
+
+
+    def download_image(self, title, link, pw='', notor=False):
+        """
+        Downloads a single image link if not already done and stores it in an appropriate file system hierarchy.
+        If the crawler is for an ELEKTRO or ARKTIKA spacecraft, the download is done via the FTP protocol where
+        all other spacecraft are performed with HTTP/HTTPS web crawling via the Tor client network. This method
+        does not spawn any threads and is the unit of work run by the DownloadScheduler worker pool. Failures are
+        raised as a classified DownloadError so the scheduler can decide whether to retry the link. When a
+        DiskWriter is configured, the file system work is queued on its threads and a Future is returned which
+        completes, or fails, once the image has been committed. A link which is being downloaded under another
+        title, or already was during the run, is skipped.
+
+        @param title: str - A string containing the following standard format: 'TITLE - DATE - HH-MM UTC'
+        @param link: str - A string containing the link to the image to be downloaded.
         @param pw: str - A string containing the Tor password for the given system configuration.
         @param notor: bool - An optional parameter for not using the Tor network.
+        @return downloaded: bool - False if the image had already been downloaded, or a Future of the commit.
         """
 
-        # For each link, extract and name img dir as title
-        for title, link in links.items():
-            starting_info = 'Thread ' + title + ' has started download...'
-            print(starting_info)
-            self._logger.info(starting_info)
-            
-            failed_download = False
-
-            # Create file name derived from link path
-            filename = link.split("/")[-1]
-
-            #Create path SAT_DIRECTORY/DD MMM YYYY/HH-MM/title to contain filename
-            dir_path = self._create_img_dir(title)
-
-            # Only request image page if needs to be downloaded
-            if not self._image_exists(title):
-                # Check if path exists prior to attempting to create path
-                if not os.path.exists(dir_path):
-                    self._logger.info("Creating directory path " + dir_path + ".")
-                    os.makedirs(dir_path)
-
-                # Create full relative path including file name
-                path = os.path.join(dir_path, filename)
-
-                if self.get_satellite_name() == self.ELEKTRO_L2_NAME or \
-                        self.get_satellite_name() == self.ELEKTRO_L3_NAME or \
-                        self.get_satellite_name() == self.ELEKTRO_L4_NAME or \
-                        self.get_satellite_name() == self.ARKTIKA_M1_NAME or \
-                        self.get_satellite_name() == self.ARKTIKA_M2_NAME: # FTP Download
-                    try:
-                        self._logger.info("Attempting to fetch FTP link at: " + link)
-                        with closing(request.urlopen(link)) as r:
-                            with open(path, 'wb') as f:
-                                shutil.copyfileobj(r, f)
-                    except Exception as e:
-                        self._logger.error(e)
-                        print(e)
-                        sys.exit(1)
-                else: # HTTP/HTTPS download
-                    # Create new tor session to extract page
-                    page = self._extract_content(link, pw, True, notor)
-                    
-                    # proceed processing if image page was extracted
-                    if (page.status_code == self.OK_STATUS):
-                        # Set decode_content to True, otherwise image file size will be 0.
-                        page.raw.decode_content = True
-
-                        # download file to path      
-                        with open(path,'wb') as f:
-                            self._logger.info("Downloading " + title + "...")
-                            shutil.copyfileobj(page.raw, f)
-                            f.close()
-                
-                        # if file is zipped, unzip and remove zip file
-                        if (self.ZIP_EXTENSION in filename):
-                            try:
-                                with zipfile.ZipFile(path, 'r') as ref:
-                                    self._logger.info("Downloaded file was zipped, extracting to " + dir_path + ".")
-                                    ref.extractall(dir_path)
-                                    ref.close()
-                        
-                                self._logger.info("Removing zipped file located at " + path + ".")
-                                os.remove(path)
-                            except Exception as e:
-                                print(e)
-                                self._logger.error(e)
-                                failed_download = True
-                    else:
-                        failed_download_log = title + " failed to download."
-                        self._logger.info(failed_download_log)
-                        print(failed_download_log)
-                
-                if not failed_download:
-                    downloaded_log = title + " has downloaded."
-                    self._logger.info(downloaded_log)
-                    print(downloaded_log)
-            else:
-                already_downloaded_log = "An image for " + title + " has already been downloaded."
-                self._logger.info(already_downloaded_log)
-                print(already_downloaded_log)
+        if not self._single_flight.claim(link):
+            duplicate_log = "The link for " + title + " is already being downloaded in this run, skipping."
+            self._logger.info(duplicate_log)
+            print(duplicate_log)
+            return False
+
+        try:
+            downloaded = self.__fetch_image(title, link, pw, notor)
+        except Exception:
+            self._single_flight.release(link)
+            raise
+
+        # The link stays claimed until the image is committed, and for good once it has been
+        if isinstance(downloaded, Future):
+            downloaded.add_done_callback(lambda future: self._single_flight.release(link, future.exception() is None))
+        else:
+            self._single_flight.release(link, True)
+
+        return downloaded
+
+
+    def __fetch_image(self, title, link, pw='', notor=False):
+        """
+        Private method carrying out a download claimed by download_image().
+
+        @param title: str - A string containing the following standard format: 'TITLE - DATE - HH-MM UTC'
+        @param link: str - A string containing the link to the image to be downloaded.
+        @param pw: str - A string containing the Tor password for the given system configuration.
+        @param notor: bool - An optional parameter for not using the Tor network.
+        @return downloaded: bool - False if the image had already been downloaded, or a Future of the commit.
+        """
+
+        # Only request image page if needs to be downloaded
+        path = self._prepare_download(title, link)
+        if path is None:
+            return False
+
+        # Writes go to a '.part' file which is only renamed into place once complete
+        partial = self._open_download(path)
 
+        if self._writer is not None:
+            partial = self._writer.stage(partial)
 
-    def _extract_content(self, link, pw='', streaming=False, notor=False):
+        try:
+            if self.is_ftp_satellite(): # FTP Download
+                self._logger.info("Attempting to fetch FTP link at: " + link)
+                with closing(self.FTP_POOL.open(link, self._get_timeout(link))) as r:
+                    with partial.open(PartialDownload.OK_STATUS, r.headers) as f:
+                        self._copier.copy(self._wrap_stream(r, title), f)
+            else: # HTTP/HTTPS download
+                self.__download_http(title, link, partial, pw, notor)
+        except Exception as e:
+            error = classify_exception(e)
+            if error is not e:
+                error.__cause__ = e
+
+            if self._writer is None:
+                raise error
+
+            def fail():
+                raise error
+
+            # Writes of the '.part' file may still be queued, the failure is only reported once they have been
+            # carried out so that neither a retry nor another claim of the link races them
+            return partial.then(fail)
+
+        if self._writer is not None:
+            # The network worker moves on to its next request while the writer threads finish this one
+            return partial.then(lambda: self.__commit_download(title, partial))
+
+        return self.__commit_download(title, partial)
+
+
+    def __commit_download(self, title, partial):
+        """
+        Private method moving a received download into place, raising a DownloadError if it is incomplete.
+
+        @param title: str - A string containing the following standard format: 'TITLE - DATE - HH-MM UTC'
+        @param partial: PartialDownload - The download the response body was written to, or a ZipSpool.
+        @return downloaded: bool - True once the image is in place.
         """
-        A generic page extraction function utilizing the Tor session and recycling the current IP
-        to another once the GET request has been fufilled and returned.
+
+        try:
+            complete = partial.commit()
+        except Exception as e:
+            raise classify_exception(e) from e
+
+        if not complete:
+            raise DownloadError(DownloadError.TRUNCATED, title + " was truncated, kept " + \
+                str(partial.get_offset()) + " bytes to resume.")
+
+        downloaded_log = title + " has downloaded."
+        self._logger.info(downloaded_log)
+        print(downloaded_log)
+
+        return True
+
+
+    def __download_http(self, title, link, partial, pw='', notor=False):
+        """
+        Private method streaming an image over HTTP/HTTPS into the '.part' file of a download, resuming any
+        bytes left by a previous attempt. When segmenting is enabled, the request asks for an open ended byte
+        range and large files are completed as concurrent ranges over separate circuit lanes.
+
+        @param title: str - A string containing the following standard format: 'TITLE - DATE - HH-MM UTC'
+        @param link: str - A string containing the link to the image to be downloaded.
+        @param partial: PartialDownload - The download the response body is written to, or a ZipSpool.
+        @param pw: str - A string containing the Tor password for the given system configuration.
+        @param notor: bool - An optional parameter for not using the Tor network.
+        """
+
+        headers = partial.get_request_headers()
+
+        # An open ended range reveals the length of the file while its body supplies the first segment
+        segmented = self._segmenter is not None and hasattr(partial, 'open_segments')
+        if segmented:
+            headers['Range'] = self._segmenter.get_range_header(partial.get_offset())
+
+        # Extract page through the pooled tor session
+        page = self._extract_content(link, pw, True, notor, headers)
+
+        try:
+            # proceed processing if image page was extracted
+            if page.status_code not in (self.OK_STATUS, PartialDownload.PARTIAL_CONTENT_STATUS):
+                # A stale '.part' file can no longer be resumed
+                if page.status_code == PartialDownload.RANGE_NOT_SATISFIABLE_STATUS:
+                    partial.discard()
+
+                raise DownloadError(classify_status(page.status_code), "HTTP status " + str(page.status_code) + \
+                    " for " + link, parse_retry_after(page.headers.get('Retry-After')))
+
+            # Set decode_content to True, otherwise image file size will be 0.
+            page.raw.decode_content = True
+            page.raw = self._wrap_stream(page.raw, title)
+
+            if segmented and self._segmenter.accepts(page, partial.get_offset()):
+                def fetch(headers, lane):
+                    segment = self.__send(link, True, notor, headers, lane)
+                    segment.raw = self._wrap_stream(segment.raw, title)
+                    return segment
+
+                self._segmenter.download(title, page, partial, fetch)
+                return
+
+            # download file to path
+            with partial.open(page.status_code, page.headers) as f:
+                if page.status_code == PartialDownload.PARTIAL_CONTENT_STATUS:
+                    self._logger.info("Resuming " + title + " at byte " + str(partial.get_offset()) + "...")
+                else:
+                    self._logger.info("Downloading " + title + "...")
+                self._copier.copy(page.raw, f)
+        finally:
+            # Return the pooled connection for reuse by the next download
+            page.close()
+
+
+    def renew_circuit(self, title, link, error=None):
+        """
+        Moves the next request for a link onto a fresh Tor circuit by renewing the SOCKS credentials of the
+        circuit lane it is assigned to, along with the lanes of segmented downloads. Used by the DownloadScheduler
+        before retrying a failed download, and has no effect when circuit lanes and segmenting are disabled, or
+        when telemetry shows the exits cannot reach the origin of the link.
+
+        @param title: str - A string containing the following standard format: 'TITLE - DATE - HH-MM UTC'
+        @param link: str - A string containing the link which failed to download.
+        @param error: DownloadError - The classified failure which triggered the retry.
+        """
+
+        if self.__is_origin_failing(link):
+            self._logger.info("Kept the circuit for " + title + ", its origin is failing rather than Tor.")
+            return
+
+        lane = self._lanes.get_lane(link)
+        retired = []
+
+        if lane is not None:
+            retired.append(lane.renew())
+            self._logger.info("Renewed circuit lane " + lane.get_name() + " before retrying " + title + ".")
+
+        if self._segmenter is not None:
+            retired.extend(self._segmenter.renew())
+
+        # Sessions are kept per proxy, so those of the retired credentials would never be used again
+        for username in retired:
+            self._sessions.close_username(username)
+
+
+    def _wrap_stream(self, stream, title):
+        """
+        Wraps a response body so its reads are paced by the bandwidth governor under the share of the image,
+        and aborted once the cutoff of the run deadline has passed.
+
+        @param stream: file - A readable binary stream such as Response.raw or an FTP response.
+        @param title: str - A string containing the following standard format: 'TITLE - DATE - HH-MM UTC'
+        @return stream: file - The wrapped stream, or the stream itself with neither a bandwidth cap nor a deadline.
+        """
+
+        if self._bandwidth is not None:
+            stream = ThrottledStream(stream, self._bandwidth, self._bandwidth.get_share(title, self.__satellite))
+
+        if self._deadline is not None:
+            stream = DeadlineStream(stream, self._deadline, title)
+
+        return stream
+
+
+    def _get_timeout(self, link):
+        """
+        Returns the connect and read timeouts of a request for a link, shortened to end by the cutoff of the
+        run deadline.
+
+        @param link: str - A string containing the URL being requested.
+        @return timeout: () - A (connect, read) tuple of seconds.
+        """
+
+        timeout = self._timeouts.get_timeout(link)
+
+        if self._deadline is not None:
+            timeout = self._deadline.limit_timeout(timeout)
+
+        return timeout
+
+
+    def _prepare_download(self, title, link):
+        """
+        Logs the start of a download and returns the path of a title which has not been downloaded yet. Shared
+        by the threaded and asyncio download paths. The existence check runs on the calling thread since it
+        decides whether a request is sent at all, while the image directory is only created when the first file
+        is written into it, on a writer thread when a DiskWriter is configured.
+
+        @param title: str - A string containing the following standard format: 'TITLE - DATE - HH-MM UTC'
+        @param link: str - A string containing the link to the image to be downloaded.
+        @return path: str - The relative path the image should be written to, or None if it already exists.
+        """
+
+        starting_info = 'Thread ' + title + ' has started download...'
+        print(starting_info)
+        self._logger.info(starting_info)
+
+        # Create file name derived from link path
+        filename = link.split("/")[-1]
+
+        #Create path SAT_DIRECTORY/DD MMM YYYY/HH-MM/title to contain filename
+        dir_path = self._create_img_dir(title)
+
+        if self._image_exists(title):
+            already_downloaded_log = "An image for " + title + " has already been downloaded."
+            self._logger.info(already_downloaded_log)
+            print(already_downloaded_log)
+            return None
+
+        # Create full relative path including file name
+        return os.path.join(dir_path, filename)
+
+
+    def _open_download(self, path):
+        """
+        Creates the writer a download is received into. Zipped payloads are spooled in memory and their
+        members extracted next to the archive, every other file is written to a resumable '.part' file.
+        Shared by the threaded and asyncio download paths.
+
+        @param path: str - The relative path the image should be written to.
+        @return download: PartialDownload - A PartialDownload, or a ZipSpool for zipped payloads.
+        """
+
+        if self.ZIP_EXTENSION in os.path.basename(path):
+            self._logger.info("Download is zipped, extracting members to " + os.path.dirname(path) + ".")
+            return ZipSpool(path, self._zip_filters)
+
+        return PartialDownload(path)
+
+
+    def is_ftp_satellite(self):
+        """
+        Public method returning whether the satellite is downloaded via the FTP protocol rather than HTTP/HTTPS.
+        """
+
+        return self.get_satellite_name() in (self.ELEKTRO_L2_NAME, self.ELEKTRO_L3_NAME, self.ELEKTRO_L4_NAME,
+            self.ARKTIKA_M1_NAME, self.ARKTIKA_M2_NAME)
+
+
+    def _extract_content(self, link, pw='', streaming=False, notor=False, headers=None):
+        """
+        A generic page extraction function utilizing a pooled Tor session and recycling the current IP
+        to another once the GET request has been fufilled and returned. Streamed responses must be closed
+        by the caller so their connection is returned to the pool. When hedging is enabled, a request which
+        is slow to respond is duplicated over the hedge circuit and the first response is returned.
 
         @param link: str - A string containing a URL to some HTML page.
         @param pw: str - A string containing the Tor password for the given system configuration.
         @param streaming: bool - Defaults to false, set to True when dealing with a binary file like an image.
         @param notor: bool - An optional parameter for not using the Tor network.
+        @param headers: {} - An optional mapping of additional request headers.
         @return page: Response - Returns a requests.Response object
         """
 
-        page = None
+        # Resolve the lane on the calling thread so worker lanes stay pinned when requests are hedged
+        lane = self._lanes.get_lane(link)
 
-        # Create new tor session to extract page
-        s = self._get_tor_session(notor)
-        
         # Extract html archive page
         self._logger.info("Extracting page content at link: " + link)
-        if streaming:
-            page = s.get(link, stream=streaming)
-        else:
-            page = s.get(link)
-        s.close()
+        try:
+            if self._hedger is None:
+                page = self.__send(link, streaming, notor, headers, lane)
+            else:
+                page = self._hedger.send(urlsplit(link).hostname or '',
+                    lambda: self.__send(link, streaming, notor, headers, lane),
+                    lambda: self.__send(link, streaming, notor, headers, self._hedge_lane))
+        except requests.exceptions.RequestException:
+            self._record_rotation(link, pw, notor, failed=True)
+            raise
 
-        if pw != '' and not notor:
-            # Generate a new Tor IP
-            self._renew_connection(pw)
+        self._record_rotation(link, pw, notor, self.__get_content_length(page, streaming),
+            page.status_code >= self.BAD_REQUEST_STATUS)
 
         return page
 
 
-    def _get_tor_session(self, notor=False):
+    def _record_rotation(self, link, pw, notor=False, nbytes=0, failed=False):
         """
-        Creates a requests session using the standard SOCKS5 localhost ports used by Tor.
+        Reports a request to the rotation policies, which decide whether to generate a new Tor IP. Shared by
+        link extraction and both download paths. Requests which did not go over Tor are not counted.
 
+        @param link: str - A string containing the URL which was requested.
+        @param pw: str - A string containing the Tor password for the given system configuration.
         @param notor: bool - An optional parameter for not using the Tor network.
-        @return session: Session - A requests.Session type containing static SOCK5 HTTP/HTTPS proxies configured 
-        to default Tor output socket.
+        @param nbytes: int - The number of bytes carried by the response, 0 if unknown.
+        @param failed: bool - True if the request failed or was answered with an error status.
         """
 
-        self._logger.info("Creating new tor session for satellite " + self.__satellite)
-        
-        # initialize a requests Session
-        session = requests.Session()
-        
-        # setting the proxy of both http & https to the localhost:9050 
+        if pw == '' or self._get_route(link, notor) != RoutingTable.TOR:
+            return
+
+        # A new identity cannot help while the exits are unable to reach the origin
+        self._rotation.record(pw, nbytes, failed and not self.__is_origin_failing(link))
+
+
+    def __send(self, link, streaming, notor, headers, lane):
+        """
+        Private method sending a single GET request over the route of the link and, when that route is Tor,
+        recording the outcome against the health of the Tor instance from the pool which carried it.
+
+        @param link: str - A string containing a URL to some HTML page.
+        @param streaming: bool - True to defer reading the response body.
+        @param notor: bool - An optional parameter for not using the Tor network.
+        @param headers: {} - An optional mapping of additional request headers.
+        @param lane: CircuitLane - The circuit lane the request is carried on, None for the default circuit.
+        @return page: Response - Returns a requests.Response object
+        """
+
+        failed = True
+        start = time.time()
+
+        # Pick the Tor instance to carry the request and reuse its pooled session for the host of the link
+        instance = self._tor_pool.acquire() if self._get_route(link, notor) == RoutingTable.TOR else None
+        s = self._get_tor_session(notor, link, instance, lane)
+
+        try:
+            page = s.get(link, stream=streaming, headers=headers, timeout=self._get_timeout(link))
+            failed = False
+
+            if instance is not None and self._telemetry is not None:
+                self._telemetry.record_response(urlsplit(link).hostname or '', time.time() - start)
+        finally:
+            # Only transport failures count against the health of the Tor instance
+            if instance is not None:
+                self._tor_pool.release(instance, time.time() - start, failed)
+
+        return page
+
+
+    def __is_origin_failing(self, link):
+        """
+        Private method returning whether telemetry shows the exits failing to reach the host of a link.
+
+        @param link: str - A string containing a full link.
+        @return failing: bool - True if the origin of the link is failing rather than Tor.
+        """
+
+        return self._telemetry is not None and self._telemetry.is_origin_failing(urlsplit(link).hostname or '')
+
+
+    def __get_content_length(self, page, streaming):
+        """
+        Private method returning the number of bytes carried by a response, 0 if it is not yet known.
+
+        @param page: Response - A requests.Response object.
+        @param streaming: bool - True if the response body has not been read yet.
+        @return length: int - The number of bytes in the response body.
+        """
+
+        if not streaming:
+            return len(page.content)
+
+        try:
+            return int(page.headers.get('Content-Length', 0))
+        except ValueError:
+            return 0
+
+
+    def _extract_links(self, link, parse, pw='', notor=False, key=None):
+        """
+        Extracts a listing or index page through the conditional GET cache and parses it into a link set.
+        If the server answers 304 Not Modified, the link set parsed from the previous full response is reused
+        without downloading or parsing the page again. A parser which filters the page by settings of the
+        crawler must pass a key naming them, otherwise a 304 would return a link set filtered differently.
+
+        @param link: str - A string containing a URL to some listing, index, XML or JSON page.
+        @param parse: function - A callable accepting the Response and returning a key-value mapping of titles to links.
+        @param pw: str - A string containing the Tor password for the given system configuration.
+        @param notor: bool - An optional parameter for not using the Tor network.
+        @param key: str - An optional cache key for link sets depending on more than the URL, the URL if omitted.
+        @return links: {} - A key-value mapping of a title key in a standard format and its appropriate image link.
+        """
+
+        key = key or link
+
+        # Links found before the deadline passed are still handed to the downloads, which then stop as well
+        if self._deadline is not None and self._deadline.is_expired():
+            self._logger.warning("Skipping page at link " + link + ", the run deadline has passed.")
+            return {}
+
+        page = self._extract_content(link, pw, notor=notor, headers=self._http_cache.get_request_headers(key))
+
+        if page.status_code == HttpCache.NOT_MODIFIED_STATUS:
+            links = self._http_cache.load_links(key)
+
+            if links is not None:
+                self._logger.info("Page at link " + link + " was not modified, reusing " + str(len(links)) + " cached links.")
+                return links
+
+            # The cache entry disappeared after the request was sent, fetch the full page instead
+            page = self._extract_content(link, pw, notor=notor)
+
+        links = parse(page)
+
+        if page.status_code == self.OK_STATUS:
+            self._http_cache.store(key, page.headers, links)
+
+        return links
+
+
+    def _get_tor_session(self, notor=False, link='', instance=None, lane=None):
+        """
+        Returns the pooled requests session for the host of the link using the SOCKS5 port of a Tor instance,
+        by default the standard localhost:9050 port used by Tor. Sessions are shared across threads and must
+        not be closed by callers.
+
+        @param notor: bool - An optional parameter for not using the Tor network.
+        @param link: str - A string containing the URL the session will be used for.
+        @param instance: TorInstance - An optional Tor instance to route through, the first instance if omitted.
+        @param lane: CircuitLane - An optional circuit lane to route through, the lane assigned to the link if omitted.
+        @return session: Session - A requests.Session type containing SOCK5 HTTP/HTTPS proxies configured 
+        to a Tor output socket.
+        """
+
+        return self._sessions.get_session(link, self._get_proxies(notor, link, instance, lane))
+
+
+    def _get_proxies(self, notor=False, link='', instance=None, lane=None):
+        """
+        Builds the proxy mapping a request for the link should be routed through, as chosen by the routing table.
+        When circuit lanes are configured, a Tor proxy carries the SOCKS credentials of the lane assigned to the
+        calling worker or host.
+
+        @param notor: bool - An optional parameter for not using the Tor network.
+        @param link: str - A string containing the URL being requested.
+        @param instance: TorInstance - An optional Tor instance to route through, the first instance if omitted.
+        @param lane: CircuitLane - An optional circuit lane to route through, the lane assigned to the link if omitted.
+        @return proxies: {} - A requests proxy mapping for both http & https, empty for a direct connection.
+        """
+
+        route = self._get_route(link, notor)
+
+        if route == RoutingTable.DIRECT:
+            return {}
+
+        if route != RoutingTable.TOR:
+            return {'http': route, 'https': route}
+
+        # setting the proxy of both http & https to the SocksPort of the Tor instance
         # this requires a running Tor service in your machine and listening on port 9050 (by default)
-        if not notor:
-            self._logger.info("Setting Tor SOCKS5 proxy information.")
-            session.proxies = {"http": "socks5://localhost:9050", "https": "socks5://localhost:9050"}
+        if instance is None:
+            instance = self._tor_pool.get_instances()[0]
 
-        return session
+        return instance.get_proxies(lane or self._lanes.get_lane(link))
+
+
+    def _get_route(self, link, notor=False):
+        """
+        Returns the route a request for the link takes: Tor, a direct connection or an upstream proxy URL.
+
+        @param link: str - A string containing the URL being requested.
+        @param notor: bool - An optional parameter for not using the Tor network, forcing a direct connection.
+        @return route: str - Either RoutingTable.TOR, RoutingTable.DIRECT or a proxy URL.
+        """
+
+        if notor:
+            return RoutingTable.DIRECT
+
+        return self._routes.get_route(link, self.__satellite)
 
 
     def _renew_connection(self, pw):
         """
-        Contacts the Tor network configurations' ControlPort on port 9051 to authenticate itself and
-        perform a recycle of a new Tor IP address.
+        Contacts the Tor network configurations' ControlPort through the long-lived rotation controller
+        to authenticate itself and perform a recycle of a new Tor IP address.
 
         @param pw: str - A string containing the Tor password for the given system configuration.
         """
 
-        with Controller.from_port(port=9051) as c:
-            # Authenticates access to Tor ControlPort. 
-            c.authenticate(password=pw)
-            
-            # send NEWNYM signal to establish a new clean connection through the Tor network
-            c.signal(Signal.NEWNYM)
-            
+        # send NEWNYM signal to establish a new clean connection through the Tor network
+        if self._rotation.rotate(pw):
             generated_ip_log = 'Generated new tor IP...'
             self._logger.info(generated_ip_log)
             print(generated_ip_log)
@@ -248,7 +922,7 @@ class SatelliteCrawler(Crawler):
     def _image_exists(self, title):
         """
         A protected member function for querying whether or not an image has already been downloaded based
-        off of the current file system hierarchy.
+        off of the current file system hierarchy. Incomplete '.part' downloads do not count.
 
         @param title: str - A string containing the following standard format: 'TITLE - DATE - HH-MM UTC'
         which describes the image being queried.
@@ -256,9 +930,9 @@ class SatelliteCrawler(Crawler):
 
         dir_path = self._create_img_dir(title)
 
-        # If path exists and the directory is not empty, then the image exists
-        if os.path.exists(dir_path) and os.listdir(dir_path) != []:
-            return True
+        # If path exists and the directory holds a completed file, then the image exists
+        if os.path.exists(dir_path):
+            return any(not PartialDownload.is_partial_file(f) for f in os.listdir(dir_path))
         return False
 
 
@@ -0,0 +1,199 @@
+from concurrent.futures import ThreadPoolExecutor
+from crawlers.retry import DownloadError
+from crawlers.retry import classify_status
+from crawlers.retry import parse_retry_after
+from crawlers.circuit_lanes import CircuitLane
+from crawlers.partial_download import PartialDownload
+
+class SegmentedDownloader:
+    """
+    Splits large files such as full resolution GOES full disk images into byte ranges which are fetched
+    concurrently, each over a circuit lane of its own, so a single file is no longer limited to the throughput
+    of one Tor circuit. The length of the file is learned from the response to an open ended range request,
+    whose body also supplies the first range. Every range is written at its offset in the preallocated
+    '.part' file of the download, and is only accepted if the server answers with exactly the bytes asked for
+    of the same representation. The file is committed once its total length has been verified, otherwise it
+    is cut back to the bytes received in order so the next attempt resumes from there.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    DEFAULT_SEGMENTS = 4
+    DEFAULT_THRESHOLD = 16 * 1024 * 1024
+    MIN_SEGMENT_SIZE = 1024 * 1024
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, segments=DEFAULT_SEGMENTS, threshold=DEFAULT_THRESHOLD, logger=None):
+        """
+        Constructor which accepts how many ranges a large file is split into.
+
+        @param segments: int - The number of ranges, and circuits, a large file is fetched over.
+        @param threshold: int - The number of bytes left to download above which a file is segmented.
+        @param logger: Logger - An optional logger used to record segmented downloads.
+        """
+
+        self.__logger = logger
+        self.__threshold = int(threshold)
+        self.__segments = max(2, int(segments))
+
+        # The first range travels over the circuit of the request which revealed the length
+        self.__lanes = [CircuitLane('segment-' + str(i)) for i in range(1, self.__segments)]
+
+
+    def get_range_header(self, offset):
+        """
+        Returns the Range header of the open ended request which reveals the length of a file.
+
+        @param offset: int - The number of bytes already on disk.
+        @return range: str - The value of the Range header.
+        """
+
+        return 'bytes=' + str(offset) + '-'
+
+
+    def accepts(self, page, offset):
+        """
+        Returns whether the response to an open ended range request is for a file worth segmenting.
+
+        @param page: Response - The streamed response to the request built with get_range_header().
+        @param offset: int - The number of bytes already on disk.
+        @return segmented: bool - True if the server supports ranges and enough bytes remain.
+        """
+
+        if page.status_code != PartialDownload.PARTIAL_CONTENT_STATUS:
+            return False
+
+        match = PartialDownload.CONTENT_RANGE_PATTERN.match(page.headers.get('Content-Range', ''))
+
+        return match is not None and match.group(3) != '*' and int(match.group(3)) - offset >= self.__threshold
+
+
+    def download(self, title, page, partial, fetch):
+        """
+        Downloads the rest of a file as concurrent byte ranges into its preallocated '.part' file.
+
+        @param title: str - A string containing the following standard format: 'TITLE - DATE - HH-MM UTC'
+        @param page: Response - The streamed response accepted by accepts(), whose body is the first range.
+        @param partial: PartialDownload - The download the ranges are written to.
+        @param fetch: function - A callable accepting (headers, lane) which sends a GET request with the given
+        headers over a circuit lane and returns the streamed response.
+        """
+
+        offset = partial.get_offset()
+        length = partial.open_segments(page.status_code, page.headers)
+        validator = partial.get_validator()
+        ranges = self.__split(offset, length)
+        received = [0] * len(ranges)
+        errors = []
+
+        if self.__logger is not None:
+            self.__logger.info("Downloading " + title + " as " + str(len(ranges)) + " segments of " + \
+                str(length - offset) + " bytes.")
+
+        with ThreadPoolExecutor(max_workers=max(1, len(ranges) - 1), thread_name_prefix='segment') as executor:
+            futures = [executor.submit(self.__fetch_range, partial, ranges, received, i, fetch, validator)
+                for i in range(1, len(ranges))]
+
+            try:
+                self.__write_range(page, partial, ranges, received, 0)
+            except Exception as e:
+                errors.append(e)
+
+            for future in futures:
+                if future.exception() is not None:
+                    errors.append(future.exception())
+
+        # Keep the bytes which arrived in order from the start so the next attempt can resume them
+        complete = offset
+        for (start, end), count in zip(ranges, received):
+            complete = start + count
+            if count != end - start + 1:
+                break
+
+        partial.finish_segments(complete)
+
+        if errors:
+            raise errors[0]
+
+
+    def renew(self):
+        """
+        Moves every range after the first onto fresh circuits.
+
+        @return retired: [] - The SOCKS usernames the lanes used until now.
+        """
+
+        return [lane.renew() for lane in self.__lanes]
+
+
+    def __split(self, offset, length):
+        """
+        Private method splitting the bytes left to download into inclusive (start, end) ranges of equal size.
+        """
+
+        count = max(1, min(self.__segments, (length - offset) // self.MIN_SEGMENT_SIZE))
+        size = -(-(length - offset) // count)
+
+        return [(start, min(start + size, length) - 1) for start in range(offset, length, size)]
+
+
+    def __fetch_range(self, partial, ranges, received, index, fetch, validator):
+        """
+        Private method requesting a single range over its own circuit lane and writing it into place.
+        """
+
+        start, end = ranges[index]
+        headers = {'Accept-Encoding': 'identity', 'Range': 'bytes=' + str(start) + '-' + str(end)}
+
+        if validator:
+            headers['If-Range'] = validator
+
+        page = fetch(headers, self.__lanes[index - 1])
+
+        try:
+            if page.status_code != PartialDownload.PARTIAL_CONTENT_STATUS:
+                if page.status_code == PartialDownload.OK_STATUS:
+                    # If-Range failed, the file changed on the server since the first range was requested
+                    raise DownloadError(DownloadError.TRUNCATED, "File changed while downloading segments.")
+
+                raise DownloadError(classify_status(page.status_code), "HTTP status " + str(page.status_code) + \
+                    " for segment " + headers['Range'], parse_retry_after(page.headers.get('Retry-After')))
+
+            match = PartialDownload.CONTENT_RANGE_PATTERN.match(page.headers.get('Content-Range', ''))
+
+            if match is None or int(match.group(1)) != start or int(match.group(2)) != end:
+                raise DownloadError(DownloadError.TRUNCATED, "Unexpected Content-Range '" + \
+                    str(page.headers.get('Content-Range')) + "' for segment " + headers['Range'] + ".")
+
+            page.raw.decode_content = True
+            self.__write_range(page, partial, ranges, received, index)
+        finally:
+            page.close()
+
+
+    def __write_range(self, page, partial, ranges, received, index):
+        """
+        Private method streaming the body of a range response to its offset in the '.part' file.
+        """
+
+        start, end = ranges[index]
+        remaining = end - start + 1
+
+        with open(partial.get_part_path(), 'r+b') as f:
+            f.seek(start)
+
+            while remaining > 0:
+                chunk = page.raw.read(min(self.CHUNK_SIZE, remaining))
+
+                if not chunk:
+                    break
+
+                f.write(chunk)
+                remaining -= len(chunk)
+                received[index] += len(chunk)
+
+        if remaining > 0:
+            raise DownloadError(DownloadError.TRUNCATED, "Segment bytes=" + str(start) + "-" + str(end) + \
+                " ended " + str(remaining) + " bytes short.")
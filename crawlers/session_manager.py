@@ -0,0 +1,233 @@
+import threading
+import requests
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from crawlers.http2_session import Http2Session
+
+class SessionManager:
+    """
+    Keeps one pooled, keep-alive requests.Session per host and proxy configuration which is shared across
+    every download thread. Reusing sessions means a run of tiles or listing pages from the same host pays the
+    SOCKS handshake, TCP connect and TLS handshake once per pooled connection instead of once per file. The
+    adapters are sized to the number of download workers so that no worker has to open a throwaway connection
+    when the pool is exhausted. When HTTP/2 is enabled, each host and proxy instead gets an Http2Session
+    which multiplexes every thread's requests over a single connection. On rotation, and for a circuit lane
+    whose credentials were renewed, sessions are retired rather than closed: they leave the pool so no new
+    request picks them up, while the requests in flight on them run to completion. Download engines keeping
+    sessions of their own register a retire listener to be told when theirs should follow.
+
+    @author Vincent.Nigro
+    @version 0.0.4
+    @modified 10/16/26
+    """
+
+    DEFAULT_POOL_SIZE = 16
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, logger=None, http2=False):
+        """
+        Constructor which accepts the size of each per-host connection pool.
+
+        @param pool_size: int - The maximum number of keep-alive connections kept per host.
+        @param logger: Logger - An optional logger used to record session creation.
+        @param http2: bool - True to create multiplexed HTTP/2 sessions rather than requests sessions.
+        """
+
+        self.__http2 = http2
+        self.__sessions = {}
+        self.__logger = logger
+        self.__retire_listeners = []
+        self.__lock = threading.Lock()
+        self.__pool_size = max(1, int(pool_size))
+
+
+    def get_session(self, link, proxies=None):
+        """
+        Returns the shared session for the host of the provided link and proxy configuration, creating it
+        on first use.
+
+        @param link: str - A string containing a full URL whose host selects the session.
+        @param proxies: {} - An optional requests proxy mapping which the session should route through.
+        @return session: Session - A pooled requests.Session shared by all threads targeting the same host.
+        """
+
+        proxies = proxies or {}
+        parts = urlsplit(link)
+        key = (parts.scheme, parts.netloc, tuple(sorted(proxies.items())))
+
+        with self.__lock:
+            session = self.__sessions.get(key)
+
+            if session is None:
+                session = self._create_session(proxies)
+                self.__sessions[key] = session
+
+                if self.__logger is not None:
+                    self.__logger.info("Created pooled session for host " + parts.netloc + ".")
+
+        return session
+
+
+    def _create_session(self, proxies):
+        """
+        Protected method which builds a session whose adapters keep up to pool_size connections alive.
+
+        @param proxies: {} - A requests proxy mapping which the session should route through.
+        @return session: Session - A newly configured requests.Session, or an Http2Session.
+        """
+
+        if self.__http2:
+            return Http2Session(proxies, self.__pool_size)
+
+        session = requests.Session()
+
+        for prefix in ('http://', 'https://'):
+            session.mount(prefix, HTTPAdapter(pool_connections=self.__pool_size, pool_maxsize=self.__pool_size))
+
+        if proxies:
+            session.proxies = dict(proxies)
+
+        return session
+
+
+    def set_pool_size(self, pool_size):
+        """
+        Resizes the connection pools. Sessions which already exist are closed so that the next request
+        recreates them with the new pool size.
+
+        @param pool_size: int - The maximum number of keep-alive connections kept per host.
+        """
+
+        with self.__lock:
+            self.__pool_size = max(1, int(pool_size))
+            self.__close_sessions()
+
+
+    def set_http2(self, http2):
+        """
+        Switches between HTTP/2 and requests sessions. Sessions which already exist are closed so that the
+        next request recreates them with the selected transport.
+
+        @param http2: bool - True to create multiplexed HTTP/2 sessions.
+        """
+
+        with self.__lock:
+            self.__http2 = http2
+            self.__close_sessions()
+
+
+    def close_username(self, username):
+        """
+        Retires the sessions whose proxies carry the given SOCKS username, such as those of a circuit lane which
+        was renewed.
+
+        @param username: str - The SOCKS username the sessions were created for.
+        """
+
+        with self.__lock:
+            retired = [key for key in self.__sessions if any(urlsplit(proxy).username == username for _, proxy in key[2])]
+            sessions = [self.__sessions.pop(key) for key in retired]
+
+        for session in sessions:
+            self.__retire_session(session)
+
+        self.__notify_retired(username)
+
+
+    def retire(self):
+        """
+        Retires every pooled session so the next requests open connections on the current circuit, without
+        aborting the requests in flight.
+        """
+
+        with self.__lock:
+            sessions = list(self.__sessions.values())
+            self.__sessions = {}
+
+        for session in sessions:
+            self.__retire_session(session)
+
+        self.__notify_retired(None)
+
+
+    def add_retire_listener(self, listener):
+        """
+        Registers a callable told whenever sessions are retired, so sessions pooled outside of the manager can be
+        retired along with those inside it. Listeners may be called from any thread.
+
+        @param listener: function - A callable accepting the retired SOCKS username, None if all sessions were.
+        """
+
+        with self.__lock:
+            self.__retire_listeners.append(listener)
+
+
+    def remove_retire_listener(self, listener):
+        """
+        Unregisters a callable added through add_retire_listener().
+
+        @param listener: function - The callable to unregister.
+        """
+
+        with self.__lock:
+            if listener in self.__retire_listeners:
+                self.__retire_listeners.remove(listener)
+
+
+    def __notify_retired(self, username):
+        """
+        Private method calling every retire listener with the retired SOCKS username.
+        """
+
+        with self.__lock:
+            listeners = list(self.__retire_listeners)
+
+        for listener in listeners:
+            listener(username)
+
+
+    def __retire_session(self, session):
+        """
+        Private method closing a session which left the pool once its requests in flight have finished.
+        """
+
+        if isinstance(session, Http2Session):
+            session.retire()
+        else:
+            # A closed requests.Session only closes idle connections, those in use are dropped once released
+            session.close()
+
+
+    def close(self):
+        """
+        Closes every pooled session and the connections they hold.
+        """
+
+        with self.__lock:
+            self.__close_sessions()
+
+
+    def __close_sessions(self):
+        """
+        Private method closing all sessions. Must be called while holding the lock.
+        """
+
+        for session in self.__sessions.values():
+            session.close()
+
+        self.__sessions = {}
+
+
+    def get_pool_size(self):
+        """
+        Public accessor method returning the configured per-host pool size.
+        """
+
+        return self.__pool_size
+
+
+    def is_http2(self):
+        """
+        Public accessor method returning whether HTTP/2 sessions are created.
+        """
+
+        return self.__http2
@@ -0,0 +1,289 @@
+import time
+import threading
+from crawlers.tor_rotation import TorController
+from crawlers.circuit_lanes import CircuitLane
+
+class TorInstance:
+    """
+    A single local Tor client identified by its SocksPort and ControlPort. Each instance tracks the number of
+    requests in flight along with exponentially weighted moving averages of its request latency and error
+    rate, which the TorInstancePool uses to decide whether the instance should stay in rotation.
+
+    @author Vincent.Nigro
+    @version 0.0.2
+    @modified 10/16/26
+    """
+
+    DEFAULT_ADDRESS = '127.0.0.1'
+    DEFAULT_SOCKS_PORT = 9050
+    DEFAULT_LANE = CircuitLane('default')
+    SMOOTHING = 0.2
+
+    def __init__(self, socks_port=DEFAULT_SOCKS_PORT, control_port=TorController.DEFAULT_CONTROL_PORT, address=DEFAULT_ADDRESS, logger=None):
+        """
+        Constructor which accepts the ports of the Tor client.
+
+        @param socks_port: int - The SocksPort of the Tor client.
+        @param control_port: int - The ControlPort of the Tor client.
+        @param address: str - The address both ports are listening on.
+        @param logger: Logger - An optional logger passed to the instances' controller.
+        """
+
+        self.__address = address
+        self.__socks_port = int(socks_port)
+        self.__controller = TorController(int(control_port), address, logger)
+
+        self.in_flight = 0
+        self.samples = 0
+        self.latency = 0.0
+        self.error_rate = 0.0
+        self.ejected_until = 0.0
+
+
+    def record(self, latency, failed):
+        """
+        Folds a completed request into the moving averages. Must be called while holding the pool lock.
+
+        @param latency: float - The number of seconds the request took.
+        @param failed: bool - True if the request failed.
+        """
+
+        if self.samples == 0:
+            self.latency = latency
+            self.error_rate = 1.0 if failed else 0.0
+        else:
+            self.latency += self.SMOOTHING * (latency - self.latency)
+            self.error_rate += self.SMOOTHING * ((1.0 if failed else 0.0) - self.error_rate)
+
+        self.samples += 1
+
+
+    def reset_health(self):
+        """
+        Clears the measured health after the instance is readmitted so it is judged on fresh samples.
+        """
+
+        self.samples = 0
+        self.latency = 0.0
+        self.error_rate = 0.0
+
+
+    def get_proxies(self, lane=None):
+        """
+        Builds the requests proxy mapping which routes through this instances' SocksPort.
+
+        @param lane: CircuitLane - An optional lane whose SOCKS credentials isolate the stream.
+        @return proxies: {} - A requests proxy mapping for both http & https.
+        """
+
+        # Requests outside of any lane still carry credentials of the process so its streams can be told apart
+        return (lane or self.DEFAULT_LANE).get_proxies(self.__address, self.__socks_port)
+
+
+    def get_controller(self):
+        """
+        Public accessor method returning the TorController for this instances' ControlPort.
+        """
+
+        return self.__controller
+
+
+    def get_socks_port(self):
+        """
+        Public accessor method returning the SocksPort of the instance.
+        """
+
+        return self.__socks_port
+
+
+    def __str__(self):
+        return self.__address + ':' + str(self.__socks_port)
+
+
+class TorInstancePool:
+    """
+    Spreads requests across several local Tor clients either round-robin or to the least loaded instance.
+    Instances whose error rate or latency degrades are taken out of rotation for a cool-down period and are
+    then readmitted with a clean slate. The pool always keeps at least one instance available. The pool also
+    exposes new_identity() and close() so it can stand in for a single TorController during rotation.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    ROUND_ROBIN = 'round-robin'
+    LEAST_LOADED = 'least-loaded'
+
+    MIN_SAMPLES = 5
+    COOLDOWN_SECONDS = 60
+    MAX_ERROR_RATE = 0.5
+    MAX_LATENCY_FACTOR = 3.0
+
+    def __init__(self, instances, strategy=ROUND_ROBIN, logger=None):
+        """
+        Constructor which accepts the Tor instances and the selection strategy.
+
+        @param instances: [] - A non-empty list of TorInstance objects.
+        @param strategy: str - Either 'round-robin' or 'least-loaded'.
+        @param logger: Logger - An optional logger used to record instances leaving and joining rotation.
+        """
+
+        if not instances:
+            raise ValueError("At least one Tor instance is required.")
+
+        if strategy not in (self.ROUND_ROBIN, self.LEAST_LOADED):
+            raise ValueError("Unknown Tor instance strategy '" + strategy + "'.")
+
+        self.__next = 0
+        self.__logger = logger
+        self.__strategy = strategy
+        self.__instances = instances
+        self.__lock = threading.Lock()
+
+
+    def acquire(self):
+        """
+        Selects the instance the next request should be sent through and marks it as in flight.
+
+        @return instance: TorInstance - The selected Tor instance.
+        """
+
+        with self.__lock:
+            healthy = self.__get_healthy()
+
+            if self.__strategy == self.LEAST_LOADED:
+                instance = min(healthy, key=lambda i: (i.in_flight, i.latency))
+            else:
+                instance = healthy[self.__next % len(healthy)]
+                self.__next += 1
+
+            instance.in_flight += 1
+
+            return instance
+
+
+    def release(self, instance, latency, failed):
+        """
+        Records the outcome of a request sent through an instance and takes the instance out of rotation if
+        its error rate or latency has degraded.
+
+        @param instance: TorInstance - The instance returned by acquire().
+        @param latency: float - The number of seconds the request took.
+        @param failed: bool - True if the request failed.
+        """
+
+        with self.__lock:
+            instance.in_flight -= 1
+            instance.record(latency, failed)
+
+            if len(self.__instances) > 1 and self.__is_degraded(instance):
+                instance.ejected_until = time.monotonic() + self.COOLDOWN_SECONDS
+
+                if self.__logger is not None:
+                    self.__logger.info("Removing Tor instance " + str(instance) + " from rotation (latency " + \
+                        "{:.2f}".format(instance.latency) + "s, error rate " + "{:.2f}".format(instance.error_rate) + ").")
+
+
+    def __is_degraded(self, instance):
+        """
+        Private method deciding whether an instance should be taken out of rotation. Latency is judged
+        against the median of the other instances which have enough samples.
+        """
+
+        if instance.samples < self.MIN_SAMPLES or instance.ejected_until > time.monotonic():
+            return False
+
+        if instance.error_rate > self.MAX_ERROR_RATE:
+            return True
+
+        others = sorted(i.latency for i in self.__instances if i is not instance and i.samples >= self.MIN_SAMPLES)
+
+        if not others:
+            return False
+
+        return instance.latency > self.MAX_LATENCY_FACTOR * others[len(others) // 2]
+
+
+    def __get_healthy(self):
+        """
+        Private method returning the instances currently in rotation, readmitting any whose cool-down has
+        passed. If every instance is out of rotation, the one due back soonest is used.
+        """
+
+        now = time.monotonic()
+        healthy = []
+
+        for instance in self.__instances:
+            if instance.ejected_until and instance.ejected_until <= now:
+                instance.ejected_until = 0.0
+                instance.reset_health()
+
+                if self.__logger is not None:
+                    self.__logger.info("Returning Tor instance " + str(instance) + " to rotation.")
+
+            if not instance.ejected_until:
+                healthy.append(instance)
+
+        if not healthy:
+            healthy.append(min(self.__instances, key=lambda i: i.ejected_until))
+
+        return healthy
+
+
+    def new_identity(self, pw=''):
+        """
+        Sends NEWNYM to every instance in the pool.
+
+        @param pw: str - A string containing the Tor password for the given system configuration.
+        @return renewed: bool - True if at least one instance generated a new identity.
+        """
+
+        renewed = False
+
+        for instance in self.__instances:
+            renewed = instance.get_controller().new_identity(pw) or renewed
+
+        return renewed
+
+
+    def close(self):
+        """
+        Closes the ControlPort connection of every instance.
+        """
+
+        for instance in self.__instances:
+            instance.get_controller().close()
+
+
+    def get_instances(self):
+        """
+        Public accessor method returning every instance in the pool.
+        """
+
+        return list(self.__instances)
+
+
+def parse_tor_instances(spec, logger=None):
+    """
+    Parses a comma separated list of SocksPort:ControlPort pairs, optionally prefixed by an address.
+    Ex: '9050:9051,9060:9061' or '127.0.0.1:9050:9051'.
+
+    @param spec: str - A string containing the Tor instance specification.
+    @param logger: Logger - An optional logger passed to each instance.
+    @return instances: [] - A list of TorInstance objects.
+    """
+
+    instances = []
+
+    for entry in spec.split(','):
+        fields = entry.strip().split(':')
+
+        if len(fields) == 2:
+            instances.append(TorInstance(fields[0], fields[1], logger=logger))
+        elif len(fields) == 3:
+            instances.append(TorInstance(fields[1], fields[2], fields[0], logger=logger))
+        elif entry.strip() != '':
+            raise ValueError("Invalid Tor instance '" + entry + "', expected SOCKSPORT:CONTROLPORT.")
+
+    return instances
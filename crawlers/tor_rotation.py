@@ -0,0 +1,329 @@
+import time
+import threading
+from stem import Signal
+from stem.control import Controller
+
+class TorController:
+    """
+    A single long-lived, authenticated connection to a Tor ControlPort. The connection is opened lazily on
+    first use and is re-established if Tor drops it, so callers no longer pay a connect and authenticate
+    round-trip for every identity change. Access to the underlying stem Controller is serialized.
+
+    @author Vincent.Nigro
+    @version 0.0.2
+    @modified 10/16/26
+    """
+
+    DEFAULT_CONTROL_PORT = 9051
+
+    def __init__(self, port=DEFAULT_CONTROL_PORT, address='127.0.0.1', logger=None):
+        """
+        Constructor which accepts the location of the ControlPort.
+
+        @param port: int - The ControlPort of the Tor client.
+        @param address: str - The address the ControlPort is listening on.
+        @param logger: Logger - An optional logger used to record identity changes.
+        """
+
+        self.__port = port
+        self.__address = address
+        self.__logger = logger
+        self.__controller = None
+        self.__lock = threading.RLock()
+
+
+    def get_controller(self, pw=''):
+        """
+        Returns the authenticated stem Controller, connecting and authenticating if required.
+
+        @param pw: str - A string containing the Tor password for the given system configuration.
+        @return controller: Controller - An authenticated stem Controller.
+        """
+
+        with self.__lock:
+            if self.__controller is None or not self.__controller.is_alive():
+                self.__controller = Controller.from_port(address=self.__address, port=self.__port)
+
+                # Authenticates access to Tor ControlPort.
+                self.__controller.authenticate(password=pw)
+
+            return self.__controller
+
+
+    def open_controller(self, pw=''):
+        """
+        Opens a new authenticated connection to the ControlPort which is not shared, for callers whose settings
+        must live and die with their own connection. The caller is responsible for closing it.
+
+        @param pw: str - A string containing the Tor password for the given system configuration.
+        @return controller: Controller - An authenticated stem Controller.
+        """
+
+        controller = Controller.from_port(address=self.__address, port=self.__port)
+
+        try:
+            controller.authenticate(password=pw)
+        except Exception:
+            controller.close()
+            raise
+
+        return controller
+
+
+    def new_identity(self, pw=''):
+        """
+        Sends NEWNYM to establish a new clean connection through the Tor network. Tor rate limits NEWNYM, so
+        the signal is skipped while Tor reports that a new identity is not yet available.
+
+        @param pw: str - A string containing the Tor password for the given system configuration.
+        @return renewed: bool - True if a NEWNYM signal was sent, False if it was rate limited.
+        """
+
+        with self.__lock:
+            controller = self.get_controller(pw)
+
+            if not controller.is_newnym_available():
+                if self.__logger is not None:
+                    self.__logger.debug("NEWNYM rate limited for another " + str(controller.get_newnym_wait()) + " seconds.")
+                return False
+
+            controller.signal(Signal.NEWNYM)
+
+        if self.__logger is not None:
+            self.__logger.info('Generated new tor IP...')
+
+        return True
+
+
+    def close(self):
+        """
+        Closes the connection to the ControlPort if one is open.
+        """
+
+        with self.__lock:
+            if self.__controller is not None:
+                self.__controller.close()
+                self.__controller = None
+
+
+    def get_port(self):
+        """
+        Public accessor method returning the configured ControlPort.
+        """
+
+        return self.__port
+
+
+class RotationPolicy:
+    """
+    Abstract circuit rotation policy. A policy observes each completed request and decides whether the
+    current Tor identity should be retired.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    def record(self, nbytes, failed):
+        """
+        Abstract method which records a completed request.
+
+        @param nbytes: int - The number of bytes transferred by the request, 0 if unknown.
+        @param failed: bool - True if the request failed.
+        @return rotate: bool - True if the policy wants a new identity.
+        """
+
+        raise NotImplementedError("Subclass must implement abstract method.")
+
+
+    def reset(self):
+        """
+        Resets the policy after a new identity has been established.
+        """
+
+        pass
+
+
+class EveryNRequests(RotationPolicy):
+    """
+    Rotates the identity after every N requests.
+    """
+
+    def __init__(self, n):
+        self.__n = max(1, int(n))
+        self.__count = 0
+
+    def record(self, nbytes, failed):
+        self.__count += 1
+        return self.__count >= self.__n
+
+    def reset(self):
+        self.__count = 0
+
+
+class EveryNBytes(RotationPolicy):
+    """
+    Rotates the identity after N bytes have been transferred.
+    """
+
+    def __init__(self, n):
+        self.__n = max(1, int(n))
+        self.__bytes = 0
+
+    def record(self, nbytes, failed):
+        self.__bytes += nbytes
+        return self.__bytes >= self.__n
+
+    def reset(self):
+        self.__bytes = 0
+
+
+class EveryNSeconds(RotationPolicy):
+    """
+    Rotates the identity once T seconds have elapsed since the previous rotation.
+    """
+
+    def __init__(self, seconds):
+        self.__seconds = float(seconds)
+        self.__last = time.monotonic()
+
+    def record(self, nbytes, failed):
+        return time.monotonic() - self.__last >= self.__seconds
+
+    def reset(self):
+        self.__last = time.monotonic()
+
+
+class OnError(RotationPolicy):
+    """
+    Rotates the identity whenever a request fails.
+    """
+
+    def record(self, nbytes, failed):
+        return failed
+
+
+class CircuitRotator:
+    """
+    Decides when to retire the current Tor identity by consulting a set of rotation policies, and sends
+    NEWNYM through a single long-lived TorController. Any policy may trigger a rotation. Requests keep
+    flowing while a rotation is in progress rather than serializing on the ControlPort.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    DEFAULT_POLICY = 'time:10'
+
+    def __init__(self, controller, policies, on_rotate=None):
+        """
+        Constructor which accepts the controller used to send NEWNYM and the policies to consult.
+
+        @param controller: TorController - The long-lived ControlPort connection.
+        @param policies: [] - A list of RotationPolicy objects.
+        @param on_rotate: function - An optional callable invoked after each new identity.
+        """
+
+        self.__policies = policies
+        self.__on_rotate = on_rotate
+        self.__controller = controller
+        self.__rotating = False
+        self.__lock = threading.Lock()
+
+
+    def record(self, pw, nbytes=0, failed=False):
+        """
+        Records a completed request and rotates the identity if any policy asks for it.
+
+        @param pw: str - A string containing the Tor password for the given system configuration.
+        @param nbytes: int - The number of bytes transferred by the request, 0 if unknown.
+        @param failed: bool - True if the request failed.
+        @return rotated: bool - True if a new identity was established.
+        """
+
+        with self.__lock:
+            # Every policy must observe the request, so do not short circuit
+            triggered = [policy.record(nbytes, failed) for policy in self.__policies]
+
+            if not any(triggered) or self.__rotating:
+                return False
+
+            self.__rotating = True
+
+        return self.__rotate(pw)
+
+
+    def rotate(self, pw):
+        """
+        Forces a new identity regardless of the configured policies.
+
+        @param pw: str - A string containing the Tor password for the given system configuration.
+        @return rotated: bool - True if a new identity was established.
+        """
+
+        with self.__lock:
+            if self.__rotating:
+                return False
+
+            self.__rotating = True
+
+        return self.__rotate(pw)
+
+
+    def __rotate(self, pw):
+        """
+        Private method sending NEWNYM and resetting the policies once it has been accepted.
+        """
+
+        try:
+            rotated = self.__controller.new_identity(pw)
+        finally:
+            with self.__lock:
+                self.__rotating = False
+
+        if rotated:
+            with self.__lock:
+                for policy in self.__policies:
+                    policy.reset()
+
+            if self.__on_rotate is not None:
+                self.__on_rotate()
+
+        return rotated
+
+
+    def get_controller(self):
+        """
+        Public accessor method returning the TorController used for rotation.
+        """
+
+        return self.__controller
+
+
+def parse_rotation_policies(spec):
+    """
+    Parses a comma separated rotation specification into a list of policies. Supported entries are
+    'requests:N', 'bytes:N', 'time:SECONDS' and 'error'. Ex: 'requests:50,error'.
+
+    @param spec: str - A string containing the rotation specification.
+    @return policies: [] - A list of RotationPolicy objects.
+    """
+
+    policies = []
+
+    for entry in spec.split(','):
+        name, _, value = entry.strip().partition(':')
+
+        if name == 'requests':
+            policies.append(EveryNRequests(value))
+        elif name == 'bytes':
+            policies.append(EveryNBytes(value))
+        elif name == 'time':
+            policies.append(EveryNSeconds(value))
+        elif name == 'error':
+            policies.append(OnError())
+        elif name != '':
+            raise ValueError("Unknown rotation policy '" + name + "'.")
+
+    return policies
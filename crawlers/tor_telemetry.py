@@ -0,0 +1,435 @@
+import time
+import threading
+from stem import CircStatus
+from stem import StreamStatus
+from stem import StreamClosureReason
+from stem.control import EventType
+from crawlers.exit_scoring import is_address
+from crawlers.exit_scoring import get_socks_username
+from crawlers.circuit_lanes import CircuitLane
+
+class HostTelemetry:
+    """
+    What the Tor client observed of the streams to a single host: how many were opened and how many failed,
+    whether failures were reported by the exit as the origin being unreachable or happened inside Tor, the
+    bytes carried, and moving averages of the stream connect latency, of the build time of the circuits the
+    streams used and of the time the crawler waited for a response.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    def __init__(self):
+        """
+        Constructor creating the telemetry of a host which has not been seen yet.
+        """
+
+        self.streams = 0
+        self.tor_failures = 0
+        self.origin_failures = 0
+        self.origin_error_rate = 0.0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.stream_latency = None
+        self.circuit_build_time = None
+        self.response_time = None
+
+
+class TorTelemetry:
+    """
+    Collects the events of the Tor clients of a run, attributed to the satellite being crawled and to each
+    host it downloads from. Stream connect latencies, circuit build times and bytes carried come from the
+    ControlPort through a TelemetryListener per Tor instance, while the crawler reports how long each request
+    waited for its response. Comparing the two tells whether a slow run is spent building circuits and
+    reaching exits, or waiting on the origin servers. Stream failures which the exit blames on the origin,
+    such as a refused or timed out connection, mark the host as failing at the origin so retries stop asking
+    Tor for fresh circuits which cannot help.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    SMOOTHING = 0.2
+    ORIGIN_FAILING_RATE = 0.5
+
+    # Reasons an exit gives for ending a stream when it could not reach the origin
+    ORIGIN_REASONS = (StreamClosureReason.RESOLVEFAILED, StreamClosureReason.CONNECTREFUSED,
+        StreamClosureReason.NOROUTE, StreamClosureReason.TIMEOUT, StreamClosureReason.CONNRESET)
+
+    def __init__(self, satellite, logger=None):
+        """
+        Constructor which accepts the satellite measurements are attributed to.
+
+        @param satellite: str - The name of the satellite being crawled.
+        @param logger: Logger - An optional logger used to record the summary of the run.
+        """
+
+        self.__satellite = satellite
+        self.__logger = logger
+        self.__hosts = {}
+        self.__lock = threading.Lock()
+
+        self.__circuits_built = 0
+        self.__circuits_failed = 0
+        self.__circuit_build_time = None
+        self.__tor_read = 0
+        self.__tor_written = 0
+        self.__peak_read = 0
+
+
+    def record_stream(self, host, latency, build_time=None):
+        """
+        Records a stream to a host which connected through its exit.
+
+        @param host: str - A string containing the target host of the stream.
+        @param latency: float - The number of seconds from the stream opening until it connected.
+        @param build_time: float - The build time of the circuit carrying the stream, None if already counted.
+        """
+
+        with self.__lock:
+            state = self.__get_state(host)
+            state.streams += 1
+            state.origin_error_rate -= self.SMOOTHING * state.origin_error_rate
+            state.stream_latency = self.__average(state.stream_latency, latency)
+
+            if build_time is not None:
+                state.circuit_build_time = self.__average(state.circuit_build_time, build_time)
+
+
+    def record_stream_failure(self, host, origin):
+        """
+        Records a stream to a host which failed before or while connecting.
+
+        @param host: str - A string containing the target host of the stream.
+        @param origin: bool - True if the exit reported the origin as unreachable, False for failures in Tor.
+        """
+
+        with self.__lock:
+            state = self.__get_state(host)
+            state.streams += 1
+
+            if origin:
+                state.origin_failures += 1
+                state.origin_error_rate += self.SMOOTHING * (1.0 - state.origin_error_rate)
+            else:
+                state.tor_failures += 1
+
+
+    def record_stream_bytes(self, host, read, written):
+        """
+        Adds the bytes carried by a stream to a host over the last second.
+
+        @param host: str - A string containing the target host of the stream.
+        @param read: int - The number of bytes read from the stream.
+        @param written: int - The number of bytes written to the stream.
+        """
+
+        with self.__lock:
+            state = self.__get_state(host)
+            state.bytes_read += read
+            state.bytes_written += written
+
+
+    def record_circuit(self, build_time=None):
+        """
+        Records a circuit which was built, or which failed to build when no build time is given.
+
+        @param build_time: float - The number of seconds the circuit took to build.
+        """
+
+        with self.__lock:
+            if build_time is None:
+                self.__circuits_failed += 1
+            else:
+                self.__circuits_built += 1
+                self.__circuit_build_time = self.__average(self.__circuit_build_time, build_time)
+
+
+    def record_bandwidth(self, read, written):
+        """
+        Adds the bytes a Tor client carried over the last second.
+
+        @param read: int - The number of bytes read by the client.
+        @param written: int - The number of bytes written by the client.
+        """
+
+        with self.__lock:
+            self.__tor_read += read
+            self.__tor_written += written
+            self.__peak_read = max(self.__peak_read, read)
+
+
+    def record_response(self, host, seconds):
+        """
+        Records how long a request to a host waited for its response headers, as measured by the crawler.
+
+        @param host: str - A string containing the host of the request.
+        @param seconds: float - The number of seconds from sending the request until its response arrived.
+        """
+
+        with self.__lock:
+            state = self.__get_state(host)
+            state.response_time = self.__average(state.response_time, seconds)
+
+
+    def is_origin_failing(self, host):
+        """
+        Returns whether most recent streams to a host failed because the exit could not reach the origin, in
+        which case a fresh circuit is not going to help.
+
+        @param host: str - A string containing the host name.
+        @return failing: bool - True if the origin is failing rather than Tor.
+        """
+
+        with self.__lock:
+            state = self.__hosts.get(host)
+
+            return state is not None and state.origin_error_rate >= self.ORIGIN_FAILING_RATE
+
+
+    def get_host(self, host):
+        """
+        Returns a copy of the telemetry of a host.
+
+        @param host: str - A string containing the host name.
+        @return telemetry: {} - The fields of the HostTelemetry of the host, empty if it has not been seen.
+        """
+
+        with self.__lock:
+            state = self.__hosts.get(host)
+
+            return dict(vars(state)) if state is not None else {}
+
+
+    def get_hosts(self):
+        """
+        Public accessor method returning the hosts which have been seen.
+        """
+
+        with self.__lock:
+            return list(self.__hosts.keys())
+
+
+    def get_circuit_build_time(self):
+        """
+        Public accessor method returning the moving average circuit build time across every Tor client.
+        """
+
+        with self.__lock:
+            return self.__circuit_build_time
+
+
+    def log_summary(self):
+        """
+        Logs the telemetry of every host along with how much of its response time was spent reaching the
+        origin through Tor and how much waiting on the origin itself.
+        """
+
+        with self.__lock:
+            lines = ["Tor telemetry for " + self.__satellite + ": " + str(self.__circuits_built) + " circuits built (" + \
+                self.__format(self.__circuit_build_time) + " avg), " + str(self.__circuits_failed) + " failed, " + \
+                str(self.__tor_read // 1024) + " KB read, peak " + str(self.__peak_read // 1024) + " KB/s."]
+
+            for host, state in sorted(self.__hosts.items()):
+                line = "  " + host + ": " + str(state.streams) + " streams, " + str(state.tor_failures) + \
+                    " failed in Tor, " + str(state.origin_failures) + " failed at origin, " + \
+                    str(state.bytes_read // 1024) + " KB read, stream connect " + self.__format(state.stream_latency) + \
+                    ", circuit build " + self.__format(state.circuit_build_time) + ", response " + \
+                    self.__format(state.response_time)
+
+                # A stream connects once the exit has reached the origin, the rest of the wait is the origin's
+                if state.response_time is not None and state.stream_latency is not None:
+                    line += " (origin " + self.__format(max(0.0, state.response_time - state.stream_latency)) + ")"
+
+                lines.append(line + ".")
+
+        for line in lines:
+            if self.__logger is not None:
+                self.__logger.info(line)
+            print(line)
+
+
+    def __average(self, average, value):
+        """
+        Private method folding a value into a moving average. Must be called while holding the lock.
+        """
+
+        return value if average is None else average + self.SMOOTHING * (value - average)
+
+
+    def __format(self, seconds):
+        """
+        Private method formatting a number of seconds which may be unknown.
+        """
+
+        return 'n/a' if seconds is None else "{:.2f}s".format(seconds)
+
+
+    def __get_state(self, host):
+        """
+        Private method returning the telemetry of a host, creating it on first use. Must be called while
+        holding the lock.
+        """
+
+        state = self.__hosts.get(host)
+
+        if state is None:
+            state = HostTelemetry()
+            self.__hosts[host] = state
+
+        return state
+
+
+class TelemetryListener:
+    """
+    Subscribes to the CIRC, STREAM, STREAM_BW and BW events of a single Tor client through stem and reports
+    them to a TorTelemetry. Circuit build times are measured from launch until built and charged to the host
+    of the first stream a circuit carries, and stream connect latencies from the stream opening until its exit
+    connected to the origin.
+
+    The Tor client may be a system Tor shared with other applications, so only streams opened by this process
+    are attributed to hosts: every request of the crawlers carries SOCKS credentials of a CircuitLane, and Tor
+    reports the SOCKS username of each stream. Streams are keyed by the host name handed to Tor through socks5h,
+    the same key the crawler records responses and checks for failing origins under. Circuit counts and the
+    bandwidth of the client are still those of the whole Tor client.
+
+    @author Vincent.Nigro
+    @version 0.0.2
+    @modified 10/16/26
+    """
+
+    def __init__(self, controller, telemetry, logger=None):
+        """
+        Constructor which accepts the Tor client to observe and where its events are reported.
+
+        @param controller: TorController - The long-lived ControlPort connection of the Tor client.
+        @param telemetry: TorTelemetry - The telemetry of the run events are reported to.
+        @param logger: Logger - An optional logger used to record failures to unsubscribe.
+        """
+
+        self.__logger = logger
+        self.__controller = controller
+        self.__telemetry = telemetry
+
+        self.__tor = None
+        self.__streams = {}
+        self.__launched = {}
+        self.__build_times = {}
+        self.__lock = threading.Lock()
+
+
+    def start(self, pw=''):
+        """
+        Subscribes to the events of the Tor client.
+
+        @param pw: str - A string containing the Tor password for the given system configuration.
+        """
+
+        self.__tor = self.__controller.get_controller(pw)
+
+        self.__tor.add_event_listener(self.__on_circuit, EventType.CIRC)
+        self.__tor.add_event_listener(self.__on_stream, EventType.STREAM)
+        self.__tor.add_event_listener(self.__on_stream_bw, EventType.STREAM_BW)
+        self.__tor.add_event_listener(self.__on_bandwidth, EventType.BW)
+
+
+    def stop(self):
+        """
+        Unsubscribes from the events of the Tor client.
+        """
+
+        if self.__tor is None:
+            return
+
+        try:
+            self.__tor.remove_event_listener(self.__on_circuit)
+            self.__tor.remove_event_listener(self.__on_stream)
+            self.__tor.remove_event_listener(self.__on_stream_bw)
+            self.__tor.remove_event_listener(self.__on_bandwidth)
+        except Exception as e:
+            if self.__logger is not None:
+                self.__logger.error(e)
+
+        self.__tor = None
+
+
+    def __on_circuit(self, event):
+        """
+        Private listener timing circuits from launch until built.
+        """
+
+        now = time.monotonic()
+
+        with self.__lock:
+            if event.status == CircStatus.LAUNCHED:
+                self.__launched[event.id] = now
+                return
+
+            launched = self.__launched.pop(event.id, None)
+
+            if event.status in (CircStatus.CLOSED, CircStatus.FAILED):
+                self.__build_times.pop(event.id, None)
+            elif event.status == CircStatus.BUILT and launched is not None:
+                self.__build_times[event.id] = now - launched
+
+        # Circuits launched before the listener subscribed cannot be timed
+        if launched is None:
+            return
+
+        if event.status == CircStatus.BUILT:
+            self.__telemetry.record_circuit(now - launched)
+        elif event.status == CircStatus.FAILED:
+            self.__telemetry.record_circuit()
+
+
+    def __on_stream(self, event):
+        """
+        Private listener tracking a stream from opening until it connects or fails.
+        """
+
+        now = time.monotonic()
+
+        if event.status == StreamStatus.NEW:
+            # Streams of other applications, and of connections made by address, are not ours to attribute
+            if not CircuitLane.is_own_username(get_socks_username(event)) or is_address(event.target_address):
+                return
+
+            with self.__lock:
+                self.__streams[event.id] = {'host': event.target_address, 'start': now}
+        elif event.status == StreamStatus.SUCCEEDED:
+            with self.__lock:
+                stream = self.__streams.get(event.id)
+                build_time = self.__build_times.pop(event.circ_id, None) if event.circ_id else None
+
+            if stream is not None:
+                self.__telemetry.record_stream(stream['host'], now - stream['start'], build_time)
+        elif event.status in (StreamStatus.FAILED, StreamStatus.CLOSED):
+            with self.__lock:
+                stream = self.__streams.pop(event.id, None)
+
+            if event.status == StreamStatus.FAILED and stream is not None:
+                # The exit only sends a remote reason once it has tried to reach the origin
+                origin = event.remote_reason in TorTelemetry.ORIGIN_REASONS
+                self.__telemetry.record_stream_failure(stream['host'], origin)
+
+
+    def __on_stream_bw(self, event):
+        """
+        Private listener adding the bytes a stream carried to its host. Tor reports stream bandwidth once a second.
+        """
+
+        with self.__lock:
+            stream = self.__streams.get(event.id)
+
+        if stream is not None:
+            self.__telemetry.record_stream_bytes(stream['host'], event.read, event.written)
+
+
+    def __on_bandwidth(self, event):
+        """
+        Private listener adding the bytes the Tor client carried. Tor reports its bandwidth once a second.
+        """
+
+        self.__telemetry.record_bandwidth(event.read, event.written)
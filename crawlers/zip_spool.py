@@ -0,0 +1,168 @@
+import os
+import shutil
+import zipfile
+import tempfile
+
+class ZipSpool:
+    """
+    Receives a zipped payload into a spooled temporary file which is held in memory and only spills to disk
+    above a size threshold. Once the body is complete the members are extracted straight to their final paths
+    in the directory of the download, so the archive itself is never written next to the images. Members are
+    optionally limited to those matching a set of image filters. Exposes the same interface as PartialDownload
+    so either can be handed to the HTTP, FTP and asyncio download paths.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    DEFAULT_MAX_MEMORY = 32 * 1024 * 1024
+    PART_EXTENSION = '.part'
+
+    def __init__(self, path, filters=None, max_memory=DEFAULT_MAX_MEMORY):
+        """
+        Constructor which accepts the path the archive would have been written to.
+
+        @param path: str - The relative path of the zip file, its members are extracted next to it.
+        @param filters: [] - An optional list of strings, only members whose name contains one are extracted.
+        @param max_memory: int - The number of bytes held in memory before the spool spills to disk.
+        """
+
+        self.__path = path
+        self.__length = None
+        self.__spool = None
+        self.__filters = filters or []
+        self.__max_memory = max_memory
+
+
+    def get_offset(self):
+        """
+        Returns the number of bytes received so far. Spooled archives are never resumed.
+        """
+
+        return 0 if self.__spool is None else self.__spool.tell()
+
+
+    def get_request_headers(self):
+        """
+        Builds the headers for the request of the archive. Content encoding is disabled so the expected
+        length can be checked against the bytes received.
+
+        @return headers: {} - A mapping of request headers.
+        """
+
+        return {'Accept-Encoding': 'identity'}
+
+
+    def open(self, status, headers=None):
+        """
+        Opens a fresh spool for the response body.
+
+        @param status: int - The HTTP status code of the response, or 200 for protocols without ranges.
+        @param headers: {} - The response headers.
+        @return f: ZipSpool - A writable file-like object, closing it keeps the spooled bytes.
+        """
+
+        headers = headers or {}
+
+        self.discard()
+        self.__length = int(headers['Content-Length']) if 'Content-Length' in headers else None
+        self.__spool = tempfile.SpooledTemporaryFile(max_size=self.__max_memory)
+
+        return self
+
+
+    def write(self, data):
+        return self.__spool.write(data)
+
+
+    def close(self):
+        """
+        Closing the writer keeps the spooled bytes until commit() or discard().
+        """
+
+        pass
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args):
+        self.close()
+
+
+    def commit(self):
+        """
+        Extracts the members of a complete archive straight into the directory of the download.
+
+        @return complete: bool - False if fewer bytes than expected were received.
+        """
+
+        if self.__spool is None:
+            return False
+
+        if self.__length is not None and self.__spool.tell() != self.__length:
+            self.discard()
+            return False
+
+        dir_path = os.path.dirname(self.__path)
+
+        try:
+            self.__spool.seek(0)
+
+            with zipfile.ZipFile(self.__spool, 'r') as ref:
+                for member in ref.infolist():
+                    target = self.__get_target(dir_path, member)
+
+                    if target is None:
+                        continue
+
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+
+                    # Write beside the target and rename so a partial member is never mistaken for an image
+                    with ref.open(member) as src, open(target + self.PART_EXTENSION, 'wb') as dst:
+                        shutil.copyfileobj(src, dst)
+                    os.replace(target + self.PART_EXTENSION, target)
+        finally:
+            self.discard()
+
+        return True
+
+
+    def discard(self):
+        """
+        Releases the spooled bytes, removing the spill file if one was created.
+        """
+
+        if self.__spool is not None:
+            self.__spool.close()
+            self.__spool = None
+
+
+    def __get_target(self, dir_path, member):
+        """
+        Private method returning the final path of an archive member, or None if it should not be extracted.
+        Absolute and parent directory components are dropped so a member can never escape the directory.
+        """
+
+        if member.is_dir():
+            return None
+
+        if self.__filters and not any(x in member.filename for x in self.__filters):
+            return None
+
+        parts = [p for p in member.filename.replace('\\', '/').split('/') if p not in ('', '.', '..')]
+
+        if not parts:
+            return None
+
+        return os.path.join(dir_path, *parts)
+
+
+    def get_path(self):
+        """
+        Public accessor method returning the path of the zip file the members are extracted beside.
+        """
+
+        return self.__path
@@ -3,8 +3,17 @@ import shlex
 import getopt
 import logging
 import hashlib
-import multitasking
 from xml.dom import minidom
+from crawlers.async_downloader import AsyncDownloader
+from crawlers.retry import RetryPolicy
+from crawlers.bandwidth import parse_rate
+from crawlers.bandwidth import parse_shares
+from crawlers.deadline import RunDeadline
+from crawlers.http2_session import Http2Session
+from crawlers.host_limiter import AdaptiveHostLimiter
+from crawlers.circuit_breaker import CircuitBreaker
+from crawlers.circuit_breaker import parse_breaker
+from crawlers.download_scheduler import DownloadScheduler
 from crawlers.dscovr import DSCOVR
 from crawlers.ews_g2 import EWS_G2
 from crawlers.goes_16 import GOES_16
@@ -42,6 +51,8 @@ PW_ATTRIBUTE = 'pw'
 SECRET_ELEMENT = 'secret'
 CONFIG_FILE_LOC = 'config.xml'
 LOCATION_ATTRIBUTE = 'location'
+SHORT_OPTIONS = '-wehda:i:k:m:f:g:'
+LONG_OPTIONS = ['help', 'filters', 'day=', 'utcrange=', 'images=', 'resolution=', 'notor', 'workers=', 'hostlimit=', 'rotate=', 'lanes=', 'lanemode=', 'torinstances=', 'torstrategy=', 'async', 'inflight=', 'nocache', 'retries=', 'retrycircuit', 'zipfilter', 'http2', 'adaptive', 'hedge=', 'hedgebudget=', 'exits=', 'launchtor=', 'routes=', 'timeouts=', 'deadline=', 'segments=', 'dropcache', 'writers=', 'bandwidth=', 'shares=', 'breaker=', 'telemetry']
 
 def generate_utc_range_30_step(utcrange):
     """
@@ -203,6 +214,63 @@ def help_logger():
     print("To extract the latest GeoColor GOES-18 images with 21696 resolution")
     print("\tsudo python3 satpy-scrapy.py -g18 --images=\"GeoColor\" --resolution=21696")
     print("")
+    print("To extract HIMAWARI-8 GeoColor tiles with 32 download workers and at most 16 per host")
+    print("\tsudo python3 satpy-scrapy.py -i8 --images=\"GeoColor\" --workers=32 --hostlimit=16")
+    print("")
+    print("To extract all the latest GOES-16 images, generating a new Tor IP every 20 requests or on any error")
+    print("\tsudo python3 satpy-scrapy.py -g16 --rotate=\"requests:20,error\"")
+    print("")
+    print("To extract METEOSAT-11 GeoColor tiles over 8 isolated Tor circuits, one per download worker")
+    print("\tsudo python3 satpy-scrapy.py -m11 --images=\"GeoColor\" --workers=8 --lanes=8 --lanemode=worker")
+    print("")
+    print("To extract all the latest HIMAWARI-8 images across two local Tor clients, favouring the least loaded")
+    print("\tsudo python3 satpy-scrapy.py -i8 --torinstances=\"9050:9051,9060:9061\" --torstrategy=least-loaded")
+    print("")
+    print("To extract HIMAWARI-8 GeoColor tiles on the asyncio download path with 512 requests in flight")
+    print("\tsudo python3 satpy-scrapy.py -i8 --images=\"GeoColor\" --async --inflight=512")
+    print("")
+    print("To extract METEOSAT-9 images, retrying failed links up to 5 times on a fresh circuit lane")
+    print("\tsudo python3 satpy-scrapy.py -m9 --lanes=4 --retries=5 --retrycircuit")
+    print("")
+    print("To extract METEOSAT-11 GeoColor tiles multiplexed over HTTP/2, one connection per circuit lane")
+    print("\tsudo python3 satpy-scrapy.py -m11 --images=\"GeoColor\" --http2 --lanes=4 --lanemode=worker")
+    print("")
+    print("To extract all the latest FENGYUN-4A images, adapting the concurrency to what the host tolerates up to 16")
+    print("\tsudo python3 satpy-scrapy.py -fy4a --adaptive --hostlimit=16")
+    print("")
+    print("To extract HIMAWARI-8 GeoColor tiles, hedging requests slower than the 90th percentile for at most 10% of requests")
+    print("\tsudo python3 satpy-scrapy.py -i8 --images=\"GeoColor\" --hedge=90 --hedgebudget=10")
+    print("")
+    print("To extract all the latest GK2A images, steering streams toward the fastest Asian exit relays measured so far")
+    print("\tsudo python3 satpy-scrapy.py -gk2a --exits=steer")
+    print("")
+    print("To extract HIMAWARI-8 GeoColor tiles through two Tor clients launched by satpy-scrapy itself")
+    print("\tsudo python3 satpy-scrapy.py -i8 --images=\"GeoColor\" --launchtor=2 --lanes=8")
+    print("")
+    print("To extract all the latest FENGYUN-4A images over Tor except for NSMC hosts, which are fetched directly")
+    print("\tsudo python3 satpy-scrapy.py -fy4a --routes=\".nsmc.org.cn=direct,default=tor\"")
+    print("")
+    print("To extract all the latest GOES-16 images from a cron job run every 15 minutes, allowing slow NSMC reads")
+    print("\tsudo python3 satpy-scrapy.py -g16 --deadline=13 --timeouts=\"15:60,.nsmc.org.cn=30:120\"")
+    print("")
+    print("To extract full resolution GOES-16 GeoColor images, fetching each one over 8 Tor circuits at once")
+    print("\tsudo python3 satpy-scrapy.py -g16 --resolution=21696 --images=\"GeoColor\" --segments=8")
+    print("")
+    print("To extract all the latest ELEKTRO-L2 archives without evicting cached tiles from the page cache")
+    print("\tsudo python3 satpy-scrapy.py -k2 --dropcache")
+    print("")
+    print("To extract HIMAWARI-8 GeoColor tiles with 64 network workers handing their writes to 2 disk writer threads")
+    print("\tsudo python3 satpy-scrapy.py -i8 --images=\"GeoColor\" --workers=64 --writers=2")
+    print("")
+    print("To extract full resolution GOES-16 images at no more than 5 MB/s, giving GeoColor three times the bandwidth of other images")
+    print("\tsudo python3 satpy-scrapy.py -g16 --resolution=21696 --bandwidth=5M --shares=\"GeoColor=3\"")
+    print("")
+    print("To extract INSAT-3D images, giving up on MOSDAC for 2 minutes at a time after 3 consecutive failures")
+    print("\tsudo python3 satpy-scrapy.py -insat3d --breaker=3:120")
+    print("")
+    print("To extract GEO-KOMPSAT-2A images and report whether time was spent in Tor or waiting on KMA")
+    print("\tsudo python3 satpy-scrapy.py -gk2a --telemetry")
+    print("")
 
 
 def filter_logger():
@@ -307,8 +375,7 @@ def handle_arguments(argv):
     elektro4_pass = False
     
     try:
-        opts, args = getopt.getopt(argv, '-wehda:i:k:m:f:g:', 
-            ['help', 'filters', 'day=', 'utcrange=', 'images=', 'resolution=', 'notor'])
+        opts, args = getopt.getopt(argv, SHORT_OPTIONS, LONG_OPTIONS)
         
         for opt, arg in opts:
             if opt == '-h' or opt == '--help':
@@ -419,6 +486,89 @@ def handle_arguments(argv):
     return GOES_16(GOES_16.GOES_16_URL, GOES_16.GOES_16_NAME, resolution, img_types), img_types, notor
 
 
+def handle_download_arguments(argv):
+    """
+    Function which handles the command line arguments that configure the download layer rather than which
+    satellite is crawled. Any option that is not provided keeps its default value.
+
+    @param argv = [] - A list containing a set of arguments passed by the command line.
+    @return options: {} - A key-value mapping of download option names to their configured values.
+    """
+
+    options = {'workers': DownloadScheduler.DEFAULT_WORKERS, 'hostlimit': DownloadScheduler.DEFAULT_HOST_LIMIT,
+        'async': False, 'inflight': AsyncDownloader.DEFAULT_IN_FLIGHT,
+        'retries': RetryPolicy.DEFAULT_MAX_ATTEMPTS - 1, 'retrycircuit': False, 'adaptive': False}
+
+    try:
+        opts, args = getopt.getopt(argv, SHORT_OPTIONS, LONG_OPTIONS)
+
+        for opt, arg in opts:
+            if opt == '--workers':
+                options['workers'] = int(arg)
+            elif opt == '--hostlimit':
+                options['hostlimit'] = int(arg)
+            elif opt == '--rotate':
+                options['rotate'] = arg
+            elif opt == '--lanes':
+                options['lanes'] = int(arg)
+            elif opt == '--lanemode':
+                options['lanemode'] = arg
+            elif opt == '--torinstances':
+                options['torinstances'] = arg
+            elif opt == '--torstrategy':
+                options['torstrategy'] = arg
+            elif opt == '--async':
+                options['async'] = True
+            elif opt == '--inflight':
+                options['inflight'] = int(arg)
+            elif opt == '--nocache':
+                options['nocache'] = True
+            elif opt == '--retries':
+                options['retries'] = int(arg)
+            elif opt == '--retrycircuit':
+                options['retrycircuit'] = True
+            elif opt == '--zipfilter':
+                options['zipfilter'] = True
+            elif opt == '--http2':
+                options['http2'] = True
+            elif opt == '--adaptive':
+                options['adaptive'] = True
+            elif opt == '--hedge':
+                options['hedge'] = float(arg)
+            elif opt == '--hedgebudget':
+                options['hedgebudget'] = float(arg) / 100.0
+            elif opt == '--exits':
+                options['exits'] = arg
+            elif opt == '--launchtor':
+                options['launchtor'] = int(arg)
+            elif opt == '--routes':
+                options['routes'] = arg
+            elif opt == '--timeouts':
+                options['timeouts'] = arg
+            elif opt == '--deadline':
+                options['deadline'] = float(arg) * 60.0
+            elif opt == '--segments':
+                options['segments'] = int(arg)
+            elif opt == '--dropcache':
+                options['dropcache'] = True
+            elif opt == '--writers':
+                options['writers'] = int(arg)
+            elif opt == '--bandwidth':
+                options['bandwidth'] = parse_rate(arg)
+            elif opt == '--shares':
+                options['shares'] = parse_shares(arg)
+            elif opt == '--breaker':
+                options['breaker'] = parse_breaker(arg)
+            elif opt == '--telemetry':
+                options['telemetry'] = True
+    except (getopt.GetoptError, ValueError) as e:
+        logging.exception(e)
+        print(e)
+        sys.exit(1)
+
+    return options
+
+
 def read_tor_secret():
     """
     This function will attempt to read a root-only accessible configuration file which contains an element named 'tor'
@@ -484,6 +634,11 @@ def main(argv):
     tor_pw = ''
 
     satellite, img_titles, notor = handle_arguments(argv)
+    options = handle_download_arguments(argv)
+
+    # The clock starts before link extraction, which requests no further listing pages once it has passed.
+    # Downloads in flight are bounded by the read timeout between bytes only, so they may finish after it.
+    deadline = RunDeadline(options['deadline']) if 'deadline' in options else None
 
     if not notor:
         tor_pw = read_tor_secret()
@@ -494,8 +649,28 @@ def main(argv):
             print(err)
             sys.exit(1)
     
+    if options.get('http2') and not Http2Session.is_available(notor):
+        fallback = 'HTTP/2 requires httpx and h2 (and socksio for Tor), using HTTP/1.1 sessions.'
+        logging.warning(fallback)
+        print(fallback)
+        options['http2'] = False
+
     try:
+        options['images'] = img_titles
+        satellite.configure_downloads(options)
+        satellite.set_deadline(deadline)
+
+        # A run which overlaps with another run of the same satellite would download the same images
+        if not satellite.acquire_run_lock():
+            return
+
         satellite.create_satellite_directory()
+
+        # Launching Tor and exit scoring need the ControlPort password, so they must start while it is known
+        if tor_pw != '':
+            satellite.launch_tor(tor_pw)
+            satellite.start_exit_scoring(tor_pw)
+            satellite.start_telemetry(tor_pw)
         
         links = satellite.get_links(tor_pw)
         
@@ -504,35 +679,54 @@ def main(argv):
             links = {title:link for (title,link) in links.items() if any(x in title for x in img_titles)}
         
         if links != {}:
-            dict_list = []
-            
-            # Separate each key/value pair into its own dictionary
-            for key, value in links.items():
-                link = {}
-                link[key] = value
-                dict_list.append(link)
-            
-            # Recycle IP once before extracting image set
+            # Recycle IP once before extracting image set, the rotation policies keep deciding during downloads
             if tor_pw != '':
                 satellite._renew_connection(tor_pw)
-                tor_pw = ''
             
-            # download_images() implicitly spawns threads using @multitasking.task decorator
-            for dictionary in dict_list:
-                # Performs either Tor HTTP/HTTPs web scrape or FTP protocol to extract image from FTP server
-                satellite.download_images(dictionary, tor_pw, notor)
+            # Retryable failures are queued again with backoff, optionally on a fresh circuit lane
+            retry_policy = RetryPolicy(options['retries'] + 1)
+            on_retry = satellite.renew_circuit if options['retrycircuit'] else None
+
+            # Per-host concurrency grows while a host stays healthy and is cut on congestion, up to --hostlimit
+            host_limiter = None
+            if options['adaptive']:
+                host_limiter = AdaptiveHostLimiter(options['hostlimit'], logger=logging.getLogger())
+
+            # Sources which keep failing are skipped for a cool-down instead of costing a request per link
+            breaker = None
+            if 'breaker' in options:
+                threshold, cooldown = options['breaker']
+                breaker = CircuitBreaker(threshold, cooldown, logging.getLogger())
+
+            if options['async'] and not satellite.is_ftp_satellite() and AsyncDownloader.is_available(notor):
+                # Single event loop performing Tor HTTP/HTTPs web scrapes, waits for all downloads to finish
+                AsyncDownloader(satellite, options['inflight'], options['hostlimit'], notor, logging.getLogger(),
+                    retry_policy, on_retry, host_limiter, deadline, breaker, tor_pw).download_all(links)
+            else:
+                if options['async'] and not satellite.is_ftp_satellite():
+                    fallback = 'The asyncio download path requires aiohttp (and aiohttp-socks for Tor), using download workers.'
+                    logging.warning(fallback)
+                    print(fallback)
+
+                # Bounded worker pool which performs either Tor HTTP/HTTPs web scrape or FTP protocol to extract images
+                scheduler = DownloadScheduler(lambda title, link: satellite.download_image(title, link, tor_pw, notor),
+                    options['workers'], options['hostlimit'], logger=logging.getLogger(), retry_policy=retry_policy,
+                    on_retry=on_retry, host_limiter=host_limiter, deadline=deadline, breaker=breaker).start()
+                scheduler.submit_all(links)
+                
+                # Wait for all downloads to finish 
+                scheduler.wait()
         else:
             err = "No image links were provided to be pulled down."
             logging.info(err)
             print(err)
         
-        # Wait for all downloads to finish 
-        multitasking.wait_for_tasks()
-        
         # Perform time elapsed calculation.
         satellite.elapsed_time_procedure()
     except Exception as e:
         print(e)
+    finally:
+        satellite.close()
     
 if __name__ == "__main__":
     """
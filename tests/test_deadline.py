@@ -0,0 +1,98 @@
+import io
+import time
+import unittest
+from crawlers.deadline import RunDeadline
+from crawlers.deadline import DeadlineStream
+from crawlers.deadline import RequestTimeouts
+from crawlers.deadline import DeadlineExceeded
+from crawlers.deadline import parse_timeouts
+
+class RequestTimeoutsTest(unittest.TestCase):
+    """
+    Tests for the per host connect and read timeouts parsed from '--timeouts='.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    def test_defaults(self):
+        timeouts = parse_timeouts('')
+
+        self.assertEqual(timeouts.get_timeout('https://example.com/'),
+            (RequestTimeouts.DEFAULT_CONNECT, RequestTimeouts.DEFAULT_READ))
+
+
+    def test_default_and_host_overrides(self):
+        timeouts = parse_timeouts('10:30, .nsmc.org.cn=30:120,*.kma.go.kr=20:90,rammb-slider.cira.colostate.edu=5:15')
+
+        self.assertEqual(timeouts.get_timeout('https://example.com/'), (10.0, 30.0))
+        self.assertEqual(timeouts.get_timeout('http://img.nsmc.org.cn/a.jpg'), (30.0, 120.0))
+        self.assertEqual(timeouts.get_timeout('https://nmsc.KMA.go.kr/a.png'), (20.0, 90.0))
+        self.assertEqual(timeouts.get_timeout('https://rammb-slider.cira.colostate.edu/data/'), (5.0, 15.0))
+        self.assertEqual(timeouts.get_timeout('https://colostate.edu/'), (10.0, 30.0))
+
+
+    def test_fractional_seconds(self):
+        self.assertEqual(parse_timeouts('2.5:7.5').get_timeout('https://example.com/'), (2.5, 7.5))
+
+
+    def test_invalid_entries(self):
+        for spec in ('15', '.nsmc.org.cn=30', 'a:b'):
+            with self.assertRaises(ValueError):
+                parse_timeouts(spec)
+
+
+class RunDeadlineTest(unittest.TestCase):
+    """
+    Tests for the grace period and cutoff of RunDeadline and the streams it cuts off.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    def test_grace_and_retries(self):
+        deadline = RunDeadline(600, grace=120)
+
+        self.assertFalse(deadline.is_near())
+        self.assertFalse(deadline.is_expired())
+        self.assertTrue(deadline.allows_retry(10))
+        self.assertFalse(deadline.allows_retry(500))
+
+
+    def test_short_budget_halves_the_grace(self):
+        deadline = RunDeadline(10, grace=120)
+
+        self.assertGreater(deadline.get_time_to_grace(), 4)
+        self.assertFalse(deadline.is_near())
+
+
+    def test_limit_timeout(self):
+        self.assertEqual(RunDeadline(600, cutoff=60).limit_timeout((15, 60)), (15, 60))
+        self.assertEqual(RunDeadline(0, cutoff=0).limit_timeout((15, 60)),
+            (RunDeadline.MIN_TIMEOUT, RunDeadline.MIN_TIMEOUT))
+
+        connect, read = RunDeadline(20, cutoff=10).limit_timeout((15, 60))
+        self.assertEqual(connect, 15)
+        self.assertLessEqual(read, 30)
+
+
+    def test_stream_is_cut_off(self):
+        deadline = RunDeadline(0.05, cutoff=0.05)
+        stream = DeadlineStream(io.BytesIO(b'0123456789'), deadline, 'GOES-16 - 01 Jan 2026 - 00-00 UTC')
+        buffer = bytearray(4)
+
+        self.assertEqual(stream.read(2), b'01')
+        self.assertEqual(stream.readinto(buffer), 4)
+        self.assertEqual(bytes(buffer), b'2345')
+
+        time.sleep(0.15)
+
+        self.assertTrue(deadline.is_cut_off())
+        with self.assertRaises(DeadlineExceeded):
+            stream.read(2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+import time
+import threading
+import unittest
+
+try:
+    import requests
+    import urllib3
+except ImportError:
+    raise unittest.SkipTest("The requests and urllib3 packages are not installed.")
+
+from concurrent.futures import Future
+from crawlers.retry import RetryPolicy
+from crawlers.retry import DownloadError
+from crawlers.circuit_breaker import CircuitBreaker
+from crawlers.download_scheduler import DownloadScheduler
+
+class StubDownload:
+    """
+    Stands in for SatelliteCrawler.download_image, tracking how many downloads run at once per host and
+    failing links with the outcomes queued for them.
+    """
+
+    def __init__(self, outcomes=None, duration=0.0):
+        self.calls = []
+        self.active = {}
+        self.peak = {}
+        self.duration = duration
+        self.outcomes = outcomes or {}
+        self.lock = threading.Lock()
+
+    def __call__(self, title, link):
+        host = link.split('/')[2]
+
+        with self.lock:
+            self.calls.append(title)
+            self.active[host] = self.active.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+            outcomes = self.outcomes.get(title)
+            outcome = outcomes.pop(0) if outcomes else None
+
+        try:
+            time.sleep(self.duration)
+
+            if isinstance(outcome, Exception):
+                raise outcome
+
+            return True if outcome is None else outcome
+        finally:
+            with self.lock:
+                self.active[host] -= 1
+
+
+def run(download, links, **options):
+    """
+    Downloads a mapping of title to link through a scheduler and returns the items it recorded as failed.
+    """
+
+    scheduler = DownloadScheduler(download, **options).start()
+    scheduler.submit_all(links)
+    scheduler.wait()
+
+    return scheduler.get_failed()
+
+
+class DownloadSchedulerTest(unittest.TestCase):
+    """
+    Tests for the per host caps, retries and circuit breaking of DownloadScheduler.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    def test_host_cap(self):
+        download = StubDownload(duration=0.02)
+        links = {}
+
+        for i in range(8):
+            links['a' + str(i)] = 'https://a.example.com/' + str(i) + '.png'
+            links['b' + str(i)] = 'https://b.example.com/' + str(i) + '.png'
+
+        self.assertEqual(run(download, links, workers=6, host_limit=2), [])
+        self.assertEqual(len(download.calls), 16)
+        self.assertEqual(download.peak, {'a.example.com': 2, 'b.example.com': 2})
+
+
+    def test_retryable_failure_is_retried(self):
+        retried = []
+        download = StubDownload({'a': [DownloadError(DownloadError.TIMEOUT, 'Timed out')]})
+
+        failed = run(download, {'a': 'https://a.example.com/a.png'}, workers=2,
+            retry_policy=RetryPolicy(3, base_delay=0.01), on_retry=lambda title, link, error: retried.append(error.kind))
+
+        self.assertEqual(failed, [])
+        self.assertEqual(download.calls, ['a', 'a'])
+        self.assertEqual(retried, [DownloadError.TIMEOUT])
+
+
+    def test_retries_are_bounded(self):
+        errors = [DownloadError(DownloadError.CONNECTION, 'Refused') for i in range(5)]
+        download = StubDownload({'a': errors})
+
+        failed = run(download, {'a': 'https://a.example.com/a.png'}, retry_policy=RetryPolicy(3, base_delay=0.01))
+
+        self.assertEqual(download.calls, ['a', 'a', 'a'])
+        self.assertEqual(failed, [('a', 'https://a.example.com/a.png', DownloadError.CONNECTION)])
+
+
+    def test_permanent_and_unexpected_failures(self):
+        download = StubDownload({'a': [DownloadError(DownloadError.PERMANENT, 'HTTP status 403')], 'b': [KeyError('b')]})
+
+        failed = run(download, {'a': 'https://a.example.com/a.png', 'b': 'https://a.example.com/b.png'},
+            retry_policy=RetryPolicy(3, base_delay=0.01))
+
+        self.assertEqual(sorted(download.calls), ['a', 'b'])
+        self.assertEqual(sorted(failed), [('a', 'https://a.example.com/a.png', DownloadError.PERMANENT),
+            ('b', 'https://a.example.com/b.png', DownloadError.PERMANENT)])
+
+
+    def test_future_failure_is_recorded(self):
+        stored = Future()
+        stored.set_exception(DownloadError(DownloadError.TRUNCATED, 'Disk full'))
+
+        failed = run(lambda title, link: stored, {'a': 'https://a.example.com/a.png'})
+
+        self.assertEqual(failed, [('a', 'https://a.example.com/a.png', DownloadError.TRUNCATED)])
+
+
+    def test_failed_probe_fails_parked_links(self):
+        errors = [DownloadError(DownloadError.CONNECTION, 'Refused')]
+        download = StubDownload({'a': list(errors), 'b': list(errors)})
+        links = {'a': 'https://a.example.com/a.png', 'b': 'https://a.example.com/b.png',
+            'c': 'https://a.example.com/c.png', 'other': 'https://b.example.com/other.png'}
+
+        failed = run(download, links, workers=1, breaker=CircuitBreaker(threshold=1, cooldown=0.05))
+
+        # The circuit opened after 'a', 'b' probed the host after the cool-down and 'c' was never requested
+        self.assertEqual(sorted(download.calls), ['a', 'b', 'other'])
+        self.assertEqual(sorted(failed), [('a', links['a'], DownloadError.CONNECTION),
+            ('b', links['b'], DownloadError.CONNECTION), ('c', links['c'], DownloadError.UNAVAILABLE)])
+
+
+    def test_successful_probe_resumes_parked_links(self):
+        download = StubDownload({'a': [DownloadError(DownloadError.SERVER_ERROR, 'HTTP status 503')]})
+        links = {'a': 'https://a.example.com/a.png', 'b': 'https://a.example.com/b.png', 'c': 'https://a.example.com/c.png'}
+
+        failed = run(download, links, workers=1, breaker=CircuitBreaker(threshold=1, cooldown=0.05))
+
+        self.assertEqual(sorted(download.calls), ['a', 'b', 'c'])
+        self.assertEqual(failed, [('a', links['a'], DownloadError.SERVER_ERROR)])
+
+
+    def test_breaker_ignores_neutral_failures(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=60)
+
+        self.assertFalse(breaker.record('a.example.com', DownloadError(DownloadError.THROTTLED, 'HTTP status 429')))
+        self.assertTrue(breaker.allow('a.example.com'))
+
+        breaker.record('a.example.com', DownloadError(DownloadError.TIMEOUT, 'Timed out'))
+        self.assertFalse(breaker.allow('a.example.com'))
+
+
+if __name__ == '__main__':
+    unittest.main()
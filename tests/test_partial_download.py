@@ -0,0 +1,128 @@
+import os
+import tempfile
+import unittest
+from crawlers.partial_download import PartialDownload
+
+class PartialDownloadTest(unittest.TestCase):
+    """
+    Tests for resuming a '.part' file with Range and If-Range requests.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    BODY = b'0123456789'
+
+    def setUp(self):
+        self.__tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.__tmp.name, 'imgs', 'image.jpg')
+
+
+    def tearDown(self):
+        self.__tmp.cleanup()
+
+
+    def interrupt(self, headers, received=4):
+        """
+        Writes the first bytes of a 200 response, as an attempt which broke off would have.
+        """
+
+        partial = PartialDownload(self.path)
+
+        with partial.open(PartialDownload.OK_STATUS, dict(headers, **{'Content-Length': str(len(self.BODY))})) as f:
+            f.write(self.BODY[:received])
+
+        return partial
+
+
+    def test_fresh_download_has_no_range(self):
+        partial = PartialDownload(self.path)
+
+        self.assertEqual(partial.get_offset(), 0)
+        self.assertEqual(partial.get_request_headers(), {'Accept-Encoding': 'identity'})
+
+
+    def test_resume_with_strong_etag(self):
+        self.interrupt({'ETag': '"abc"', 'Last-Modified': 'Thu, 01 Jan 2026 00:00:00 GMT'})
+
+        # A later attempt, possibly by the next run, picks the state up from disk
+        partial = PartialDownload(self.path)
+
+        self.assertEqual(partial.get_offset(), 4)
+        self.assertEqual(partial.get_request_headers(),
+            {'Accept-Encoding': 'identity', 'Range': 'bytes=4-', 'If-Range': '"abc"'})
+
+
+    def test_weak_etag_falls_back_to_last_modified(self):
+        self.interrupt({'ETag': 'W/"abc"', 'Last-Modified': 'Thu, 01 Jan 2026 00:00:00 GMT'})
+
+        headers = PartialDownload(self.path).get_request_headers()
+
+        self.assertEqual(headers['If-Range'], 'Thu, 01 Jan 2026 00:00:00 GMT')
+
+
+    def test_no_validator_sends_range_only(self):
+        self.interrupt({})
+
+        headers = PartialDownload(self.path).get_request_headers()
+
+        self.assertEqual(headers['Range'], 'bytes=4-')
+        self.assertNotIn('If-Range', headers)
+
+
+    def test_partial_content_is_appended_and_committed(self):
+        self.interrupt({'ETag': '"abc"'})
+        partial = PartialDownload(self.path)
+
+        with partial.open(PartialDownload.PARTIAL_CONTENT_STATUS, {'Content-Range': 'bytes 4-9/10'}) as f:
+            f.write(self.BODY[4:])
+
+        self.assertTrue(partial.commit())
+
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), self.BODY)
+
+        self.assertFalse(os.path.exists(self.path + PartialDownload.PART_EXTENSION))
+        self.assertFalse(os.path.exists(self.path + PartialDownload.STATE_EXTENSION))
+
+
+    def test_full_response_starts_over(self):
+        self.interrupt({'ETag': '"abc"'})
+        partial = PartialDownload(self.path)
+
+        # The server ignored the range since the file changed, so the whole new body replaces the old bytes
+        with partial.open(PartialDownload.OK_STATUS, {'Content-Length': '3', 'ETag': '"def"'}) as f:
+            f.write(b'new')
+
+        self.assertTrue(partial.commit())
+
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), b'new')
+
+
+    def test_unexpected_content_range(self):
+        self.interrupt({'ETag': '"abc"'})
+        partial = PartialDownload(self.path)
+
+        with self.assertRaises(ValueError):
+            partial.open(PartialDownload.PARTIAL_CONTENT_STATUS, {'Content-Range': 'bytes 2-9/10'})
+
+
+    def test_truncated_download_is_kept(self):
+        partial = self.interrupt({'ETag': '"abc"'})
+
+        self.assertFalse(partial.commit())
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(PartialDownload(self.path).get_offset(), 4)
+
+
+    def test_discard(self):
+        partial = self.interrupt({'ETag': '"abc"'})
+        partial.discard()
+
+        self.assertEqual(PartialDownload(self.path).get_request_headers(), {'Accept-Encoding': 'identity'})
+
+
+if __name__ == '__main__':
+    unittest.main()
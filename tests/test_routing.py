@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+from crawlers.routing import RoutingTable
+from crawlers.routing import parse_routes
+
+class RoutingTableTest(unittest.TestCase):
+    """
+    Tests for the per request route selection of RoutingTable and parse_routes.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    def test_default_route(self):
+        table = RoutingTable()
+
+        self.assertEqual(table.get_route('https://cdn.star.nesdis.noaa.gov/GOES16/'), RoutingTable.TOR)
+        self.assertEqual(RoutingTable(RoutingTable.DIRECT).get_route('https://example.com/'), RoutingTable.DIRECT)
+
+
+    def test_host_and_domain_suffix(self):
+        table = RoutingTable()
+        table.add_rule('cdn.star.nesdis.noaa.gov', RoutingTable.DIRECT)
+        table.add_rule('*.nsmc.org.cn', 'socks5://10.0.0.2:1080')
+
+        self.assertEqual(table.get_route('https://CDN.star.nesdis.noaa.gov/x.jpg'), RoutingTable.DIRECT)
+        self.assertEqual(table.get_route('http://img.nsmc.org.cn/a.jpg'), 'socks5://10.0.0.2:1080')
+        self.assertEqual(table.get_route('http://nsmc.org.cn.evil.com/a.jpg'), RoutingTable.TOR)
+
+
+    def test_url_prefix(self):
+        table = RoutingTable()
+        table.add_rule('http://img.nsmc.org.cn/PORTAL/NSMC/XML/', RoutingTable.DIRECT)
+
+        self.assertEqual(table.get_route('https://img.nsmc.org.cn/portal/nsmc/xml/list.xml'), RoutingTable.DIRECT)
+        self.assertEqual(table.get_route('https://img.nsmc.org.cn/PORTAL/NSMC/IMG/a.jpg'), RoutingTable.TOR)
+
+
+    def test_satellite_name(self):
+        table = RoutingTable()
+        table.add_rule('GEO-KOMPSAT-2A', RoutingTable.DIRECT)
+
+        self.assertEqual(table.get_route('https://nmsc.kma.go.kr/a.png', 'GEO-KOMPSAT-2A'), RoutingTable.DIRECT)
+        self.assertEqual(table.get_route('https://nmsc.kma.go.kr/a.png', 'HIMAWARI-8'), RoutingTable.TOR)
+
+
+    def test_first_matching_rule_wins(self):
+        table = RoutingTable()
+        table.add_rule('img.nsmc.org.cn', RoutingTable.DIRECT)
+        table.add_rule('.nsmc.org.cn', 'http://10.0.0.3:3128')
+
+        self.assertEqual(table.get_route('http://img.nsmc.org.cn/a.jpg'), RoutingTable.DIRECT)
+        self.assertEqual(table.get_route('http://satellite.nsmc.org.cn/a.jpg'), 'http://10.0.0.3:3128')
+
+
+    def test_invalid_route(self):
+        with self.assertRaises(ValueError):
+            RoutingTable('bogus')
+
+        with self.assertRaises(ValueError):
+            RoutingTable().add_rule('.nsmc.org.cn', 'ftp://10.0.0.2')
+
+
+    def test_parse_routes(self):
+        table = parse_routes('img.nsmc.org.cn=direct, GEO-KOMPSAT-2A=socks5://10.0.0.2:1080 ,default=direct')
+
+        self.assertEqual(table.get_route('http://img.nsmc.org.cn/a.jpg'), RoutingTable.DIRECT)
+        self.assertEqual(table.get_route('https://nmsc.kma.go.kr/a.png', 'geo-kompsat-2a'), 'socks5://10.0.0.2:1080')
+        self.assertEqual(table.get_route('https://example.com/'), RoutingTable.DIRECT)
+
+        with self.assertRaises(ValueError):
+            parse_routes('img.nsmc.org.cn')
+
+
+    def test_parse_routes_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'routes.txt')
+
+            with open(path, 'w') as f:
+                f.write("# Fetched directly\nimg.nsmc.org.cn=direct\n\ndefault=tor # everything else\n")
+
+            table = parse_routes('@' + path)
+
+        self.assertEqual(table.get_route('http://img.nsmc.org.cn/a.jpg'), RoutingTable.DIRECT)
+        self.assertEqual(table.get_route('https://example.com/'), RoutingTable.TOR)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+
+try:
+    import stem
+except ImportError:
+    raise unittest.SkipTest("The stem package is not installed.")
+
+from crawlers.tor_rotation import OnError
+from crawlers.tor_rotation import EveryNBytes
+from crawlers.tor_rotation import EveryNSeconds
+from crawlers.tor_rotation import EveryNRequests
+from crawlers.tor_rotation import CircuitRotator
+from crawlers.tor_rotation import parse_rotation_policies
+
+class StubController:
+    """
+    Stands in for a TorController, accepting or rate limiting NEWNYM.
+    """
+
+    def __init__(self, renewed=True):
+        self.renewed = renewed
+        self.signals = 0
+
+    def new_identity(self, pw=''):
+        self.signals += 1
+        return self.renewed
+
+
+class RotationPolicyTest(unittest.TestCase):
+    """
+    Tests for parsing '--rotate=' into rotation policies and for the CircuitRotator consulting them.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    def test_parse_every_policy(self):
+        policies = parse_rotation_policies('requests:50, bytes:1048576,time:10,error')
+
+        self.assertEqual([type(p) for p in policies], [EveryNRequests, EveryNBytes, EveryNSeconds, OnError])
+
+
+    def test_parse_empty_and_unknown(self):
+        self.assertEqual(parse_rotation_policies(''), [])
+        self.assertEqual(parse_rotation_policies(' , '), [])
+
+        with self.assertRaises(ValueError):
+            parse_rotation_policies('requests:50,sometimes')
+
+        with self.assertRaises(ValueError):
+            parse_rotation_policies('requests:many')
+
+
+    def test_requests_and_bytes(self):
+        requests, nbytes = parse_rotation_policies('requests:2,bytes:100')
+
+        self.assertFalse(requests.record(0, False))
+        self.assertTrue(requests.record(0, False))
+        requests.reset()
+        self.assertFalse(requests.record(0, False))
+
+        self.assertFalse(nbytes.record(60, False))
+        self.assertTrue(nbytes.record(40, False))
+
+
+    def test_time_and_error(self):
+        elapsed, error = parse_rotation_policies('time:0,error')
+
+        self.assertTrue(elapsed.record(0, False))
+        self.assertFalse(error.record(0, False))
+        self.assertTrue(error.record(0, True))
+
+
+    def test_rotator_resets_policies_and_notifies(self):
+        rotated = []
+        controller = StubController()
+        rotator = CircuitRotator(controller, parse_rotation_policies('requests:2'), on_rotate=lambda: rotated.append(True))
+
+        self.assertFalse(rotator.record(''))
+        self.assertTrue(rotator.record(''))
+        self.assertFalse(rotator.record(''))
+        self.assertEqual((controller.signals, len(rotated)), (1, 1))
+
+
+    def test_rate_limited_rotation_keeps_policies(self):
+        rotated = []
+        controller = StubController(renewed=False)
+        rotator = CircuitRotator(controller, parse_rotation_policies('requests:1'), on_rotate=lambda: rotated.append(True))
+
+        self.assertFalse(rotator.record(''))
+        self.assertFalse(rotator.record(''))
+        self.assertEqual((controller.signals, len(rotated)), (2, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
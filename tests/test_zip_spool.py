@@ -0,0 +1,91 @@
+import io
+import os
+import zipfile
+import tempfile
+import unittest
+from crawlers.zip_spool import ZipSpool
+
+class ZipSpoolTest(unittest.TestCase):
+    """
+    Tests for extracting spooled archives, in particular that member names can never escape the directory.
+
+    @author Vincent.Nigro
+    @version 0.0.1
+    @modified 10/16/26
+    """
+
+    def setUp(self):
+        self.__tmp = tempfile.TemporaryDirectory()
+        self.root = self.__tmp.name
+        self.dir_path = os.path.join(self.root, 'imgs', '01 Jan 2026', '00-00')
+
+
+    def tearDown(self):
+        self.__tmp.cleanup()
+
+
+    def receive(self, members, filters=None, length=None):
+        """
+        Spools an archive of the given (name, data) members as a response body and commits it.
+        """
+
+        body = io.BytesIO()
+
+        with zipfile.ZipFile(body, 'w') as archive:
+            for name, data in members:
+                archive.writestr(name, data)
+
+        data = body.getvalue()
+        spool = ZipSpool(os.path.join(self.dir_path, 'images.zip'), filters)
+
+        with spool.open(200, {'Content-Length': str(len(data) if length is None else length)}) as f:
+            f.write(data)
+
+        return spool.commit()
+
+
+    def list_files(self):
+        """
+        Returns the paths of every file extracted under the temporary directory, relative to it.
+        """
+
+        found = []
+
+        for dir_path, dir_names, file_names in os.walk(self.root):
+            found.extend(os.path.relpath(os.path.join(dir_path, name), self.root) for name in file_names)
+
+        return sorted(found)
+
+
+    def test_members_are_extracted_beside_the_archive(self):
+        self.assertTrue(self.receive([('a.png', b'a'), ('sub/b.png', b'b')]))
+
+        with open(os.path.join(self.dir_path, 'sub', 'b.png'), 'rb') as f:
+            self.assertEqual(f.read(), b'b')
+
+        self.assertFalse(os.path.exists(os.path.join(self.dir_path, 'images.zip')))
+
+
+    def test_member_names_cannot_escape(self):
+        self.assertTrue(self.receive([('../../../evil.png', b'1'), ('/etc/abs.png', b'2'),
+            ('..\\..\\win.png', b'3'), ('./x/../y.png', b'4'), ('dir/', b'')]))
+
+        prefix = os.path.relpath(self.dir_path, self.root)
+
+        self.assertEqual(self.list_files(), sorted([os.path.join(prefix, 'evil.png'),
+            os.path.join(prefix, 'etc', 'abs.png'), os.path.join(prefix, 'win.png'), os.path.join(prefix, 'x', 'y.png')]))
+
+
+    def test_filters(self):
+        self.assertTrue(self.receive([('FD_GeoColor.png', b'a'), ('readme.txt', b'b')], filters=['GeoColor']))
+
+        self.assertEqual(os.listdir(self.dir_path), ['FD_GeoColor.png'])
+
+
+    def test_truncated_archive_is_discarded(self):
+        self.assertFalse(self.receive([('a.png', b'a')], length=10 ** 6))
+        self.assertEqual(self.list_files(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()